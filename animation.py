@@ -0,0 +1,209 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: animation.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Abspielen von Animationen (z.B. img/swirl.gif) in einem Tk-Label. Die
+Animation wird einmal dekodiert, skaliert und als Bildraster (Atlas) mit
+allen Frames im Bild-Cache abgelegt (image_cache.py). Beim Start lädt Tk nur
+noch diese eine PNG-Datei; der angezeigte Frame wird bei jedem Tick in ein
+einziges Anzeigebild kopiert, statt alle Frames als eigene Bilder zu halten.
+
+Der Player richtet sich nach der Uhr statt nach der Anzahl Aufrufe: kommt
+ein Tick zu spät (z.B. weil die Ereignisschleife beschäftigt war), werden
+Frames übersprungen statt die Schleife mit Nachholen zu blockieren. Die
+erreichte Bildrate wird gemessen.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Frames erst beim Abspielen aus dem Atlas kopieren (AtlasFrames), kein PhotoImage pro Frame.
+
+===============================================================================
+"""
+
+import json
+import logging
+import math
+import time
+import tkinter as tk
+
+from PIL import Image, ImageSequence
+from PIL.PngImagePlugin import PngInfo
+
+animation_logger = logging.getLogger("main_logger")
+
+ATLAS_META_KEY = "noatime-atlas"
+DEFAULT_FRAME_MS = 100
+
+
+def build_atlas(source_path, target_width, output_path, frame_step=1, columns=10):
+    """
+    Dekodiert eine Animation, skaliert jeden `frame_step`-ten Frame auf
+    `target_width` und schreibt alle Frames als Raster in eine PNG-Datei.
+    Frame-Grösse, Spaltenzahl und Frame-Dauern stehen als Text im PNG.
+    """
+    frames = []
+    durations = []
+    with Image.open(source_path) as animation:
+        target_height = int(target_width * animation.size[1] / animation.size[0])
+        for position, frame in enumerate(ImageSequence.Iterator(animation)):
+            duration = frame.info.get("duration") or DEFAULT_FRAME_MS
+            if position % frame_step:
+                durations[-1] += duration  # Übersprungene Frames verlängern den vorherigen
+                continue
+            frames.append(frame.convert("RGBA").resize((target_width, target_height), Image.LANCZOS))
+            durations.append(duration)
+
+    columns = min(columns, len(frames))
+    rows = math.ceil(len(frames) / columns)
+    atlas = Image.new("RGBA", (columns * target_width, rows * target_height), (255, 255, 255, 0))
+    for position, frame in enumerate(frames):
+        atlas.paste(frame, ((position % columns) * target_width, (position // columns) * target_height))
+
+    meta = PngInfo()
+    meta.add_text(ATLAS_META_KEY, json.dumps({
+        "width": target_width,
+        "height": target_height,
+        "columns": columns,
+        "durations": durations,
+    }))
+    atlas.save(output_path, format="PNG", pnginfo=meta, compress_level=1)
+
+
+def prepare_atlas(image_cache, source_path, target_width, frame_step=1):
+    """
+    Gibt den Pfad des Atlas im Bild-Cache zurück und erzeugt ihn bei Bedarf.
+    Darf in einem Hintergrund-Thread laufen (kein Tk).
+    """
+    def render(temp_path):
+        build_atlas(source_path, target_width, temp_path, frame_step)
+
+    return image_cache.cached(source_path, f"atlas_w{target_width}_s{frame_step}", render)
+
+
+def load_frames(atlas_path):
+    """
+    Lädt einen Atlas und gibt (AtlasFrames, Frame-Dauern in ms) zurück.
+    Muss im Tk-Thread laufen.
+    """
+    with Image.open(atlas_path) as atlas:  # Liest nur den Kopf mit den Metadaten
+        meta = json.loads(atlas.text[ATLAS_META_KEY])
+
+    sheet = tk.PhotoImage(file=atlas_path)
+    frames = AtlasFrames(sheet, meta["width"], meta["height"], meta["columns"], len(meta["durations"]))
+    return frames, meta["durations"]
+
+
+class AtlasFrames:
+    """
+    Frames eines Atlas als Folge für den AnimationPlayer. Ein Frame wird erst
+    beim Zugriff aus dem Raster in ein gemeinsames Anzeigebild kopiert; im
+    Speicher liegen nur das Raster und dieses eine Bild.
+    """
+
+    def __init__(self, sheet, width, height, columns, count):
+        self.sheet = sheet
+        self.width = width
+        self.height = height
+        self.columns = columns
+        self.count = count
+        self.image = tk.PhotoImage(width=width, height=height)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        x = (position % self.columns) * self.width
+        y = (position // self.columns) * self.height
+        # "set" ersetzt auch transparente Pixel, sonst bliebe der vorherige Frame sichtbar
+        self.image.tk.call(self.image, "copy", self.sheet, "-from", x, y, x + self.width, y + self.height,
+                           "-to", 0, 0, "-compositingrule", "set")
+        return self.image
+
+
+class AnimationPlayer:
+    """
+    Spielt Frames in einem Label ab. Welcher Frame angezeigt wird, ergibt
+    sich aus der seit dem Start vergangenen Zeit; verspätete Ticks lassen
+    Frames aus, statt die Animation zu verlangsamen.
+    """
+
+    def __init__(self, label, frames, durations, idle_image=None):
+        self.label = label
+        self.frames = frames
+        self.idle_image = idle_image
+        # Startzeitpunkt jedes Frames relativ zum Beginn der Animation (ms)
+        self._offsets = []
+        total = 0
+        for duration in durations:
+            self._offsets.append(total)
+            total += duration
+        self._length_ms = total
+
+        self._after_id = None
+        self._start = None
+        self._current = None
+        self.displayed = 0
+        self.dropped = 0
+        self._played_ms = 0.0
+
+    def play(self):
+        """
+        Startet die Animation einmal von vorne (eine laufende wird neu gestartet).
+        """
+        self.stop(show_idle=False)
+        self._start = time.perf_counter()
+        self._current = None
+        self._tick()
+
+    def stop(self, show_idle=True):
+        if self._after_id is not None:
+            self.label.after_cancel(self._after_id)
+            self._after_id = None
+        if self._start is not None:
+            self._played_ms += (time.perf_counter() - self._start) * 1000
+            self._start = None
+        if show_idle:
+            self.label.config(image=self.idle_image or "")
+
+    def stats(self):
+        """
+        Gibt angezeigte und ausgelassene Frames sowie die erreichte Bildrate zurück.
+        """
+        played_ms = self._played_ms
+        if self._start is not None:
+            played_ms += (time.perf_counter() - self._start) * 1000
+        return {
+            "displayed": self.displayed,
+            "dropped": self.dropped,
+            "fps": self.displayed / (played_ms / 1000) if played_ms else 0.0,
+            "target_fps": len(self.frames) / (self._length_ms / 1000) if self._length_ms else 0.0,
+        }
+
+    def _tick(self):
+        self._after_id = None
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        if elapsed_ms >= self._length_ms:
+            self.stop()
+            return
+
+        # Letzter Frame, dessen Startzeit erreicht ist
+        position = self._current or 0
+        while position + 1 < len(self._offsets) and self._offsets[position + 1] <= elapsed_ms:
+            position += 1
+
+        if position != self._current:
+            if self._current is not None:
+                self.dropped += max(position - self._current - 1, 0)
+            self.label.config(image=self.frames[position])
+            self.displayed += 1
+            self._current = position
+
+        # Nächster Tick genau zur Startzeit des nächsten Frames
+        next_ms = self._offsets[position + 1] if position + 1 < len(self._offsets) else self._length_ms
+        delay = max(int(next_ms - (time.perf_counter() - self._start) * 1000), 1)
+        self._after_id = self.label.after(delay, self._tick)
@@ -0,0 +1,346 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: backup_log.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Segmentiertes, nur anhängendes Backup-Log als Alternative zur SQLite-Outbox.
+Jedes Segment ist eine JSON-Lines-Datei, die nie umgeschrieben wird. Pro
+Segment wird ein Checkpoint (bestätigter Byte-Offset) gespeichert, damit die
+Wiederholung nach einem Neustart genau dort weitermacht, wo sie aufgehört hat.
+Vollständig bestätigte Segmente werden gelöscht oder komprimiert.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+backup_logger = logging.getLogger("sql_logger")
+
+SEGMENT_PATTERN = re.compile(r"^seg-(\d{8})\.log$")
+
+
+class SegmentLog:
+    """
+    Backup-Speicher mit derselben Schnittstelle wie `outbox.Outbox`
+    (append, claim, ack, release, fail, pending_count).
+
+    Ein Eintrag wird über (Segment, Start-Offset, End-Offset) identifiziert.
+    """
+
+    def __init__(self, directory, max_rows=100000, max_attempts=5,
+                 max_segment_bytes=1024 * 1024, max_segment_age=24 * 3600,
+                 compress_acked=False):
+        self.directory = directory
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compress_acked = compress_acked
+        self._lock = threading.Lock()
+
+        self._checkpoints = {}  # Segment -> bestätigter Byte-Offset
+        self._done = set()  # Bestätigte Einträge hinter dem Checkpoint
+        self._attempts = {}
+        self._pending = 0
+
+        os.makedirs(directory, exist_ok=True)
+        segments = self._list_segments()
+        for segment in segments:
+            self._repair_tail(segment)
+            self._checkpoints[segment] = self._read_checkpoint(segment)
+            self._pending += self._count_entries(segment, self._checkpoints[segment])
+
+        self._active = segments[-1] if segments else 1
+        self._checkpoints.setdefault(self._active, 0)
+        self._active_file = open(self._segment_path(self._active), "ab")
+        self._active_opened_at = time.time()
+        self._read_pos = (min(self._checkpoints), self._checkpoints[min(self._checkpoints)])
+
+        # Segmente, die schon vor dem Neustart vollständig bestätigt waren
+        for segment in list(self._checkpoints):
+            self._retire_if_acked(segment)
+
+    def append(self, sql, params):
+        """
+        Hängt einen Befehl an das aktive Segment an und schreibt ihn sofort auf die Karte.
+        Gibt False zurück, wenn die maximale Anzahl offener Einträge erreicht ist.
+        """
+        line = json.dumps({"sql": sql, "values": list(params)}, default=str) + "\n"
+        with self._lock:
+            if self._pending >= self.max_rows:
+                backup_logger.error(f"[Backup-Log] Maximale Grösse von {self.max_rows} Einträgen erreicht. Eintrag verworfen.")
+                return False
+            self._rotate_if_needed()
+            self._active_file.write(line.encode("utf-8"))
+            self._active_file.flush()
+            os.fsync(self._active_file.fileno())
+            self._pending += 1
+            return True
+
+    def claim(self, limit=100):
+        """
+        Liest die nächsten offenen Einträge ab der aktuellen Leseposition.
+        Gibt eine Liste von (id, sql, params) zurück.
+        """
+        entries = []
+        with self._lock:
+            segment, offset = self._read_pos
+            while len(entries) < limit and segment <= self._active:
+                path = self._segment_path(segment)
+                if not os.path.exists(path):
+                    segment, offset = segment + 1, 0
+                    continue
+
+                # Nie hinter den Checkpoint zurück lesen, dort ist alles bestätigt
+                offset = max(offset, self._checkpoints.get(segment, 0))
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    while len(entries) < limit:
+                        line = f.readline()
+                        if not line.endswith(b"\n"):
+                            break  # Dateiende oder noch nicht fertig geschriebene Zeile
+                        entry_id = (segment, offset, offset + len(line))
+                        offset += len(line)
+                        if entry_id in self._done:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                            entries.append((entry_id, entry["sql"], entry["values"]))
+                        except (ValueError, KeyError, TypeError):
+                            backup_logger.error(f"[Backup-Log] Ungültige Zeile in Segment {segment} übersprungen: {line!r}")
+                            self._mark_done([entry_id])
+
+                if len(entries) < limit and segment < self._active:
+                    segment, offset = segment + 1, 0
+                else:
+                    break
+
+            self._read_pos = (segment, offset)
+            self._persist_checkpoints({entry_id[0] for entry_id in self._done})
+        return entries
+
+    def ack(self, ids):
+        """
+        Bestätigt erfolgreich ausgeführte Einträge und schreibt die Checkpoints.
+        """
+        if not ids:
+            return
+        with self._lock:
+            self._mark_done(ids)
+            self._persist_checkpoints({entry_id[0] for entry_id in ids})
+
+    def release(self, ids):
+        """
+        Gibt reservierte Einträge wieder frei. Die Leseposition springt zurück,
+        bereits bestätigte Einträge werden beim erneuten Lesen übersprungen.
+        """
+        if not ids:
+            return
+        with self._lock:
+            self._rewind(ids)
+
+    def fail(self, ids, error):
+        """
+        Markiert Einträge als fehlgeschlagen. Nach `max_attempts` Versuchen werden
+        sie in `dead.log` verschoben und gelten als erledigt.
+        """
+        if not ids:
+            return
+        with self._lock:
+            retry, dead = [], []
+            for entry_id in ids:
+                self._attempts[entry_id] = self._attempts.get(entry_id, 0) + 1
+                (dead if self._attempts[entry_id] >= self.max_attempts else retry).append(entry_id)
+
+            if dead:
+                with open(os.path.join(self.directory, "dead.log"), "ab") as f:
+                    for segment, start, end in dead:
+                        with open(self._segment_path(segment), "rb") as source:
+                            source.seek(start)
+                            line = source.read(end - start).rstrip(b"\n")
+                        record = {"entry": line.decode("utf-8", "replace"), "error": str(error)}
+                        f.write((json.dumps(record) + "\n").encode("utf-8"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._mark_done(dead)
+                self._persist_checkpoints({entry_id[0] for entry_id in dead})
+            self._rewind(retry)
+
+    def pending_count(self):
+        """
+        Gibt die Anzahl der noch nicht bestätigten Einträge zurück.
+        """
+        with self._lock:
+            return self._pending
+
+    def import_json_lines(self, json_path):
+        """
+        Übernimmt eine alte JSON-Lines-Backup-Datei als eigenes Segment und
+        benennt sie danach um. Gibt die Anzahl der importierten Einträge zurück.
+        """
+        if not os.path.exists(json_path):
+            return 0
+
+        count = 0
+        with open(json_path, "r") as f:
+            for line_num, line in enumerate(f, start=1):
+                try:
+                    entry = json.loads(line)
+                    if self.append(entry["sql"], entry["values"]):
+                        count += 1
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    backup_logger.error(f"[Backup-Log] Ungültige Zeile {line_num} in {json_path} übersprungen: {line.strip()}")
+
+        os.replace(json_path, f"{json_path}.imported")
+        backup_logger.info(f"[Backup-Log] {count} Einträge aus {json_path} importiert.")
+        return count
+
+    def close(self):
+        with self._lock:
+            self._active_file.close()
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"seg-{segment:08d}.log")
+
+    def _checkpoint_path(self, segment):
+        return os.path.join(self.directory, f"seg-{segment:08d}.ckpt")
+
+    def _list_segments(self):
+        segments = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def _read_checkpoint(self, segment):
+        try:
+            with open(self._checkpoint_path(segment), "r") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            backup_logger.error(f"[Backup-Log] Checkpoint von Segment {segment} ist beschädigt. Beginne von vorne.")
+            return 0
+
+    def _write_checkpoint(self, segment, offset):
+        """
+        Schreibt einen Checkpoint atomar (temporäre Datei, fsync, rename).
+        """
+        path = self._checkpoint_path(segment)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def _repair_tail(self, segment):
+        """
+        Schneidet eine abgebrochene letzte Zeile ab (z.B. nach einem Stromausfall).
+        """
+        path = self._segment_path(segment)
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                valid_length = data.rfind(b"\n") + 1
+                f.truncate(valid_length)
+                backup_logger.warning(
+                    f"[Backup-Log] Abgeschnittene Zeile in Segment {segment} entfernt "
+                    f"({len(data) - valid_length} Bytes)."
+                )
+
+    def _count_entries(self, segment, offset):
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            return sum(1 for _ in f)
+
+    def _rotate_if_needed(self):
+        size = self._active_file.tell()
+        age = time.time() - self._active_opened_at
+        if size == 0 or (size < self.max_segment_bytes and age < self.max_segment_age):
+            return
+
+        self._active_file.close()
+        self._active += 1
+        self._checkpoints[self._active] = 0
+        self._active_file = open(self._segment_path(self._active), "ab")
+        self._active_opened_at = time.time()
+        backup_logger.info(f"[Backup-Log] Neues Segment {self._active} begonnen.")
+
+        # Das abgeschlossene Segment kann bereits vollständig bestätigt sein
+        self._retire_if_acked(self._active - 1)
+
+    def _mark_done(self, ids):
+        for entry_id in ids:
+            if entry_id not in self._done:
+                self._done.add(entry_id)
+                self._pending -= 1
+            self._attempts.pop(entry_id, None)
+
+    def _rewind(self, ids):
+        # Nur Einträge hinter dem Checkpoint, die noch nicht erledigt sind
+        ids = [
+            entry_id for entry_id in ids
+            if entry_id not in self._done
+            and entry_id[1] >= self._checkpoints.get(entry_id[0], float("inf"))
+        ]
+        if ids:
+            segment, start, _ = min(ids)
+            self._read_pos = min(self._read_pos, (segment, start))
+
+    def _persist_checkpoints(self, segments):
+        """
+        Schiebt die Checkpoints der betroffenen Segmente über alle lückenlos
+        bestätigten Einträge hinaus und speichert sie.
+        """
+        for segment in sorted(segments):
+            if segment not in self._checkpoints:
+                continue
+            offset = self._checkpoints[segment]
+            done_starts = {start: end for seg, start, end in self._done if seg == segment}
+            while offset in done_starts:
+                end = done_starts.pop(offset)
+                self._done.discard((segment, offset, end))
+                offset = end
+            if offset != self._checkpoints[segment]:
+                self._checkpoints[segment] = offset
+                self._write_checkpoint(segment, offset)
+                self._retire_if_acked(segment)
+
+    def _retire_if_acked(self, segment):
+        """
+        Löscht oder komprimiert ein abgeschlossenes, vollständig bestätigtes Segment.
+        """
+        if segment == self._active or segment not in self._checkpoints:
+            return
+        path = self._segment_path(segment)
+        if self._checkpoints[segment] < os.path.getsize(path):
+            return
+
+        if self.compress_acked:
+            with open(path, "rb") as source, gzip.open(f"{path}.gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+        os.remove(path)
+        try:
+            os.remove(self._checkpoint_path(segment))
+        except FileNotFoundError:
+            pass
+        del self._checkpoints[segment]
+        if self._read_pos[0] == segment:
+            self._read_pos = (segment + 1, 0)
+        backup_logger.info(f"[Backup-Log] Segment {segment} vollständig verarbeitet und entfernt.")
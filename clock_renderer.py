@@ -0,0 +1,109 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: clock_renderer.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Uhr- und Datumsanzeige für das GUI. Jeder Tick wird auf den nächsten
+Sekundenwechsel der Systemuhr geplant statt relativ mit `after(1000)`, damit
+die Anzeige nicht wegdriftet und keine Sekunde überspringt. Der Datumstext
+wird nur beim Tageswechsel neu formatiert, das Label nur bei geändertem Text
+neu gesetzt. Die Verspätung der Ticks gegenüber dem Sekundenwechsel wird
+gemessen.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import math
+import time
+from collections import deque
+from datetime import datetime
+
+from query_metrics import percentile
+
+# Kleiner Vorlauf nach dem Sekundenwechsel, damit der Tick sicher in der neuen Sekunde liegt
+TICK_OFFSET_MS = 2
+
+
+class ClockRenderer:
+    """
+    Aktualisiert ein Tk-Label mit Datum und Uhrzeit. Läuft im Tk-Thread.
+    """
+
+    def __init__(self, label, time_format="%H:%M:%S", date_format="%A, %d. %B %Y", jitter_window=600):
+        self.label = label
+        self.time_format = time_format
+        self.date_format = date_format
+        self._jitter = deque(maxlen=jitter_window)
+        self._after_id = None
+        self._day = None
+        self._date_text = ""
+        self._text = None
+        self._last_second = None
+        self.ticks = 0
+        self.updates = 0
+        self.skipped_seconds = 0
+
+    def start(self):
+        """
+        Zeigt sofort die aktuelle Zeit an und plant die weiteren Ticks.
+        """
+        self._tick(scheduled=None)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.label.after_cancel(self._after_id)
+            self._after_id = None
+
+    def render(self, now):
+        """
+        Gibt den Anzeigetext für `now` zurück. Das Datum wird pro Tag einmal formatiert.
+        """
+        if now.date() != self._day:
+            self._day = now.date()
+            self._date_text = now.strftime(self.date_format)
+        return f"{self._date_text}\n{now.strftime(self.time_format)}"
+
+    def stats(self):
+        """
+        Gibt Ticks, Label-Aktualisierungen, übersprungene Sekunden und die
+        Verspätung der Ticks (p50/p95/max in ms) zurück.
+        """
+        samples = sorted(self._jitter)
+        return {
+            "ticks": self.ticks,
+            "updates": self.updates,
+            "skipped_seconds": self.skipped_seconds,
+            "jitter_p50_ms": percentile(samples, 0.50),
+            "jitter_p95_ms": percentile(samples, 0.95),
+            "jitter_max_ms": samples[-1] if samples else 0.0,
+        }
+
+    def _tick(self, scheduled):
+        self._after_id = None
+        wall = time.time()
+        self.ticks += 1
+        if scheduled is not None:
+            self._jitter.append((wall - scheduled) * 1000)
+
+        second = math.floor(wall)
+        if self._last_second is not None and second - self._last_second > 1:
+            self.skipped_seconds += second - self._last_second - 1
+        self._last_second = second
+
+        text = self.render(datetime.fromtimestamp(second))
+        if text != self._text:
+            self.label.config(text=text)
+            self._text = text
+            self.updates += 1
+
+        # Nächster Tick auf den nächsten Sekundenwechsel der Systemuhr
+        next_second = second + 1
+        delay = max(math.ceil((next_second - time.time()) * 1000) + TICK_OFFSET_MS, 1)
+        self._after_id = self.label.after(delay, self._tick, next_second)
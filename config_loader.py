@@ -10,17 +10,131 @@ Beschreibung:
 Lädt die Konfigurationsdatei damit diese dann in den andere Skripts verwendet
 werden kann.
 
+`config` ist das zentrale Konfigurationsobjekt: config/config.cnf wird beim
+ersten Import einmal gelesen, Umgebungsvariablen (${VAR}) werden ersetzt und
+alle bekannten Schlüssel gegen SCHEMA geprüft und in ihren Typ umgewandelt.
+Mit `watch` wird die Datei über inotify überwacht; Änderungen an Schlüsseln,
+die ohne Neustart übernommen werden können (Timeouts, Entprellzeit,
+Log-Level), gelten sofort. Alle anderen Änderungen brauchen einen Neustart.
+
 Changelog:
 - [29.11.24]: Erste Version.
 - [02.12.24]: Config Datei ist nun im Ordner Config.
+- [19.10.26]: Zentrales, geprüftes Konfigurationsobjekt mit Hot Reload (ersetzt configparser pro Modul).
 
 ===============================================================================
 """
+import configparser
+import ctypes
+import ctypes.util
+import logging
 import os
+import struct
+import threading
+import time
+
+from dotenv import load_dotenv
+
+config_logger = logging.getLogger("main_logger")
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "config.cnf")
+
+# Markiert Schlüssel ohne Standardwert
+REQUIRED = object()
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# (Abschnitt, Schlüssel) -> (Typ oder erlaubte Werte, Standardwert, ohne Neustart änderbar)
+SCHEMA = {
+    ("device", "name"): (str, REQUIRED, False),
+    ("device", "username"): (str, REQUIRED, False),
+    ("version", "version_number"): (str, REQUIRED, False),
+    ("version", "version_name"): (str, REQUIRED, False),
+
+    ("storage", "backend"): (("mysql", "sqlite"), "mysql", False),
+    ("storage", "sqlite_path"): (str, "data/noatime.db", False),
+    ("ui", "backend"): (("tk", "headless"), "tk", False),
+
+    ("stamp", "write_behind"): (bool, False, False),
+    ("stamp", "flush_interval_ms"): (int, 500, False),
+    ("stamp", "flush_rows"): (int, 50, False),
+
+    ("roster", "enabled"): (bool, False, False),
+    ("roster", "sync_interval"): (int, 300, False),
+    ("roster", "full_sync_interval"): (int, 24 * 3600, False),
+
+    ("backup", "store"): (("sqlite", "segments"), "sqlite", False),
+    ("backup", "max_rows"): (int, 100000, False),
+    ("backup", "batch_size"): (int, 500, False),
+    ("backup", "batch_replay"): (bool, True, False),
+    ("backup", "segment_bytes"): (int, 1024 * 1024, False),
+    ("backup", "segment_age"): (int, 24 * 3600, False),
+    ("backup", "compress_acked"): (bool, False, False),
+    ("backup", "replay_rows_per_second"): (int, 200, True),
+    ("backup", "replay_batch_size"): (int, 50, True),
+    ("backup", "replay_tap_pause_ms"): (int, 2000, True),
+
+    ("database", "connect_timeout"): (int, 3, True),
+    ("database", "probe_timeout_ms"): (int, 500, True),
+    ("database", "latency_slack_ms"): (float, 20.0, False),
+    ("database", "failback_probes"): (int, 3, False),
+    ("database", "health_port"): (int, 0, False),  # 0: MySQL-Port mit Begrüssung prüfen
+    ("database", "slow_query_ms"): (float, 200.0, True),
+
+    ("connection", "check_interval"): (int, 10, True),
+    ("connection", "backoff_base"): (float, 0.5, False),
+    ("connection", "backoff_max"): (float, 60.0, False),
+    ("connection", "breaker_failures"): (int, 3, False),
+    ("connection", "breaker_reset"): (float, 30.0, False),
+
+    ("heartbeat", "min_interval"): (int, 60, False),
+    ("heartbeat", "max_interval"): (int, 300, False),
+
+    ("rfid", "debounce_s"): (float, 2.0, True),
+    ("logging", "level"): (LOG_LEVELS, None, True),  # Ohne Eintrag: LOG_LEVEL aus der Umgebung
+    ("logging", "queue_size"): (int, 10000, False),
+    ("logging", "batch_size"): (int, 100, False),
+
+    ("animation", "enabled"): (bool, True, False),
+    ("animation", "frame_step"): (int, 2, False),
+    ("animation", "max_width"): (int, 480, False),
+
+    ("gpio", "led_success"): (int, 17, False),
+    ("gpio", "led_error"): (int, 27, False),
+    ("gpio", "led_status"): (int, 22, False),
+    ("gpio", "buzzer"): (int, 18, False),
+    ("gpio", "beep_ms"): (int, 80, False),
+}
+
+# inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class ConfigError(ValueError):
+    """
+    Die Konfigurationsdatei fehlt oder enthält ungültige Werte.
+    """
+
+
+def resolve_env(value):
+    """
+    Ersetzt einen Wert der Form ${VAR} durch die Umgebungsvariable VAR.
+    """
+    if value.startswith("${") and value.endswith("}"):
+        env_var = value[2:-1]  # Extract the variable name
+        value = os.getenv(env_var, '')  # Resolve the variable
+        if not value:
+            raise ValueError(f"Environment variable {env_var} is not set.")
+    return value
+
 
 def load_config(file_name="config.cnf"):
     """
-    Load configuration from a .cnf file located in the 'config' directory 
+    Load configuration from a .cnf file located in the 'config' directory
     and return a dictionary grouped by sections.
     """
     config = {}
@@ -50,11 +164,7 @@ def load_config(file_name="config.cnf"):
                     key, value = line.split("=", 1)
 
                     # If value references an environment variable, resolve it
-                    if value.startswith("${") and value.endswith("}"):
-                        env_var = value[2:-1]  # Extract the variable name
-                        value = os.getenv(env_var, '')  # Resolve the variable
-                        if not value:
-                            raise ValueError(f"Environment variable {env_var} is not set.")
+                    value = resolve_env(value.strip())
 
                     # Add to the current section or the main config
                     if current_section:
@@ -71,6 +181,202 @@ def load_config(file_name="config.cnf"):
     return config
 
 
+def _convert(kind, raw):
+    if kind is bool:
+        if raw.lower() not in configparser.ConfigParser.BOOLEAN_STATES:
+            raise ValueError(f"'{raw}' ist kein Wahrheitswert")
+        return configparser.ConfigParser.BOOLEAN_STATES[raw.lower()]
+    if isinstance(kind, tuple):
+        value = raw.upper() if kind is LOG_LEVELS else raw
+        if value not in kind:
+            raise ValueError(f"'{raw}' ist nicht erlaubt ({', '.join(kind)})")
+        return value
+    return kind(raw)
+
+
+def parse(path):
+    """
+    Liest und prüft eine Konfigurationsdatei. Gibt ein Dict
+    (Abschnitt, Schlüssel) -> typisierter Wert zurück; Schlüssel aus SCHEMA,
+    die fehlen, erhalten ihren Standardwert. Alle Fehler werden gesammelt
+    und zusammen als ConfigError gemeldet.
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            parser.read_file(f)
+    except FileNotFoundError:
+        raise ConfigError(f"Konfigurationsdatei {path} nicht gefunden.")
+    except configparser.Error as e:
+        raise ConfigError(f"Konfigurationsdatei {path} ist ungültig: {e}")
+
+    values = {}
+    errors = []
+    for section in parser.sections():
+        for key, raw in parser.items(section):
+            try:
+                raw = resolve_env(raw)
+            except ValueError as e:
+                errors.append(f"[{section}] {key}: {e}")
+                continue
+            spec = SCHEMA.get((section, key))
+            if spec is None:
+                values[(section, key)] = raw  # Unbekannte Schlüssel bleiben Text
+                continue
+            try:
+                values[(section, key)] = _convert(spec[0], raw)
+            except ValueError as e:
+                errors.append(f"[{section}] {key}: {e}")
+
+    for (section, key), (_, default, _) in SCHEMA.items():
+        if (section, key) in values:
+            continue
+        if default is REQUIRED:
+            errors.append(f"[{section}] {key}: fehlt")
+        else:
+            values[(section, key)] = default
+
+    if errors:
+        raise ConfigError(f"Fehler in {path}: " + "; ".join(errors))
+    return values
+
+
+class Settings:
+    """
+    Geprüfte Konfiguration mit typisierten Werten.
+
+    `value` ist ein Dict-Zugriff ohne Sperre und darf auch im Tap-Pfad
+    aufgerufen werden. Ein Reload ersetzt das Dict als Ganzes.
+    """
+
+    def __init__(self, path=CONFIG_PATH):
+        self.path = path
+        self.reloads = 0
+        self._values = {}
+        self._listeners = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def load(self):
+        """
+        Liest die Datei (einmal beim Start). Fehler führen zu einem ConfigError.
+        """
+        load_dotenv()  # Variablen aus .env für ${VAR} verfügbar machen
+        self._values = parse(self.path)
+        return self
+
+    def value(self, section, key):
+        """
+        Gibt den typisierten Wert eines Schlüssels zurück.
+        """
+        return self._values[(section, key)]
+
+    def get(self, section, key, fallback=None):
+        """
+        Wie `value`, aber mit `fallback` für Schlüssel ausserhalb von SCHEMA.
+        """
+        return self._values.get((section, key), fallback)
+
+    def on_change(self, section, key, callback):
+        """
+        Ruft `callback(neuer_wert)` auf, wenn der Schlüssel per Hot Reload
+        geändert wurde. Nur für Schlüssel, die ohne Neustart änderbar sind.
+        """
+        if not SCHEMA.get((section, key), (None, None, False))[2]:
+            raise ValueError(f"[{section}] {key} kann nicht ohne Neustart geändert werden.")
+        self._listeners.setdefault((section, key), []).append(callback)
+
+    def reload(self):
+        """
+        Liest die Datei neu und übernimmt geänderte Schlüssel, die ohne Neustart
+        änderbar sind. Eine ungültige Datei wird verworfen, die bisherigen Werte
+        bleiben. Gibt die Liste der übernommenen Schlüssel zurück.
+        """
+        with self._lock:
+            try:
+                new_values = parse(self.path)
+            except ConfigError as e:
+                config_logger.error(f"[Config] Neue Konfiguration verworfen: {e}")
+                return []
+
+            values = dict(self._values)
+            applied = []
+            for name in set(values) | set(new_values):
+                old, new = values.get(name), new_values.get(name)
+                if old == new:
+                    continue
+                if SCHEMA.get(name, (None, None, False))[2]:
+                    values[name] = new
+                    applied.append(name)
+                else:
+                    config_logger.warning(
+                        f"[Config] [{name[0]}] {name[1]} geändert, wird erst nach einem Neustart übernommen."
+                    )
+            self._values = values
+            self.reloads += 1
+
+        for name in applied:
+            config_logger.info(f"[Config] [{name[0]}] {name[1]} = {values[name]} übernommen.")
+            for callback in self._listeners.get(name, ()):
+                try:
+                    callback(values[name])
+                except Exception as e:
+                    config_logger.error(f"[Config] Fehler beim Übernehmen von [{name[0]}] {name[1]}: {e}")
+        return applied
+
+    def watch(self, poll_interval=5):
+        """
+        Startet die Überwachung der Datei im Hintergrund (inotify, sonst
+        Abfrage der Änderungszeit alle `poll_interval` Sekunden).
+        """
+        self._thread = threading.Thread(target=self._watch, args=(poll_interval,),
+                                        name="ConfigWatchThread", daemon=True)
+        self._thread.start()
+
+    def _watch(self, poll_interval):
+        try:
+            self._watch_inotify()
+        except OSError as e:
+            config_logger.warning(f"[Config] inotify nicht verfügbar, Datei wird abgefragt: {e}")
+        self._watch_polling(poll_interval)
+
+    def _watch_inotify(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        # Verzeichnis überwachen: Editoren ersetzen die Datei oft per Umbenennen
+        directory = os.path.dirname(self.path) or "."
+        if libc.inotify_add_watch(fd, directory.encode(), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            os.close(fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch")
+
+        file_name = os.path.basename(self.path).encode()
+        while True:
+            data = os.read(fd, 4096)
+            offset = 0
+            changed = False
+            while offset + INOTIFY_EVENT.size <= len(data):
+                _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+                changed = changed or name == file_name
+                offset += INOTIFY_EVENT.size + length
+            if changed:
+                time.sleep(0.2)  # Mehrere Schreibvorgänge eines Editors zusammenfassen
+                self.reload()
 
+    def _watch_polling(self, poll_interval):
+        last_mtime = None
+        while True:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if last_mtime is not None and mtime is not None and mtime != last_mtime:
+                self.reload()
+            last_mtime = mtime if mtime is not None else last_mtime
+            time.sleep(poll_interval)
 
 
+# Einmal pro Prozess laden; alle Module verwenden dieses Objekt
+config = Settings().load()
@@ -11,70 +11,97 @@ in die Datenbank.
 
 Changelog:
 - [29.11.24]: Erste Version.
-- [Datum]: Weitere Änderungen/Verbesserungen.
+- [19.10.26]: Lebenszeichen-Update läuft über einen vorbereiteten Befehl.
+- [19.10.26]: Automatischer Rückwechsel auf den bevorzugten Datenbank-Host (Failback).
+- [19.10.26]: Erreichbarkeit ohne ip/ping-Prozesse prüfen: Route aus /proc, TCP auf den DB-Port.
+- [19.10.26]: Backup nach dem Wiederverbinden über den Replay-Worker einspielen.
+- [19.10.26]: Netlink-Ereignisse statt fester 10 s, Backoff mit Jitter und Circuit Breaker.
+- [19.10.26]: Lebenszeichen als ein Upsert mit Gerätestatus über HeartbeatScheduler (heartbeat.py).
+- [19.10.26]: Verbindungszustand über ConnectionStateMachine statt direkt in conn_ref (connection_state.py).
+- [19.10.26]: connection_checker braucht kein Tk-Fenster mehr (Headless-Oberfläche, ui/).
+- [19.10.26]: Einstellungen aus der zentralen Konfiguration, Prüfintervall ohne Neustart änderbar (config_loader.py).
+- [19.10.26]: Zusätzlicher FileHandler entfernt, connection.log wird über die Log-Queue geschrieben (logger_config.py).
+- [19.10.26]: Offline höchstens check_interval warten; Backoff und Breaker gelten nur für den Verbindungsaufbau.
+- [19.10.26]: Failback verbindet gezielt zum gewählten Host, gleiches Kriterium wie beim Verbinden.
+- [19.10.26]: Mit Verbindung nur ping statt TCP-Prüfung aller Hosts (max_connect_errors).
 
 ===============================================================================
 """
 
 
 import logging
-import time
-import subprocess
-from database import connect_to_database, process_backup_data
+from netprobe import default_gateway
+from netlink_monitor import NetlinkMonitor
+from retry import Backoff, CircuitBreaker
+from database import connect_to_database, get_host_selector, get_outbox, process_backup_data
+from heartbeat import HeartbeatScheduler
+from connection_state import ConnectionStateMachine
 
 import os
-import re
 import threading
-import configparser
+import time
+from config_loader import config
 from datetime import datetime
 
 # Thread-Sicherheits-Lock
 conn_lock = threading.Lock()
 
+# Einziger Ort, an dem der Verbindungszustand geändert wird (main.py bindet conn_ref)
+connection_state = ConnectionStateMachine()
+
 # Lade Gerätenamen aus der Konfigurationsdatei
-config = configparser.ConfigParser()
-config_path = 'config/config.cnf'
-config.read(config_path)
-device_name = config['device']['name']
+device_name = config.value('device', 'name')
+
+# Prüfintervall bei bestehender Verbindung (connection.check_interval, ohne Neustart änderbar);
+# Netzwerkänderungen lösen sofort eine Prüfung aus
+network_monitor = NetlinkMonitor()
+reconnect_backoff = Backoff(
+    base=config.value('connection', 'backoff_base'),
+    maximum=config.value('connection', 'backoff_max'),
+)
+heartbeat = HeartbeatScheduler(
+    device_name,
+    min_interval=config.value('heartbeat', 'min_interval'),
+    max_interval=config.value('heartbeat', 'max_interval'),
+)
+connect_breaker = CircuitBreaker(
+    failure_threshold=config.value('connection', 'breaker_failures'),
+    reset_timeout=config.value('connection', 'breaker_reset'),
+)
+# Frühester nächster Verbindungsaufbau (Backoff); der TCP-Test läuft unabhängig davon im normalen Takt
+_next_connect_at = 0.0
 
 # Initialisiere Logger
 connection_logger = logging.getLogger("connection_logger")
 connection_logger.setLevel(logging.INFO)
-connection_file_handler = logging.FileHandler("logs/connection.log")
-connection_logger.addHandler(connection_file_handler)
 
 
 def get_default_gateway():
     """
-    Ruft das Standard-Gateway des Systems ab.
+    Ruft das Standard-Gateway des Systems ab (aus /proc/net/route, ohne externen Prozess).
     """
-    try:
-        
-        result = subprocess.check_output("ip route show default", shell=True).decode()
-        match = re.search(r'default via (\S+)', result)
-        if match:
-            return match.group(1)
-        else:
-            connection_logger.warning("[get_default_gateway] Standard-Gateway nicht gefunden.")
-            return None
-    except Exception as e:
-        connection_logger.error(f"[get_default_gateway] Fehler beim Abrufen des Gateways: {e}")
-        return None
+    gateway = default_gateway()
+    if gateway is None:
+        connection_logger.warning("[get_default_gateway] Standard-Gateway nicht gefunden.")
+    return gateway
 
-def can_ping():
+def can_reach_server():
     """
-    Überprüft, ob das Standard-Gateway erreichbar ist (Ping-Test).
+    Überprüft, ob eine Standardroute existiert und mindestens ein Datenbank-Host
+    auf seinem Port antwortet (TCP-Verbindungsaufbau statt Ping auf das Gateway).
     """
-    gateway = get_default_gateway()
-    if not gateway:
-        connection_logger.warning("[can_ping] Standard-Gateway nicht gefunden. Offline-Modus aktiviert.")
+    if not get_default_gateway():
+        connection_logger.warning("[can_reach_server] Standard-Gateway nicht gefunden. Offline-Modus aktiviert.")
         return False
     try:
-        subprocess.run(["ping", "-c", "1", gateway], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        return True
-    except subprocess.CalledProcessError:
-        connection_logger.warning(f"[can_ping] Gateway nicht erreichbar: {gateway}")
+        latencies = get_host_selector().probe_all()
+    except ValueError as e:
+        connection_logger.error(f"[can_reach_server] Konfigurationsfehler: {e}")
         return False
+    if any(latency is not None for latency in latencies.values()):
+        return True
+    connection_logger.warning("[can_reach_server] Kein Datenbank-Host erreichbar.")
+    return False
 
 def is_connection_alive(conn):
     """
@@ -87,106 +114,192 @@ def is_connection_alive(conn):
         connection_logger.error(f"[is_connection_alive] Fehler bei der Überprüfung der Verbindung: {e}")
         return False
 
-def connection_checker(conn_ref, root):
+def connection_checker(conn_ref, replay_worker=None):
     """
-    Überprüft regelmäßig die Netzwerkverbindung und die Datenbankverbindung.
+    Überprüft die Netzwerkverbindung und die Datenbankverbindung.
     Wenn die Verbindung verloren geht, wird sie wiederhergestellt und die Sicherung verarbeitet.
+    Mit einem Replay-Worker wird die Sicherung nur angestossen und im Hintergrund eingespielt.
+
+    Geprüft wird sofort bei jeder Netzwerkänderung (Netlink), sonst alle
+    `check_interval` Sekunden. Eine bestehende Verbindung wird nur mit ping
+    geprüft; alle Hosts werden nur ohne Verbindung oder bei möglichem Failback
+    angewählt (MySQL zählt jede Prüfung gegen max_connect_errors). Nur der Verbindungsaufbau hat exponentielles
+    Backoff und einen Circuit Breaker; die Wartezeit bis zur nächsten Prüfung
+    ist nie länger als `check_interval`. Wird der Server wieder erreichbar,
+    werden Backoff und Breaker zurückgesetzt.
     """
     was_offline = False
+    network_monitor.start()
     while True:
+        online = False
+        reachable = False
         try:
-            # Überprüft die Netzwerkverbindung
-            if not can_ping():
-                if not was_offline:
-                    connection_logger.warning("[Connection Checker] Ping fehlgeschlagen. Offline-Modus aktiviert.")
-                    conn_ref['is_connected'] = False
-                was_offline = True
-                
-                time.sleep(10)
-                continue
-
-            if was_offline:
-                connection_logger.info("[Connection Checker] Ping erfolgreich. Verarbeite Sicherung.")
-                process_backup_data(conn_ref.get('conn'))  # Daten verarbeiten, wenn wieder online
-                was_offline = False
-                
-
+            # Bestehende Verbindung: nur ping, die Hosts werden nicht zusätzlich angewählt
             with conn_lock:
                 conn = conn_ref.get('conn')
-                if conn is None or not is_connection_alive(conn):
-                    connection_logger.warning("[Connection Checker] Datenbankverbindung verloren.")
-                    conn_ref['conn'] = connect_to_database()
-
-                    if conn_ref['conn']:
-                        conn_ref['is_connected'] = True
-                        connection_logger.info("[Connection Checker] Verbindung wiederhergestellt.")
-                        insert_initial_log(conn_ref['conn'])  # Sicherstellen, dass der initiale Log-Eintrag existiert
-                        
-                    else:
-                        conn_ref['is_connected'] = False
-                        connection_logger.warning("[Connection Checker] Verbindung konnte nicht wiederhergestellt werden.")
-                        
+                alive = conn is not None and is_connection_alive(conn)
+                if alive:
+                    online = reachable = True
+                    connection_state.update(connected=True, degraded=using_fallback_host(),
+                                            reason="Verbindung geprüft")
+                    # Lebenszeichen nur, wenn es fällig ist (höchstens einmal pro Intervall)
+                    log_alive(conn)
+                    # Die anderen Hosts werden nur geprüft, solange ein Failback möglich ist
+                    failback(conn_ref)
+
+            if alive:
+                if was_offline:
+                    connection_logger.info("[Connection Checker] Verbindung wieder aktiv. Verarbeite Sicherung.")
+                    wake_replay(conn_ref, replay_worker)
+                    was_offline = False
+            else:
+                # Ohne Verbindung: Erreichbarkeit der Hosts prüfen, dann neu verbinden
+                reachable = can_reach_server()
+                if not reachable:
+                    if not was_offline:
+                        connection_logger.warning("[Connection Checker] Server nicht erreichbar. Offline-Modus aktiviert.")
+                        connection_state.update(connected=False, reason="Server nicht erreichbar")
+                    was_offline = True
                 else:
-                    conn_ref['is_connected'] = True
-                    # Aufruf von log_alive für die Lebenszeichen-Überprüfung
-                    log_alive(conn)  # Dies wird das Lebenszeichen protokollieren und die Datenbank aktualisieren
+                    if was_offline:
+                        connection_logger.info("[Connection Checker] Server wieder erreichbar. Verarbeite Sicherung.")
+                        reset_reconnect()  # Der TCP-Test war erfolgreich, sofort verbinden
+                        wake_replay(conn_ref, replay_worker)
+                        was_offline = False
+
+                    with conn_lock:
+                        connection_logger.warning("[Connection Checker] Datenbankverbindung verloren.")
+                        connection_state.update(connected=False, reason="Datenbankverbindung verloren")
+                        if reconnect(conn_ref):
+                            online = True
+                            if replay_worker:
+                                replay_worker.wake()
 
         except Exception as e:
             connection_logger.error(f"[Connection Checker] Ausnahme aufgetreten: {e}")
 
-        time.sleep(10)  # Verzögerung bis zur nächsten Iteration
+        delay = config.value('connection', 'check_interval')
+        if reachable and not online:
+            # Erreichbar, aber nicht verbunden: beim nächsten erlaubten Verbindungsaufbau prüfen
+            retry_in = max(_next_connect_at - time.monotonic(), connect_breaker.retry_in(), reconnect_backoff.base)
+            delay = min(delay, retry_in)
+
+        # Bis zur nächsten Prüfung warten, bei einer Netzwerkänderung sofort weiter
+        if network_monitor.wait(delay):
+            reset_reconnect()
+
+
+def wake_replay(conn_ref, replay_worker=None):
+    """
+    Stösst das Einspielen der Sicherung an (im Hintergrund, falls ein Replay-Worker läuft).
+    """
+    if replay_worker:
+        replay_worker.wake()
+    else:
+        process_backup_data(conn_ref.get('conn'))  # Daten verarbeiten, wenn wieder online
+
+
+def reset_reconnect():
+    """
+    Erlaubt sofort einen neuen Verbindungsaufbau (Backoff und Circuit Breaker
+    zurückgesetzt), z.B. nach einer Netzwerkänderung.
+    """
+    global _next_connect_at
+    _next_connect_at = 0.0
+    reconnect_backoff.reset()
+    connect_breaker.reset()
+
+
+def reconnect(conn_ref):
+    """
+    Baut die Datenbankverbindung neu auf, sofern Backoff und Circuit Breaker
+    es zulassen. Muss mit gehaltenem `conn_lock` aufgerufen werden.
+    Gibt True bei Erfolg zurück.
+    """
+    global _next_connect_at
+    if time.monotonic() < _next_connect_at or not connect_breaker.allow():
+        return False
+
+    conn_ref['conn'] = connect_to_database()
+    if conn_ref['conn']:
+        connect_breaker.record_success()
+        reconnect_backoff.reset()
+        _next_connect_at = 0.0
+        connection_state.update(connected=True, degraded=using_fallback_host(),
+                                reason="Verbindung wiederhergestellt")
+        connection_logger.info("[Connection Checker] Verbindung wiederhergestellt.")
+        log_alive(conn_ref['conn'], force=True)  # Wiederverbindung sofort melden
+        return True
+
+    connect_breaker.record_failure()
+    _next_connect_at = time.monotonic() + reconnect_backoff.next_delay()
+    connection_state.update(connected=False, reason="Verbindungsaufbau fehlgeschlagen")
+    if connect_breaker.state == CircuitBreaker.OPEN:
+        connection_logger.warning(
+            f"[Connection Checker] Verbindung konnte nicht wiederhergestellt werden. "
+            f"Nächster Versuch frühestens in {connect_breaker.reset_timeout:.0f} s."
+        )
+    else:
+        connection_logger.warning("[Connection Checker] Verbindung konnte nicht wiederhergestellt werden.")
+    return False
+
+
+def failback(conn_ref):
+    """
+    Wechselt zurück auf einen bevorzugten Datenbank-Host, sobald dieser wieder
+    stabil erreichbar ist. Muss mit gehaltenem `conn_lock` aufgerufen werden.
+    """
+    selector = get_host_selector()
+    host = selector.failback_due()
+    if host is None or host == selector.current:
+        return
+
+    connection_logger.info(f"[Connection Checker] Bevorzugter Host {host[0]}:{host[1]} wieder erreichbar. Wechsle zurück.")
+    new_conn = connect_to_database(hosts=[host])
+    if new_conn is None:
+        return
+    try:
+        conn_ref['conn'].close()
+    except Exception:
+        pass  # Die alte Verbindung wird ohnehin ersetzt
+    conn_ref['conn'] = new_conn
+    connection_state.update(connected=True, degraded=using_fallback_host(), reason="Failback")
+    log_alive(new_conn, force=True)
+
+
+def using_fallback_host():
+    """
+    Gibt True zurück, wenn die Verbindung nicht zum bevorzugten (ersten) Host besteht.
+    """
+    selector = get_host_selector()
+    return selector.current is not None and selector.current != selector.hosts[0]
 
 
-def log_alive(conn):
+def log_alive(conn, force=False):
     """
-    Protokolliert ein Lebenszeichen für die Datenbank und aktualisiert die Lebenszeichen-Überprüfung.
+    Schreibt das Lebenszeichen mit dem Gerätestatus, sofern es fällig ist
+    (siehe heartbeat.py). Mit `force` wird es sofort geschrieben, z.B. nach
+    einem Wiederverbinden. Gibt False zurück, wenn das Schreiben fehlschlug.
     """
-    connection_logger = logging.getLogger("connection_logger")
-    
-    # Loggt den Gerätenamen für die Lebenszeichen-Überprüfung
-    connection_logger.info(f"[log_alive] Verwendeter Gerätename: {device_name}")
-    
     # Wenn die Verbindung nicht aktiv ist, wird die Überprüfung übersprungen
     if conn is None or not conn.is_connected():
         connection_logger.warning("[log_alive] Verbindung ist nicht aktiv. Lebenszeichen-Überprüfung übersprungen.")
-        return
+        return False
 
     try:
-        # Sicherstellen, dass der Geräte-Eintrag in der Datenbank vorhanden ist, bevor das Lebenszeichen aktualisiert wird
-        insert_initial_log(conn)  # Fügt den Eintrag hinzu, falls er nicht existiert
-
-        # Führen Sie nun die übliche Lebenszeichen-Protokollierung durch
-        cursor = conn.cursor()
-        sql_update = "UPDATE z_sys_alive_check SET alive_lastcheck = NOW() WHERE alive_system = %s"
-        values = (device_name,)
-        cursor.execute(sql_update, values)
-        conn.commit()
-        cursor.close()
-        connection_logger.info(f"[log_alive] Lebenszeichen erfolgreich protokolliert für Gerät: {device_name}")
-
+        heartbeat.beat(conn, device_status(), force=force)
+        return True
     except Exception as e:
         connection_logger.error(f"[log_alive] Fehler beim Protokollieren des Lebenszeichens: {e}")
-        conn_ref['conn'] = None  # Markiere die Verbindung als verloren, falls ein Fehler auftritt
+        return False
+
 
-def insert_initial_log(conn):
+def device_status():
     """
-    Fügt eine erste Zeile in die Tabelle z_sys_alive_check ein, wenn sie noch nicht existiert.
+    Gerätestatus, der mit dem Lebenszeichen geschrieben wird.
     """
     try:
-        # Loggt den Gerätenamen beim Einfügen oder Aktualisieren des Logs
-        connection_logger.info(f"[insert_initial_log] Verwendeter Gerätename: {device_name}")
-        
-        cursor = conn.cursor()
-        # Fügt den Eintrag für das System ein oder aktualisiert ihn
-        sql_insert = """
-        INSERT INTO z_sys_alive_check (alive_system, alive_lastcheck)
-        VALUES (%s, NOW())
-        ON DUPLICATE KEY UPDATE alive_lastcheck = NOW()
-        """
-        values = (device_name,)
-        cursor.execute(sql_insert, values)
-        conn.commit()
-        cursor.close()
-        connection_logger.info(f"Erster Lebenszeichen-Log für Gerät eingefügt oder aktualisiert: {device_name}")
-    except Exception as e:
-        connection_logger.error(f"Fehler beim Einfügen oder Aktualisieren des ersten Lebenszeichen-Logs für Gerät {device_name}: {e}")
+        backlog = get_outbox().pending_count()
+    except Exception:
+        backlog = None  # Der Status soll das Lebenszeichen nie verhindern
+    return {"status": connection_state.state, "backlog": backlog}
@@ -0,0 +1,139 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: connection_state.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Zustandsautomat für die Serververbindung. Die Threads melden nur noch ihre
+Beobachtungen (verbunden, eingeschränkt, Backup wird eingespielt), der
+Automat leitet daraus einen einzigen Zustand ab, hält ihn unter einem Lock
+und benachrichtigt Abonnenten bei jedem Wechsel. Jeder Wechsel wird mit
+Zeitstempel und Grund für die Diagnose festgehalten.
+
+Zustände:
+    ONLINE     verbunden mit dem bevorzugten Datenbank-Host
+    DEGRADED   verbunden, aber mit einem Ausweich-Host (Failover)
+    REPLAYING  verbunden, das Offline-Backup wird eingespielt
+    OFFLINE    keine Verbindung, Stempel gehen ins Backup
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+state_logger = logging.getLogger("connection_logger")
+
+ONLINE = "ONLINE"
+DEGRADED = "DEGRADED"
+REPLAYING = "REPLAYING"
+OFFLINE = "OFFLINE"
+
+
+class ConnectionStateMachine:
+    """
+    Hält den Verbindungszustand und benachrichtigt Abonnenten bei Wechseln.
+
+    Abonnenten werden im Thread aufgerufen, der den Wechsel auslöst, und
+    müssen daher selbst in ihren Thread wechseln (z.B. das GUI).
+    """
+
+    def __init__(self, history_size=100):
+        self._connected = False
+        self._degraded = False
+        self._replaying = False
+        self._state = OFFLINE
+        self._conn_ref = None
+        self._subscribers = []
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def bind(self, conn_ref):
+        """
+        Spiegelt den Zustand in `conn_ref['is_connected']`, das von den
+        übrigen Threads gelesen wird. Geschrieben wird es nur noch hier.
+        """
+        with self._lock:
+            self._conn_ref = conn_ref
+            conn_ref['is_connected'] = self._connected
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def is_connected(self):
+        return self._connected
+
+    def update(self, connected=None, degraded=None, replaying=None, reason=""):
+        """
+        Meldet eine Beobachtung. Nicht angegebene Werte bleiben unverändert.
+        Gibt den (eventuell neuen) Zustand zurück.
+        """
+        with self._lock:
+            if connected is not None:
+                self._connected = connected
+                if self._conn_ref is not None:
+                    self._conn_ref['is_connected'] = connected
+            if degraded is not None:
+                self._degraded = degraded
+            if replaying is not None:
+                self._replaying = replaying
+
+            old_state, self._state = self._state, self._derive()
+            if old_state == self._state:
+                return self._state
+            self._history.append((datetime.now(), old_state, self._state, reason))
+            subscribers = list(self._subscribers)
+            new_state = self._state
+
+        state_logger.info(f"[ConnectionState] {old_state} -> {new_state} ({reason or 'ohne Grund'})")
+        for callback in subscribers:
+            try:
+                callback(old_state, new_state, reason)
+            except Exception as e:
+                state_logger.error(f"[ConnectionState] Fehler in einem Abonnenten: {e}")
+        return new_state
+
+    def subscribe(self, callback, notify_current=True):
+        """
+        Registriert `callback(alter_zustand, neuer_zustand, grund)`. Mit
+        `notify_current` wird der aktuelle Zustand sofort gemeldet (alter Zustand None).
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+            state = self._state
+        if notify_current:
+            callback(None, state, "")
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def history(self):
+        """
+        Gibt die letzten Wechsel als Liste von Dictionaries zurück (älteste zuerst).
+        """
+        with self._lock:
+            return [
+                {"time": time.isoformat(timespec="milliseconds"), "from": old, "to": new, "reason": reason}
+                for time, old, new, reason in self._history
+            ]
+
+    def _derive(self):
+        if not self._connected:
+            return OFFLINE
+        if self._replaying:
+            return REPLAYING
+        if self._degraded:
+            return DEGRADED
+        return ONLINE
@@ -10,18 +10,42 @@ Hier werden alle Datenbankoperationen und die Verbindung zur Verfügung gestellt
 
 Changelog:
 - [29.11.24]: Erste Version.
-- [Datum]: Weitere Änderungen/Verbesserungen.
+- [19.10.26]: Häufige Abfragen laufen über vorbereitete Befehle (statements.py).
+- [19.10.26]: Offline-Backup in SQLite-Outbox statt JSON-Datei (outbox.py).
+- [19.10.26]: Gebündelte Wiederholung des Backups mit executemany.
+- [19.10.26]: Segmentiertes Backup-Log mit Checkpoints als Alternative (backup_log.py).
+- [19.10.26]: Stempel mit Scan-ID, idempotent über ON DUPLICATE KEY (Migration 001).
+- [19.10.26]: replay_claimed für das Write-Behind-Journal (stamp_writer.py) freigegeben.
+- [19.10.26]: Tageszählung als Bereichsabfrage, damit der Index greift (Migration 002).
+- [19.10.26]: Lebenszeichen-Update hierher verschoben (für storage.MySQLBackend).
+- [19.10.26]: Laufzeit jeder Abfrage und jedes Commits messen, Slow-Query-Log (query_metrics.py).
+- [19.10.26]: Mehrere Datenbank-Hosts mit paralleler Prüfung, Failover und Failback (failover.py).
+- [19.10.26]: Lebenszeichen als ein Upsert mit Gerätestatus, Zeitpunkt des letzten Stempels (Migration 004).
+- [19.10.26]: Einstellungen aus der zentralen Konfiguration, Timeouts ohne Neustart änderbar (config_loader.py).
+- [19.10.26]: write_to_backup_file meldet zurück, ob der Eintrag gespeichert wurde.
+- [19.10.26]: Eingespielte Migrationen beim Verbinden prüfen; ohne 001 keine Verbindung, ohne 004 einfaches Lebenszeichen.
+- [19.10.26]: Verbindungsaufbau wählt die Hosts nicht doppelt an (Prüfung aus failover.HostSelector weiterverwenden).
+- [19.10.26]: connect_to_database kann gezielt zu bestimmten Hosts verbinden (Failback).
+- [19.10.26]: Optionaler Health-Port für die Prüfung der DB-Hosts ([database] health_port).
+- [19.10.26]: Backup-Meldungen über den sql_logger statt print.
 
 ===============================================================================
 """
 
 import logging
-import json
-import configparser
-from mysql.connector import connect, Error
+from config_loader import config
+import threading
+import time
+import uuid
+from datetime import datetime
+from mysql.connector import connect, Error, InterfaceError, OperationalError, ProgrammingError
 from logger_config import LoggerConfig
+from statements import StatementRegistry
+from query_metrics import QueryMetrics
+from outbox import Outbox
+from backup_log import SegmentLog
+from failover import HostSelector, parse_hosts
 import os
-import tempfile
 from dotenv import load_dotenv
 
 # Konfiguriere Logging
@@ -30,14 +54,117 @@ logger_config.configure()
 sql_log = logger_config.get_logger("sql_logger")
 
 # Lade Gerätenamen aus der Konfigurationsdatei
-config = configparser.ConfigParser()
-config_path = 'config/config.cnf'
-config.read(config_path)
-device_name = config['device']['name']
-device_user = config['device']['username']
+device_name = config.value('device', 'name')
+device_user = config.value('device', 'username')
 
 
+# Alte JSON-Lines-Backup-Datei, wird beim ersten Start in die Outbox importiert
 BACKUP_FILE = 'backup/backup.json'
+BACKUP_DB = 'backup/outbox.db'
+BACKUP_SEGMENT_DIR = 'backup/segments'
+# "sqlite" (Outbox) oder "segments" (segmentiertes Log mit Checkpoints)
+BACKUP_STORE = config.value('backup', 'store')
+BACKUP_MAX_ROWS = config.value('backup', 'max_rows')
+BACKUP_BATCH_SIZE = config.value('backup', 'batch_size')
+BACKUP_BATCH_REPLAY = config.value('backup', 'batch_replay')
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+# Zeitpunkt des letzten erfolgreich geschriebenen Stempels (ersetzt ein Lebenszeichen)
+_last_stamp_commit = None
+
+# Verbindungsaufbau: kurze Timeouts, damit ein ausgefallener Host nur Sekunden kostet
+# (database.connect_timeout und probe_timeout_ms werden bei jeder Verwendung gelesen, ohne Neustart änderbar)
+DB_LATENCY_SLACK_MS = config.value('database', 'latency_slack_ms')
+DB_FAILBACK_PROBES = config.value('database', 'failback_probes')
+
+_host_selector = None
+_host_selector_lock = threading.Lock()
+
+# Migrationen (tools/migrate.py, Tabelle z_sys_schema_migration), die das Terminal voraussetzt
+STAMP_MIGRATION = "001_stamp_scan_id.sql"  # sta_scan_id für alle Stempel
+HEARTBEAT_MIGRATION = "004_alive_status.sql"  # Statusspalten für das Lebenszeichen
+REQUIRED_MIGRATIONS = (STAMP_MIGRATION, HEARTBEAT_MIGRATION)
+_missing_migrations = None  # Ergebnis der letzten Prüfung, None = noch nicht geprüft
+
+# Laufzeitmessung aller Abfragen und Commits; langsamere Befehle landen im sql_logger
+query_metrics = QueryMetrics(
+    slow_threshold_ms=config.value('database', 'slow_query_ms'),
+)
+config.on_change('database', 'slow_query_ms',
+                 lambda value: setattr(query_metrics, 'slow_threshold_ms', value))
+
+# Vorbereitete Befehle für den Stempelpfad (werden pro Verbindung einmal vorbereitet)
+statements = StatementRegistry(metrics=query_metrics)
+statements.register(
+    "check_rfid_exists",
+    "SELECT peke_id FROM person_key WHERE peke_key_id = %s",
+)
+statements.register(
+    "get_peke_key_id",
+    "SELECT peke_key_id FROM person_key WHERE peke_key_id = %s",
+)
+statements.register(
+    "get_person_name_from_uid",
+    """
+        SELECT p.pers_vorname, p.pers_nachname
+        FROM person_key pk
+        JOIN person p ON pk.peke_pers_id = p.pers_id
+        WHERE pk.peke_key_id = %s
+    """,
+)
+statements.register(
+    "get_time_clock_count",
+    """
+        SELECT COUNT(*)
+        FROM stamp
+        WHERE sta_key_id = %s
+          AND sta_stempel_zeit >= CURDATE()
+          AND sta_stempel_zeit < CURDATE() + INTERVAL 1 DAY
+    """,
+)
+# Stempel tragen eine auf dem Terminal erzeugte Scan-ID (eindeutiger Schlüssel,
+# siehe migrations/001_stamp_scan_id.sql). Wiederholungen sind damit idempotent.
+statements.register(
+    "create_stamp_entry",
+    "INSERT INTO stamp (sta_key_id, sta_ort, sta_stempel_zeit, sta_crt_usr, sta_scan_id) "
+    "VALUES (%s, %s, NOW(), %s, %s) "
+    "ON DUPLICATE KEY UPDATE sta_scan_id = sta_scan_id",
+)
+# Ein Upsert legt die Zeile bei Bedarf an und schreibt Lebenszeichen und Gerätestatus
+# (siehe migrations/004_alive_status.sql). Fehlende Statuswerte bleiben unverändert.
+statements.register(
+    "heartbeat",
+    """
+        INSERT INTO z_sys_alive_check
+            (alive_system, alive_lastcheck, alive_status, alive_backlog,
+             alive_last_stamp, alive_uptime_s, alive_interval_s)
+        VALUES (%s, NOW(), %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            alive_lastcheck = NOW(),
+            alive_status = COALESCE(VALUES(alive_status), alive_status),
+            alive_backlog = COALESCE(VALUES(alive_backlog), alive_backlog),
+            alive_last_stamp = COALESCE(VALUES(alive_last_stamp), alive_last_stamp),
+            alive_uptime_s = COALESCE(VALUES(alive_uptime_s), alive_uptime_s),
+            alive_interval_s = COALESCE(VALUES(alive_interval_s), alive_interval_s)
+    """,
+)
+# Einfaches Lebenszeichen, solange Migration 004 fehlt
+statements.register(
+    "heartbeat_legacy",
+    "UPDATE z_sys_alive_check SET alive_lastcheck = NOW() WHERE alive_system = %s",
+)
+# Variante für das Backup: die Stempelzeit kommt vom Terminal
+STAMP_BACKUP_SQL = (
+    "INSERT INTO stamp (sta_key_id, sta_ort, sta_stempel_zeit, sta_crt_usr, sta_scan_id) "
+    "VALUES (%s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE sta_scan_id = sta_scan_id"
+)
+statements.register(
+    "register_rfid_tag",
+    "INSERT INTO person_key (peke_key_id, peke_typ, peke_crt_user) VALUES (%s, %s, %s)",
+)
 
 # Load the .env file (automatically looks for a .env file in the root directory)
 load_dotenv()  # This will load environment variables from the .env file into the environment
@@ -58,27 +185,50 @@ def fetch_one(cursor, query, params):
     """
     Führt eine Abfrage aus und gibt ein einzelnes Ergebnis zurück.
     """
-    cursor.execute(query, params)
+    with query_metrics.timed("fetch_one", query, params):
+        cursor.execute(query, params)
     return cursor.fetchone()
 
 
+def get_outbox():
+    """
+    Öffnet den Backup-Speicher (Outbox oder segmentiertes Log) beim ersten
+    Zugriff und importiert dabei eine vorhandene JSON-Backup-Datei.
+    """
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            if BACKUP_STORE == 'segments':
+                _outbox = SegmentLog(
+                    BACKUP_SEGMENT_DIR,
+                    max_rows=BACKUP_MAX_ROWS,
+                    max_segment_bytes=config.value('backup', 'segment_bytes'),
+                    max_segment_age=config.value('backup', 'segment_age'),
+                    compress_acked=config.value('backup', 'compress_acked'),
+                )
+            else:
+                _outbox = Outbox(BACKUP_DB, max_rows=BACKUP_MAX_ROWS)
+            _outbox.import_json_lines(BACKUP_FILE)
+        return _outbox
+
+
 def write_to_backup_file(sql, values):
     """
-    Schreibt einen SQL-Befehl und seine Werte als JSON in die Backup-Datei.
+    Schreibt einen SQL-Befehl und seine Werte dauerhaft in die Backup-Outbox.
+    Gibt True zurück, wenn der Eintrag gespeichert wurde.
     """
     
     if sql is None or values is None:
-        print("Fehler: SQL-Befehl oder Werte sind None.")
-        return
+        sql_log.error("Fehler beim Schreiben ins Backup: SQL-Befehl oder Werte sind None.")
+        return False
     
     try:
-        with open(BACKUP_FILE, "a") as file:
-            # Make sure the values are properly formatted
-            json.dump({"sql": sql, "values": values}, file)
-            file.write("\n")
-        sql_log.info(f"Operation in Backup-Datei geschrieben: {sql} mit Werten {values}")
+        if get_outbox().append(sql, values):
+            sql_log.info(f"Operation in Backup geschrieben: {sql} mit Werten {values}")
+            return True
     except Exception as e:
-        sql_log.error(f"Fehler beim Schreiben in die Backup-Datei: {e}")
+        sql_log.error(f"Fehler beim Schreiben ins Backup: {e}")
+    return False
         
 def handle_backup(conn_ref, sql, values):
     """
@@ -87,83 +237,217 @@ def handle_backup(conn_ref, sql, values):
     """
     if conn_ref['conn'] is None or not conn_ref['conn'].is_connected():
         # Keine Datenbankverbindung: Schreibe den Befehl und die Werte in die Backup-Datei
-        print("[Backup] Keine Datenbankverbindung. Schreibe ins Backup.")
+        sql_log.warning("[Backup] Keine Datenbankverbindung. Schreibe ins Backup.")
         write_to_backup_file(sql, values)
         return True  # Gibt an, dass das Backup geschrieben wurde
     return False  # Kein Backup notwendig, wenn eine Verbindung vorhanden ist
 
-def process_backup_data(conn):
+def process_backup_data(conn, batch=None):
     """
-    Liest und verarbeitet Backup-Daten aus der Backup-Datei.
-    Löscht jede Eintragung nach der Verarbeitung, um Duplikate zu vermeiden.
+    Führt die Einträge der Backup-Outbox auf der Datenbank aus.
+    Erfolgreiche Einträge werden bestätigt und entfernt, fehlerhafte für einen
+    erneuten Versuch zurückgestellt. Bei Verbindungsverlust wird abgebrochen.
+
+    Im Batch-Modus (Standard) werden aufeinanderfolgende Einträge mit demselben
+    SQL-Befehl mit `executemany` und einem Commit pro Block ausgeführt.
     """
-    
-    if not os.path.exists(BACKUP_FILE):
-        sql_log.warning("[Backup] Keine Backup-Datei gefunden.")
+    if conn is None:
+        sql_log.warning("[Backup] Keine Datenbankverbindung. Backup-Verarbeitung übersprungen.")
         return
 
+    if batch is None:
+        batch = BACKUP_BATCH_REPLAY
+
     try:
+        outbox = get_outbox()
+        if not outbox.pending_count():
+            sql_log.info("[Backup] Keine Backup-Daten vorhanden.")
+            return
+
         sql_log.info("[Backup] Verarbeite Backup-Daten...")
-        
-        # Verwende eine temporäre Datei für sichere Updates
-        with open(BACKUP_FILE, "r") as f, tempfile.NamedTemporaryFile("w", delete=False) as temp_file:
-            temp_file_path = temp_file.name
-            for line_num, line in enumerate(f, start=1):
-                try:
-                    entry = json.loads(line.strip())
-                    sql = entry["sql"]
-                    values = entry["values"]
-
-                    cursor = conn.cursor()
-                    cursor.execute(sql, values)
-                    conn.commit()
-                    sql_log.info(f"[Backup] Zeile {line_num}: Ausgeführt: {sql} mit Werten {values}")
-                except json.JSONDecodeError:
-                    sql_log.error(f"[Backup] Ungültiges JSON in Zeile {line_num}: {line.strip()}")
-                    temp_file.write(line)  # Behalte fehlerhafte Zeilen für erneuten Versuch
-                except Exception as e:
-                    sql_log.error(f"[Backup] Fehler in Zeile {line_num}: {e}")
-                    temp_file.write(line)  # Behalte fehlerhafte Zeilen für erneuten Versuch
-
-        # Ersetze die alte Datei durch die temporäre Datei
-        os.replace(temp_file_path, BACKUP_FILE)
-        sql_log.info("[Backup] Backup-Verarbeitung abgeschlossen.")
+        start = time.perf_counter()
+        processed = 0
+        failed = 0
+        while True:
+            entries = outbox.claim(BACKUP_BATCH_SIZE if batch else 1)
+            if not entries:
+                break
+
+            try:
+                executed = replay_claimed(conn, outbox, entries, batch)
+                processed += executed
+                failed += len(entries) - executed
+            except (InterfaceError, OperationalError) as e:
+                # Verbindung verloren: noch nicht verarbeitete Einträge unverändert freigeben
+                sql_log.error(f"[Backup] Verbindungsfehler, Verarbeitung abgebrochen: {e}")
+                outbox.release([entry[0] for entry in entries])
+                break
+
+            if failed:
+                # Fehlerhafte Einträge nicht in derselben Verarbeitung erneut versuchen
+                break
+
+        elapsed = time.perf_counter() - start
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        sql_log.info(
+            f"[Backup] Backup-Verarbeitung abgeschlossen. {processed} Einträge ausgeführt, "
+            f"{failed} fehlerhaft, {elapsed:.2f} s ({rate:.0f} Zeilen/s)."
+        )
 
     except Exception as e:
         sql_log.error(f"[Backup] Unerwarteter Fehler: {e}")
 
 
+def replay_claimed(conn, store, entries, batch=True):
+    """
+    Führt bereits reservierte Einträge eines Backup-Speichers aus und bestätigt sie.
+    Gibt die Anzahl erfolgreich ausgeführter Einträge zurück. Verbindungsfehler
+    werden an den Aufrufer weitergegeben, der die Einträge wieder freigibt.
+    """
+    executed = 0
+    for sql, chunk in _group_by_sql(entries):
+        if batch:
+            chunk_executed = _replay_chunk(conn, store, sql, chunk)
+        else:
+            chunk_executed = sum(_replay_single(conn, store, entry) for entry in chunk)
+        if chunk_executed and sql == STAMP_BACKUP_SQL:
+            _note_stamp_commit()
+        executed += chunk_executed
+    return executed
+
+
+def _group_by_sql(entries):
+    """
+    Fasst aufeinanderfolgende Einträge mit identischem SQL-Befehl zusammen,
+    damit die Reihenfolge der Stempel erhalten bleibt.
+    """
+    groups = []
+    for entry in entries:
+        if groups and groups[-1][0] == entry[1]:
+            groups[-1][1].append(entry)
+        else:
+            groups.append((entry[1], [entry]))
+    return groups
+
+
+def _replay_single(conn, outbox, entry):
+    """
+    Führt einen einzelnen Backup-Eintrag aus. Gibt 1 bei Erfolg zurück, sonst 0.
+    """
+    entry_id, sql, values = entry
+    try:
+        cursor = conn.cursor()
+        with query_metrics.timed("backup_replay", sql, values):
+            cursor.execute(sql, values)
+        with query_metrics.timed("backup_replay:commit"):
+            conn.commit()
+        cursor.close()
+        outbox.ack([entry_id])
+        sql_log.debug(f"[Backup] Eintrag {entry_id} ausgeführt: {sql} mit Werten {values}")
+        return 1
+    except (InterfaceError, OperationalError):
+        raise
+    except Exception as e:
+        sql_log.error(f"[Backup] Fehler bei Eintrag {entry_id}: {e}")
+        conn.rollback()
+        outbox.fail([entry_id], e)
+        return 0
+
+
+def _replay_chunk(conn, outbox, sql, chunk):
+    """
+    Führt einen Block gleichartiger Einträge mit `executemany` und einem Commit aus.
+    Schlägt der Block fehl, wird er halbiert, bis die fehlerhaften Zeilen isoliert
+    sind. Gibt die Anzahl erfolgreich ausgeführter Einträge zurück.
+    """
+    if len(chunk) == 1:
+        return _replay_single(conn, outbox, chunk[0])
+
+    try:
+        cursor = conn.cursor()
+        with query_metrics.timed("backup_replay_batch", sql):
+            cursor.executemany(sql, [values for _, _, values in chunk])
+        with query_metrics.timed("backup_replay:commit"):
+            conn.commit()
+        cursor.close()
+        outbox.ack([entry_id for entry_id, _, _ in chunk])
+        sql_log.debug(f"[Backup] Block mit {len(chunk)} Einträgen ausgeführt: {sql}")
+        return len(chunk)
+    except (InterfaceError, OperationalError):
+        raise
+    except Exception as e:
+        sql_log.warning(f"[Backup] Block mit {len(chunk)} Einträgen fehlgeschlagen, wird geteilt: {e}")
+        conn.rollback()
+        middle = len(chunk) // 2
+        return (_replay_chunk(conn, outbox, sql, chunk[:middle])
+                + _replay_chunk(conn, outbox, sql, chunk[middle:]))
+
+
 # Datenbankinteraktionsfunktionen
-def check_rfid_exists(cursor, uid):
+def check_rfid_exists(conn, uid):
     """
     Überprüft, ob die RFID UID bereits in der Datenbank existiert.
     """
     sanitized_uid = sanitize_uid(uid)
-    query = "SELECT peke_id FROM person_key WHERE peke_key_id = %s"
-    return fetch_one(cursor, query, (sanitized_uid,))
+    return statements.fetch_one(conn, "check_rfid_exists", (sanitized_uid,))
+
 
+def new_scan_id():
+    """
+    Erzeugt eine weltweit eindeutige Scan-ID für einen Stempel (32 Hex-Zeichen).
+    """
+    return uuid.uuid4().hex
+
+
+def stamp_values(peke_key_id, scan_id, stamp_time):
+    """
+    Baut die Parameter für `STAMP_BACKUP_SQL` (Stempel mit Terminal-Zeit).
+    """
+    return (
+        sanitize_uid(peke_key_id),
+        device_name,
+        stamp_time.strftime('%Y-%m-%d %H:%M:%S'),
+        device_user,
+        scan_id,
+    )
 
-def create_stamp_entry(conn, cursor, peke_key_id):
+
+def queue_stamp(peke_key_id, scan_id, stamp_time):
+    """
+    Schreibt einen Stempel mit Terminal-Zeit ins Backup. Dank der Scan-ID
+    entsteht auch dann kein Duplikat, wenn der Stempel bereits auf dem Server ist.
+    """
+    write_to_backup_file(STAMP_BACKUP_SQL, stamp_values(peke_key_id, scan_id, stamp_time))
+
+
+def create_stamp_entry(conn, peke_key_id, scan_id=None, stamp_time=None):
    
     """
     Erstellt einen Stempel-Eintrag für die gegebene `peke_key_id`.
+    Schlägt das Schreiben fehl, wird der Stempel mit derselben Scan-ID ins Backup geschrieben.
     """
     sanitized_peke_key_id = sanitize_uid(peke_key_id)
-    sql = "INSERT INTO stamp (sta_key_id, sta_ort, sta_stempel_zeit, sta_crt_usr) VALUES (%s, %s, NOW(), %s)"
-    values = (sanitized_peke_key_id, device_name, device_user)
+    scan_id = scan_id or new_scan_id()
+    stamp_time = stamp_time or datetime.now()
+    values = (sanitized_peke_key_id, device_name, device_user, scan_id)
 
     if conn:
         try:
-            cursor.execute(sql, values)
-            conn.commit()
+            statements.execute(conn, "create_stamp_entry", values)
+            with query_metrics.timed("create_stamp_entry:commit"):
+                conn.commit()
+            _note_stamp_commit()
             sql_log.info(f"Stempel-Eintrag für Schlüssel-ID {sanitized_peke_key_id} erstellt.")
         except Exception as e:
+            # Der Commit kann auf dem Server trotzdem angekommen sein: die Scan-ID
+            # verhindert ein Duplikat bei der Wiederholung
             sql_log.error(f"Fehler beim Ausführen des SQL: {e}")
+            queue_stamp(sanitized_peke_key_id, scan_id, stamp_time)
     else:
-        write_to_backup_file(sql, values)
+        queue_stamp(sanitized_peke_key_id, scan_id, stamp_time)
 
 
-def register_rfid_tag(conn, cursor, uid):
+def register_rfid_tag(conn, uid):
     
     """
     Registriert ein RFID-Tag in der Datenbank, wenn es noch nicht existiert.
@@ -171,91 +455,216 @@ def register_rfid_tag(conn, cursor, uid):
     try:
         sanitized_uid = sanitize_uid(uid)
 
-        if not check_rfid_exists(cursor, sanitized_uid):
-            sql = "INSERT INTO person_key (peke_key_id, peke_typ, peke_crt_user) VALUES (%s, %s, %s)"
+        if not check_rfid_exists(conn, sanitized_uid):
             values = (sanitized_uid, "rfid", device_user)
 
             if conn:
-                cursor.execute(sql, values)
-                conn.commit()
+                statements.execute(conn, "register_rfid_tag", values)
+                with query_metrics.timed("register_rfid_tag:commit"):
+                    conn.commit()
                 sql_log.info(f"RFID-Tag {sanitized_uid} erfolgreich registriert.")
             else:
                 print(f"Keine aktive Verbindung, um RFID-Tag {sanitized_uid} zu registrieren. Operation übersprungen.")
         else:
             sql_log.warning(f"RFID-Tag {sanitized_uid} existiert bereits.")
-            peke_key_id = get_peke_key_id(cursor, sanitized_uid)
-            create_stamp_entry(conn, cursor, peke_key_id)
+            peke_key_id = get_peke_key_id(conn, sanitized_uid)
+            create_stamp_entry(conn, peke_key_id)
     except Exception as e:
         sql_log.error(f"Fehler bei der Registrierung des RFID-Tags: {e}")
 
 
-def get_peke_key_id(cursor, uid):
+def get_peke_key_id(conn, uid):
     """
     Holt die `peke_key_id` für die gegebene RFID UID aus `person_key`.
     """
     sanitized_uid = sanitize_uid(uid)
-    query = "SELECT peke_key_id FROM person_key WHERE peke_key_id = %s"
-    result = fetch_one(cursor, query, (sanitized_uid,))
+    result = statements.fetch_one(conn, "get_peke_key_id", (sanitized_uid,))
     return result[0] if result else None
 
 
-def get_person_name_from_uid(cursor, uid):
+def get_person_name_from_uid(conn, uid):
     """
     Holt den Vor- und Nachnamen der Person für die gegebene RFID UID.
     """
     sanitized_uid = sanitize_uid(uid)
-    query = """
-        SELECT p.pers_vorname, p.pers_nachname
-        FROM person_key pk
-        JOIN person p ON pk.peke_pers_id = p.pers_id
-        WHERE pk.peke_key_id = %s
-    """
-    result = fetch_one(cursor, query, (sanitized_uid,))
+    result = statements.fetch_one(conn, "get_person_name_from_uid", (sanitized_uid,))
     return result if result else (None, None)
 
 
-def get_time_clock_count(cursor, peke_key_id):
+def get_time_clock_count(conn, peke_key_id):
     """
     Holt die Anzahl der Male, die eine Person heute gestempelt hat.
     """
-    query = """
-        SELECT COUNT(*) 
-        FROM stamp
-        WHERE sta_key_id = %s 
-          AND DATE(sta_stempel_zeit) = CURDATE();
-    """
-    result = fetch_one(cursor, query, (peke_key_id,))
+    result = statements.fetch_one(conn, "get_time_clock_count", (peke_key_id,))
     return result[0] if result else 0
 
-def connect_to_database():
+def _note_stamp_commit():
+    global _last_stamp_commit
+    _last_stamp_commit = datetime.now()
+
+
+def last_stamp_commit():
+    """
+    Gibt den Zeitpunkt (datetime) des letzten erfolgreich geschriebenen Stempels zurück, oder None.
+    """
+    return _last_stamp_commit
+
+
+def update_alive_check(conn, system_name, status=None):
+    """
+    Schreibt das Lebenszeichen des Geräts in `z_sys_alive_check` (Upsert).
+    `status` kann die Schlüssel status, backlog, last_stamp, uptime_s und
+    interval_s enthalten; fehlende Werte bleiben in der Datenbank unverändert.
+    Fehlt Migration 004, wird nur alive_lastcheck aktualisiert.
+    """
+    if _missing_migrations and HEARTBEAT_MIGRATION in _missing_migrations:
+        statements.execute(conn, "heartbeat_legacy", (system_name,))
+        with query_metrics.timed("heartbeat:commit"):
+            conn.commit()
+        return
+
+    status = status or {}
+    values = (
+        system_name,
+        status.get("status"),
+        status.get("backlog"),
+        status.get("last_stamp"),
+        status.get("uptime_s"),
+        status.get("interval_s"),
+    )
+    statements.execute(conn, "heartbeat", values)
+    with query_metrics.timed("heartbeat:commit"):
+        conn.commit()
+
+
+def get_host_selector():
+    """
+    Gibt die Host-Auswahl zurück und legt sie beim ersten Aufruf an.
+    Die Hosts kommen aus DB_HOSTS ("primär:3306,sekundär:3306"), sonst aus DB_HOST.
+    """
+    global _host_selector
+    with _host_selector_lock:
+        if _host_selector is None:
+            hosts = parse_hosts(os.getenv("DB_HOSTS") or os.getenv("DB_HOST"))
+            if not hosts:
+                raise ValueError("Missing DB_HOSTS or DB_HOST in environment variables.")
+            _host_selector = HostSelector(
+                hosts,
+                probe_timeout=config.value('database', 'probe_timeout_ms') / 1000,
+                latency_slack_ms=DB_LATENCY_SLACK_MS,
+                failback_probes=DB_FAILBACK_PROBES,
+                health_port=config.value('database', 'health_port') or None,
+            )
+        return _host_selector
+
+
+def _set_probe_timeout(value):
+    if _host_selector is not None:
+        _host_selector.probe_timeout = value / 1000
+
+
+config.on_change('database', 'probe_timeout_ms', _set_probe_timeout)
+
+
+def missing_migrations(conn):
+    """
+    Gibt die Migrationen aus REQUIRED_MIGRATIONS zurück, die laut
+    `z_sys_schema_migration` noch nicht eingespielt sind. Fehlt die Tabelle,
+    gelten alle als fehlend. Bei anderen Fehlern wird None zurückgegeben.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT mig_name FROM z_sys_schema_migration")
+        applied = {row[0] for row in cursor.fetchall()}
+    except ProgrammingError:
+        applied = set()  # Tabelle fehlt: tools/migrate.py wurde nie ausgeführt
+    except Error as e:
+        sql_log.warning(f"[Schema] Eingespielte Migrationen konnten nicht gelesen werden: {e}")
+        return None
+    finally:
+        cursor.close()
+    return [name for name in REQUIRED_MIGRATIONS if name not in applied]
+
+
+def check_schema(conn):
+    """
+    Prüft beim Verbinden, ob die benötigten Migrationen eingespielt sind.
+    Ohne Migration 001 kann kein Stempel geschrieben werden: es wird False
+    zurückgegeben und das Terminal bleibt offline (Stempel gehen ins Backup).
+    Ohne Migration 004 wird nur das einfache Lebenszeichen geschrieben.
+    Fehler werden nur bei einer Änderung des Ergebnisses protokolliert.
+    """
+    global _missing_migrations
+    missing = missing_migrations(conn)
+    if missing is None:
+        return True  # Unbekannt: nicht blockieren, Fehler zeigen sich beim Schreiben
+
+    if missing != _missing_migrations:
+        if STAMP_MIGRATION in missing:
+            sql_log.error(
+                f"[Schema] Migration {STAMP_MIGRATION} fehlt (Spalte sta_scan_id). Stempel werden "
+                f"nur ins Backup geschrieben, bis 'python tools/migrate.py' ausgeführt wurde."
+            )
+        if HEARTBEAT_MIGRATION in missing:
+            sql_log.error(
+                f"[Schema] Migration {HEARTBEAT_MIGRATION} fehlt. Lebenszeichen ohne Gerätestatus, "
+                f"bis 'python tools/migrate.py' ausgeführt wurde."
+            )
+        if not missing and _missing_migrations:
+            sql_log.info("[Schema] Alle benötigten Migrationen sind eingespielt.")
+    _missing_migrations = missing
+    return STAMP_MIGRATION not in missing
+
+
+def connect_to_database(check_migrations=True, hosts=None):
     """
     Connect to the database using environment variables for credentials.
+    Die Hosts werden in der Reihenfolge von `HostSelector.candidates` mit kurzem
+    Timeout versucht; eine frische Prüfung (z.B. aus can_reach_server) wird dabei
+    weiterverwendet, statt jeden Host erneut anzuwählen.
+    Mit `check_migrations` wird das Schema geprüft (siehe check_schema); fehlt
+    eine zwingende Migration, wird None zurückgegeben.
+    Mit `hosts` werden nur diese Hosts versucht (z.B. beim Failback).
     """
     try:
         # Fetch the database connection info from environment variables
         db_user = os.getenv("DB_USER")
         db_password = os.getenv("DB_PASSWORD")
-        db_host = os.getenv("DB_HOST")
         db_name = os.getenv("DB_NAME")
 
         # Check that all necessary environment variables are set
-        if not all([db_user, db_password, db_host, db_name]):
+        if not all([db_user, db_password, db_name]):
             raise ValueError("Missing one or more required database configuration values in environment variables.")
 
-        # Attempt to establish a database connection
-        conn = connect(
-            user=db_user,
-            password=db_password,
-            host=db_host,
-            database=db_name,            
-            connection_timeout=10  # Set a timeout to avoid hanging
-        )
-        logging.info("Database connection established.")
-        return conn
-    except Error as e:
-        logging.error(f"Error establishing database connection: {e}")
-        return None
+        selector = get_host_selector()
     except ValueError as e:
         logging.error(f"Configuration error: {e}")
         return None
 
+    for host, port in hosts or selector.candidates():
+        try:
+            # Attempt to establish a database connection
+            conn = connect(
+                user=db_user,
+                password=db_password,
+                host=host,
+                port=port,
+                database=db_name,
+                connection_timeout=config.value('database', 'connect_timeout')  # Set a timeout to avoid hanging
+            )
+        except Error as e:
+            logging.error(f"Error establishing database connection to {host}:{port}: {e}")
+            selector.mark_failed((host, port))
+            continue
+
+        if selector.current not in (None, (host, port)):
+            sql_log.warning(f"[Failover] Verbunden mit {host}:{port} statt {selector.current[0]}:{selector.current[1]}.")
+        selector.current = (host, port)
+        logging.info(f"Database connection established ({host}:{port}).")
+        if check_migrations and not check_schema(conn):
+            conn.close()
+            return None
+        return conn
+
+    logging.error("Error establishing database connection: no host reachable.")
+    return None
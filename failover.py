@@ -0,0 +1,211 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: failover.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Auswahl des Datenbank-Servers bei mehreren Hosts (Primär und Sekundär).
+Alle Hosts werden parallel mit einem kurzen TCP-Verbindungsaufbau geprüft.
+Erreichbare Hosts werden in der konfigurierten Reihenfolge bevorzugt, solange
+ihre Latenz nahe beim schnellsten Host liegt. Ist ein bevorzugter Host nach
+einem Ausfall wieder stabil erreichbar, wird auf ihn zurückgewechselt.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: tcp_probe nach netprobe.py verschoben (nicht blockierender Verbindungsaufbau).
+- [19.10.26]: candidates verwendet eine frische Prüfung weiter, bei nur einem Host wird nicht geprüft.
+- [19.10.26]: Failback nur, wenn candidates den Host vor dem aktuellen einreiht (Latenz berücksichtigt).
+- [19.10.26]: Prüfung liest die MySQL-Begrüssung oder nutzt einen separaten Health-Port.
+
+===============================================================================
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from netprobe import tcp_probe
+
+failover_logger = logging.getLogger("sql_logger")
+
+DEFAULT_PORT = 3306
+
+
+def parse_hosts(value, default_port=DEFAULT_PORT):
+    """
+    Wandelt "host1:3306, host2" in eine Liste von (host, port) um.
+    """
+    hosts = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item.count(":") == 1:
+            host, port = item.split(":")
+            hosts.append((host, int(port)))
+        else:
+            hosts.append((item, default_port))
+    return hosts
+
+
+class HostSelector:
+    """
+    Hält den Zustand aller Datenbank-Hosts und liefert die Reihenfolge,
+    in der ein Verbindungsaufbau versucht wird.
+    """
+
+    def __init__(self, hosts, probe_timeout=0.5, latency_slack_ms=20.0, failback_probes=3, probe_max_age=2.0,
+                 health_port=None):
+        if not hosts:
+            raise ValueError("Mindestens ein Datenbank-Host muss konfiguriert sein")
+        self.hosts = list(hosts)
+        self.probe_timeout = probe_timeout
+        self.latency_slack_ms = latency_slack_ms
+        self.failback_probes = failback_probes
+        self.probe_max_age = probe_max_age
+        self.health_port = health_port  # Ohne: MySQL-Port, die Begrüssung des Servers wird gelesen
+        self.current = None
+        self._probed_at = None
+
+        self._latency = {host: None for host in self.hosts}
+        self._healthy_streak = {host: 0 for host in self.hosts}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.hosts), thread_name_prefix="DbProbe")
+
+    def probe_all(self):
+        """
+        Prüft alle Hosts parallel (Begrüssung auf dem MySQL-Port oder, falls
+        gesetzt, Verbindungsaufbau zu `health_port`). Die Dauer ist durch `probe_timeout` begrenzt,
+        unabhängig von der Anzahl Hosts. Gibt {(host, port): Latenz in ms oder None} zurück.
+        """
+        futures = {host: self._executor.submit(self._probe, host) for host in self.hosts}
+        results = {host: future.result() for host, future in futures.items()}
+
+        with self._lock:
+            self._probed_at = time.monotonic()
+            for host, latency in results.items():
+                was_up = self._latency[host] is not None
+                self._latency[host] = latency
+                self._healthy_streak[host] = self._healthy_streak[host] + 1 if latency is not None else 0
+                if was_up and latency is None:
+                    failover_logger.warning(f"[Failover] Host {host[0]}:{host[1]} nicht erreichbar.")
+                elif not was_up and latency is not None:
+                    failover_logger.info(f"[Failover] Host {host[0]}:{host[1]} erreichbar ({latency:.1f} ms).")
+        return results
+
+    def candidates(self):
+        """
+        Gibt die erreichbaren Hosts in der Reihenfolge zurück, in der verbunden
+        werden soll. Hosts innerhalb von `latency_slack_ms` des schnellsten Hosts
+        behalten die konfigurierte Priorität, langsamere folgen nach Latenz.
+        Antwortet kein Host, werden alle in der konfigurierten Reihenfolge versucht.
+
+        Ein Ergebnis von `probe_all`, das jünger als `probe_max_age` Sekunden ist
+        (z.B. aus dem Verbindungs-Checker), wird weiterverwendet, damit kein Host
+        zweimal angewählt wird. Bei nur einem Host ist der Verbindungsaufbau
+        selbst die Prüfung.
+        """
+        if len(self.hosts) == 1:
+            return list(self.hosts)
+        self._probe_if_stale()
+        with self._lock:
+            healthy = [(self._latency[host], position, host)
+                       for position, host in enumerate(self.hosts) if self._latency[host] is not None]
+        if not healthy:
+            return list(self.hosts)
+
+        fastest = min(latency for latency, _, _ in healthy)
+        healthy.sort(key=lambda item: (
+            item[0] > fastest + self.latency_slack_ms,
+            item[1] if item[0] <= fastest + self.latency_slack_ms else item[0],
+        ))
+        return [host for _, _, host in healthy]
+
+    def _probe(self, host):
+        if self.health_port:
+            return tcp_probe(host[0], self.health_port, self.probe_timeout)
+        return tcp_probe(host[0], host[1], self.probe_timeout, read_greeting=True)
+
+    def _probe_if_stale(self):
+        with self._lock:
+            fresh = self._probed_at is not None and time.monotonic() - self._probed_at <= self.probe_max_age
+        if not fresh:
+            self.probe_all()
+
+    def mark_failed(self, host):
+        """
+        Markiert einen Host nach einem fehlgeschlagenen Verbindungsaufbau als nicht erreichbar.
+        """
+        with self._lock:
+            self._latency[host] = None
+            self._healthy_streak[host] = 0
+
+    def failback_due(self):
+        """
+        Gibt den Host zurück, zu dem gewechselt werden soll, oder None. Das ist
+        der erste Host von `candidates` (gleiches Kriterium wie beim Verbinden),
+        sofern er nicht der aktuelle ist und `failback_probes`-mal in Folge
+        erreichbar war. Eine frische Prüfung wird weiterverwendet.
+        """
+        if self.current is None or self.current == self.hosts[0]:
+            return None
+        best = self.candidates()[0]
+        if best == self.current:
+            return None
+        with self._lock:
+            if self._latency[best] is None or self._healthy_streak[best] < self.failback_probes:
+                return None
+        return best
+
+    def _probe_if_stale(self):
+        with self._lock:
+            fresh = self._probed_at is not None and time.monotonic() - self._probed_at <= self.probe_max_age
+        if not fresh:
+            self.probe_all()
+
+    def mark_failed(self, host):
+        """
+        Markiert einen Host nach einem fehlgeschlagenen Verbindungsaufbau als nicht erreichbar.
+        """
+        with self._lock:
+            self._latency[host] = None
+            self._healthy_streak[host] = 0
+
+    def failback_due(self):
+        """
+        Gibt den Host zurück, zu dem gewechselt werden soll, oder None. Das ist
+        der erste Host von `candidates` (gleiches Kriterium wie beim Verbinden),
+        sofern er nicht der aktuelle ist und `failback_probes`-mal in Folge
+        erreichbar war. Eine frische Prüfung wird weiterverwendet.
+        """
+        if self.current is None or self.current == self.hosts[0]:
+            return None
+        best = self.candidates()[0]
+        if best == self.current:
+            return None
+        with self._lock:
+            if self._latency[best] is None or self._healthy_streak[best] < self.failback_probes:
+                return None
+        return best
+
+    def probe_due(self):
+        """
+        Gibt True zurück, wenn eine Prüfung aller Hosts sinnvoll ist: ohne
+        Verbindung oder solange auf einem nachrangigen Host gearbeitet wird
+        (Failback möglich).
+        """
+        return self.current is None or self.current != self.hosts[0]
+
+    def status(self):
+        """
+        Gibt den aktuellen Host und die zuletzt gemessenen Latenzen zurück.
+        """
+        with self._lock:
+            return {
+                "current": self.current,
+                "latency_ms": {f"{host}:{port}": latency for (host, port), latency in self._latency.items()},
+            }
@@ -6,9 +6,14 @@ Version: 1.0.0
 Entwickler: Annatina Christ
 Datum: 29.11.2024
 
+Beschreibung:
+Hilfsfunktionen für die GPIO-Ausgänge (LEDs, Summer) der Terminals ohne
+Bildschirm (ui/headless_ui.py). Direkt ausgeführt lässt das Skript einen Pin
+zum Testen eine Sekunde lang leuchten.
+
 Changelog:
 - [29.11.2024]: Erste Version.
-- [Datum]: Weitere Änderungen/Verbesserungen.
+- [19.10.26]: Funktionen für die Headless-Oberfläche, Beispiel nur noch bei direktem Aufruf.
 
 ===============================================================================
 """
@@ -16,16 +21,52 @@ Changelog:
 import RPi.GPIO as GPIO
 import time
 
-# GPIO-Modus festlegen (BCM für Broadcom-Nummerierung oder BOARD für physische Pin-Nummern)
-GPIO.setmode(GPIO.BCM)  # oder GPIO.setmode(GPIO.BOARD)
 
-# Beispiel: Konfiguration eines Pins (z.B. GPIO 18) als Ausgang
-GPIO.setup(18, GPIO.OUT)
+def setup_outputs(pins, mode=GPIO.BCM):
+    """
+    Konfiguriert die Pins als Ausgänge (aus). `mode` ist GPIO.BCM für
+    Broadcom-Nummerierung oder GPIO.BOARD für physische Pin-Nummern.
+    """
+    GPIO.setwarnings(False)
+    GPIO.setmode(mode)
+    for pin in pins:
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+
+
+def set_output(pin, on):
+    """
+    Schaltet einen Ausgang ein oder aus.
+    """
+    GPIO.output(pin, GPIO.HIGH if on else GPIO.LOW)
+
+
+def pulse(pin, duration, count=1, pause=0.1):
+    """
+    Schaltet einen Ausgang `count` Mal für `duration` Sekunden ein (z.B. Summer).
+    Blockiert, bis das Muster abgespielt ist.
+    """
+    for position in range(count):
+        if position:
+            time.sleep(pause)
+        GPIO.output(pin, GPIO.HIGH)
+        time.sleep(duration)
+        GPIO.output(pin, GPIO.LOW)
+
+
+def cleanup(pins=None):
+    """
+    Schaltet die verwendeten Pins zurück in den Eingangszustand.
+    """
+    if pins:
+        GPIO.cleanup(list(pins))
+    else:
+        GPIO.cleanup()
 
-# Beispielhafte Nutzung des GPIO
-GPIO.output(18, GPIO.HIGH)  # Setze Pin 18 auf HIGH (ein)
-time.sleep(1)  # Warte 1 Sekunde
-GPIO.output(18, GPIO.LOW)   # Setze Pin 18 auf LOW (aus)
 
-# Bereinige GPIO am Ende des Programms
-GPIO.cleanup()  # Schaltet alle verwendeten Pins zurück in den Eingangszustand
+if __name__ == '__main__':
+    # Beispiel: Pin 18 als Ausgang eine Sekunde lang einschalten
+    setup_outputs([18])
+    set_output(18, True)
+    time.sleep(1)
+    set_output(18, False)
+    cleanup()
@@ -12,18 +12,32 @@ Changelog:
 - [29.11.24]: Erste Version.
 - [06.12.24]: Datum und Uhr Anzeige
 - [10.12.24]: Dateipfade geändert, Datum ist nun auf Deutsch
+- [19.10.26]: Verbindungsstatus unten links, gesteuert durch den Verbindungszustand
+- [19.10.26]: Anzeige aus Threads nur noch über den GuiBus, ein einziger Reset-Timer (gui_bus.py)
+- [19.10.26]: Logo und Swirl aus dem Cache vorskalierter Bilder laden (image_cache.py)
+- [19.10.26]: Statussymbole (Erfolg, Fehler, Tag hinhalten) aus gerasterten SVGs (icons.py)
+- [19.10.26]: Swirl-Animation als Rückmeldung beim Stempeln, Frames vorab dekodiert (animation.py)
+- [19.10.26]: Uhr auf den Sekundenwechsel ausgerichtet, ersetzt update_time (clock_renderer.py)
+- [19.10.26]: Breite der Swirl-Animation begrenzt ([animation] max_width), Frames nicht mehr einzeln im Speicher
 
 ===============================================================================
 """
 
 
 import tkinter as tk
-from PIL import Image, ImageTk
-import configparser
+from PIL import Image
+from config_loader import config
 import locale
 from PIL import ImageFont
 import os
 import sys
+import threading
+import logging
+from gui_bus import GuiBus
+from image_cache import ImageCache
+from icons import IconService
+from animation import AnimationPlayer, load_frames, prepare_atlas
+from clock_renderer import ClockRenderer
 
 # Determine the base directory of the project
 if getattr(sys, 'frozen', False):  # If bundled with PyInstaller
@@ -31,17 +45,43 @@ if getattr(sys, 'frozen', False):  # If bundled with PyInstaller
 else:
     base_dir = os.path.dirname(os.path.abspath(__file__))  # Location of the script
 
+# Vorskalierte Bilder liegen neben der Anwendung (tools/prerender_images.py füllt den Cache im Voraus)
+image_cache = ImageCache(os.path.join(base_dir, "cache", "images"))
+
+# Bildbreite als Anteil der Bildschirmbreite (muss mit tools/prerender_images.py übereinstimmen)
+LOGO_WIDTH_FACTOR = 0.8
+SWIRL_WIDTH_FACTOR = 0.5
+
 # Globale Variablen für die Labels
 global instruction_label
 global server_status_label
 global clock_label
+global icon_label
+
+# Vorgeladene Statussymbole, wird in create_gui erstellt
+icon_service = None
+
+# Höhe der Statussymbole als Anteil der Bildschirmhöhe
+ICON_HEIGHT_FACTOR = 0.18
+
+# Swirl-Animation bei erfolgreichem Stempeln (img/swirl.gif)
+gui_logger = logging.getLogger("main_logger")
+global animation_label
+swirl_player = None
+ANIMATION_WIDTH_FACTOR = 0.3
+
+# Uhr- und Datumsanzeige, wird in create_gui gestartet
+clock_renderer = None
+
+# Laufender Timer, der das Anleitungs-Label zurücksetzt (nur einer zur selben Zeit)
+instruction_reset_id = None
 
 # Version aus der Konfigurationsdatei entnehmen
-config = configparser.ConfigParser()
-config_path = 'config/config.cnf'
-config.read(config_path)
-version = config['version']['version_number']
-version_name = config['version']['version_name']
+version = config.value('version', 'version_number')
+version_name = config.value('version', 'version_name')
+animation_enabled = config.value('animation', 'enabled')  # Swirl-Animation beim Stempeln
+animation_frame_step = config.value('animation', 'frame_step')  # 2 = jeden zweiten Frame (halber Speicher)
+animation_max_width = config.value('animation', 'max_width')  # Obergrenze in Pixeln, unabhängig vom Bildschirm
 
 locale.setlocale(locale.LC_TIME, "de_CH")
 
@@ -50,6 +90,14 @@ font_path = os.path.join(base_dir, "fonts", "Brother-1816-Regular.ttf")
 
 custom_font = ImageFont.truetype(font_path, size=12)
 
+# Text und Farbe der Statusanzeige pro Verbindungszustand (siehe connection_state.py)
+SERVER_STATUS_STYLES = {
+    "ONLINE": ("Online", "#2e7d32"),
+    "DEGRADED": ("Ausweichserver", "#ef6c00"),
+    "REPLAYING": ("Synchronisiere...", "#1565c0"),
+    "OFFLINE": ("Offline-Modus", "#c62828"),
+}
+
 # Utility Functions
 def calculate_height(percent, screen_height):
     """Calculate height as a percentage of the screen height."""
@@ -62,6 +110,10 @@ def resize_image(image_path, target_width):
     target_height = int(target_width * aspect_ratio)
     return image.resize((target_width, target_height), Image.LANCZOS)
 
+def load_scaled_photo(image_path, target_width):
+    """Load an image scaled to a specific width as PhotoImage, using the disk cache."""
+    return tk.PhotoImage(file=image_cache.scaled_path(image_path, target_width))
+
 def get_image_path(filename):
     """Get the path to an image, handle missing files gracefully."""
     try:
@@ -86,8 +138,7 @@ def create_top_frame(root, screen_width, screen_height):
     # Load and resize the logo
     logo_path = get_image_path("churwork_logo_claim.png")
     if logo_path:
-        logo = resize_image(logo_path, int(screen_width * 0.8))
-        logo_img = ImageTk.PhotoImage(logo)
+        logo_img = load_scaled_photo(logo_path, int(screen_width * LOGO_WIDTH_FACTOR))
         root.logo_img = logo_img  # Prevent garbage collection
         tk.Label(frame, image=logo_img, bg="white", bd=0).pack(side="top", pady=0)
 
@@ -98,7 +149,7 @@ def create_top_frame(root, screen_width, screen_height):
 
 def create_center_frame(root, screen_width):
     """Create the center frame with a clock and instructions."""
-    global clock_label, instruction_label
+    global clock_label, instruction_label, icon_label, animation_label
 
     frame = tk.Frame(root, bg="white", bd=0)
     frame.pack(expand=True, fill="both")
@@ -111,11 +162,25 @@ def create_center_frame(root, screen_width):
                            font=("Arial", scaled_font_size), anchor="center", bd=0)
     clock_label.pack(pady=(10, 5))
 
+    # Status icon (success, error, present card)
+    icon_label = tk.Label(frame, image=icon_service.get("present"), bg="white", bd=0)
+    icon_label.pack(pady=(5, 0))
+
     # Instruction Label
     instruction_label = tk.Label(frame, text="Guten Tag", bg="white", fg="black",
                                   font=("Arial", scaled_font_size), bd=0)
     instruction_label.pack(expand=True)
 
+    # Animation area with a fixed height, so the layout does not jump while playing
+    animation_width = get_animation_width(screen_width)
+    with Image.open(os.path.join(base_dir, "img", "swirl.gif")) as swirl:  # Liest nur den Dateikopf
+        animation_height = int(animation_width * swirl.size[1] / swirl.size[0])
+    animation_frame = tk.Frame(frame, bg="white", bd=0, width=animation_width, height=animation_height)
+    animation_frame.pack_propagate(False)
+    animation_frame.pack(pady=(0, 5))
+    animation_label = tk.Label(animation_frame, bg="white", bd=0)
+    animation_label.pack(expand=True, fill="both")
+
     return frame
 
 
@@ -127,13 +192,16 @@ def create_bottom_frame(root, screen_width, screen_height):
     frame = tk.Frame(root, bg="white", height=calculate_height(0.2, screen_height), bd=0)
     frame.pack(side="bottom", fill="x")
 
+    # Server status (updated through UserInterface.bind_connection_state, see ui/)
+    server_status_label = tk.Label(frame, text="", bg="white", fg="black",
+                                   font=("Arial", scale_font(10, screen_width)), bd=0)
+    server_status_label.pack(side="left", anchor="s", padx=10, pady=10)
+
     # Load and resize the corner graphic (static PNG)
     swirl_path = get_image_path("swirl.png")
     if swirl_path and os.path.exists(swirl_path):  # Ensure the file exists
-        scale_factor = 0.5
-        swirl_width = int(screen_width * scale_factor)
-        swirl = resize_image(swirl_path, swirl_width)
-        swirl_img = ImageTk.PhotoImage(swirl)
+        swirl_width = int(screen_width * SWIRL_WIDTH_FACTOR)
+        swirl_img = load_scaled_photo(swirl_path, swirl_width)
         root.swirl_img = swirl_img  # Prevent garbage collection
         tk.Label(frame, image=swirl_img, bg="white", bd=0).pack(side="right", padx=0, pady=0)
     else:
@@ -144,44 +212,111 @@ def create_bottom_frame(root, screen_width, screen_height):
 
 
 # Update Functions
-def update_time():
-    """Update the clock label with the current time and date."""
-    from datetime import datetime
-
-    # Get the current time and date
-    now = datetime.now()
-    current_time = now.strftime("%H:%M:%S")  # Format the time
-    current_day = now.strftime("%A, %d. %B %Y")  # Format the date (Swiss format)
-
-    # Update the clock label with both date and time
-    clock_label.config(text=f"{current_day}\n{current_time}")
-
-    # Schedule the function to run again in 1 second
-    clock_label.after(1000, update_time)
+def clock_stats():
+    """
+    Gibt die Statistik der Uhranzeige zurück (Aktualisierungen, Verspätung der Ticks).
+    """
+    return clock_renderer.stats() if clock_renderer is not None else None
 
-def update_instruction_label(message, duration=2000):
+def update_instruction_label(message, duration=2000, icon=None):
     """
-    Aktualisiert das Anleitungs-Label mit einer neuen Nachricht.
+    Aktualisiert das Anleitungs-Label mit einer neuen Nachricht und optional
+    einem Statussymbol ("success", "error", "present").
     Nach einer bestimmten Dauer (Standard: 2000ms) wird das Label wieder zurückgesetzt.
+    Ein noch laufender Reset der vorherigen Nachricht wird abgebrochen.
     """
+    global instruction_reset_id
+
     instruction_label.config(text=message)
-    
-    instruction_label.after(duration, reset_instruction_label)  # Setzt das Label nach der angegebenen Zeit zurück
+    if icon:
+        icon_label.config(image=icon_service.get(icon) or "")
+    if icon == "success" and swirl_player is not None:
+        swirl_player.play()
+
+    if instruction_reset_id is not None:
+        instruction_label.after_cancel(instruction_reset_id)
+    instruction_reset_id = instruction_label.after(duration, reset_instruction_label)  # Setzt das Label nach der angegebenen Zeit zurück
 
 def reset_instruction_label():
     """
     Setzt das Anleitungs-Label zurück auf die ursprüngliche Nachricht.
     """
+    global instruction_reset_id
+
+    instruction_reset_id = None
     instruction_label.config(text="Bitte RFID Tag an Lesegerät halten")
+    icon_label.config(image=icon_service.get("present") or "")
     
 
 
+def update_server_status(state):
+    """
+    Zeigt den Verbindungszustand im Status-Label an. Muss im Tk-Thread laufen.
+    """
+    text, color = SERVER_STATUS_STYLES.get(state, (state, "black"))
+    server_status_label.config(text=text, fg=color)
+
+def get_animation_width(screen_width):
+    """
+    Breite der Swirl-Animation: Anteil der Bildschirmbreite, höchstens `animation.max_width`.
+    Der Atlas belegt etwa Breite x Höhe x 4 Bytes pro Frame im Speicher.
+    """
+    return min(int(screen_width * ANIMATION_WIDTH_FACTOR), animation_max_width)
+
+def load_swirl_animation(root, bus):
+    """
+    Bereitet die Swirl-Animation im Hintergrund vor (Dekodieren und Skalieren,
+    beim ersten Start) und übergibt sie danach über den GuiBus an den Tk-Thread.
+    Der Start des GUI wird dadurch nicht verzögert.
+    """
+    if not animation_enabled:
+        return
+    source = os.path.join(base_dir, "img", "swirl.gif")
+    width = get_animation_width(root.winfo_screenwidth())
+
+    def prepare():
+        try:
+            atlas_path = prepare_atlas(image_cache, source, width, animation_frame_step)
+        except Exception as e:
+            gui_logger.error(f"[Animation] Swirl-Animation nicht verfügbar: {e}")
+            return
+        bus.call(attach_swirl_animation, atlas_path)
+
+    threading.Thread(target=prepare, name="AnimationLoaderThread", daemon=True).start()
+
+def attach_swirl_animation(atlas_path):
+    """
+    Lädt die Frames aus dem Atlas und aktiviert die Animation. Läuft im Tk-Thread.
+    """
+    global swirl_player
+
+    frames, durations = load_frames(atlas_path)
+    swirl_player = AnimationPlayer(animation_label, frames, durations)
+    gui_logger.info(f"[Animation] Swirl-Animation mit {len(frames)} Frames geladen.")
+
+def animation_stats():
+    """
+    Gibt die Statistik der Swirl-Animation zurück (angezeigte/ausgelassene Frames, FPS).
+    """
+    return swirl_player.stats() if swirl_player is not None else None
+
+def create_gui_bus(root):
+    """
+    Erstellt den Nachrichtenbus für Anzeigen aus Hintergrund-Threads und startet
+    dessen Pumpe im Tk-Thread.
+    """
+    bus = GuiBus(root)
+    bus.register("instruction", update_instruction_label)
+    bus.register("server_status", update_server_status)
+    bus.start()
+    return bus
+
 # Main GUI Creation
 def create_gui():
     """
     Creates a borderless fullscreen GUI that adapts to screen size.
     """
-    global instruction_label, server_status_label, clock_label
+    global instruction_label, server_status_label, clock_label, icon_service, clock_renderer
 
     # Root window configuration
     root = tk.Tk()
@@ -195,13 +330,20 @@ def create_gui():
     screen_width = root.winfo_screenwidth()
     screen_height = root.winfo_screenheight()
 
+    # Statussymbole einmal pro Auflösung und DPI rastern und vorladen
+    icon_service = IconService(image_cache, os.path.join(base_dir, "img"),
+                               size=calculate_height(ICON_HEIGHT_FACTOR, screen_height),
+                               dpi=root.winfo_fpixels('1i'))
+    icon_service.preload()
+
     # Create GUI frames
     create_top_frame(root, screen_width, screen_height)
     create_center_frame(root, screen_width)
     create_bottom_frame(root, screen_width, screen_height)
 
-    # Start updating the clock
-    update_time()
+    # Start updating the clock (date in Swiss format)
+    clock_renderer = ClockRenderer(clock_label)
+    clock_renderer.start()
 
     
 
@@ -0,0 +1,155 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: gui_bus.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Nachrichtenbus zwischen den Hintergrund-Threads und dem GUI. Tk ist nicht
+threadsicher, deshalb rufen die Threads keine Tk-Funktionen mehr auf
+(auch nicht `root.after`), sondern legen Nachrichten in eine Queue. Eine
+Pumpe im Tk-Thread leert die Queue, fasst mehrere Nachrichten mit gleichem
+Schlüssel zusammen (nur die letzte wird angezeigt) und misst die Zeit vom
+Einreihen bis zur Anzeige.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Nachrichten mit Statussymbol (icons.py).
+
+===============================================================================
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from query_metrics import percentile
+
+bus_logger = logging.getLogger("main_logger")
+
+
+class GuiBus:
+    """
+    Threadsichere Queue mit einer Pumpe im Tk-Thread.
+
+    Handler werden pro Schlüssel registriert und immer im Tk-Thread aufgerufen.
+    Nachrichten mit Schlüssel werden zusammengefasst, `call` wird nie zusammengefasst.
+    """
+
+    def __init__(self, root, pump_interval_ms=20, latency_window=500):
+        self.root = root
+        self.pump_interval_ms = pump_interval_ms
+        self._queue = queue.SimpleQueue()
+        self._handlers = {}
+        self._latencies = deque(maxlen=latency_window)
+        self._posted = 0
+        self._displayed = 0
+        self._coalesced = 0
+        self._lock = threading.Lock()
+        self._pump_id = None
+
+    def register(self, key, handler):
+        """
+        Registriert den Handler für einen Nachrichtenschlüssel.
+        """
+        self._handlers[key] = handler
+
+    def post(self, key, *args):
+        """
+        Reiht eine Nachricht ein. Darf aus jedem Thread aufgerufen werden.
+        """
+        self._queue.put((key, args, time.perf_counter()))
+        with self._lock:
+            self._posted += 1
+
+    def call(self, func, *args):
+        """
+        Führt eine beliebige Funktion im Tk-Thread aus (ohne Zusammenfassen).
+        """
+        self._queue.put((None, (func, args), time.perf_counter()))
+        with self._lock:
+            self._posted += 1
+
+    def show_message(self, text, duration_ms=2000, icon=None):
+        """
+        Zeigt eine Nachricht im Anleitungs-Label an und setzt sie nach `duration_ms` zurück.
+        `icon` ist "success", "error" oder "present" (siehe icons.py).
+        """
+        self.post("instruction", text, duration_ms, icon)
+
+    def set_server_status(self, state):
+        """
+        Zeigt den Verbindungszustand an (siehe connection_state.py).
+        """
+        self.post("server_status", state)
+
+    def start(self):
+        """
+        Startet die Pumpe. Muss im Tk-Thread aufgerufen werden.
+        """
+        self._pump_id = self.root.after(self.pump_interval_ms, self._pump)
+
+    def stop(self):
+        if self._pump_id is not None:
+            self.root.after_cancel(self._pump_id)
+            self._pump_id = None
+
+    def stats(self):
+        """
+        Gibt Anzahl eingereihter, angezeigter und zusammengefasster Nachrichten
+        sowie die Latenz bis zur Anzeige (p50/p95/max in ms) zurück.
+        """
+        with self._lock:
+            samples = sorted(self._latencies)
+            return {
+                "posted": self._posted,
+                "displayed": self._displayed,
+                "coalesced": self._coalesced,
+                "latency_p50_ms": percentile(samples, 0.50),
+                "latency_p95_ms": percentile(samples, 0.95),
+                "latency_max_ms": samples[-1] if samples else 0.0,
+            }
+
+    def _pump(self):
+        latest = {}
+        calls = []
+        drained = 0
+        while True:
+            try:
+                key, args, posted_at = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            drained += 1
+            if key is None:
+                calls.append((args, posted_at))
+            else:
+                # Dict behält die Reihenfolge des ersten Auftretens, der Inhalt ist der neueste
+                latest[key] = (args, posted_at)
+
+        for (func, args), posted_at in calls:
+            self._dispatch(func, args, posted_at)
+        for key, (args, posted_at) in latest.items():
+            handler = self._handlers.get(key)
+            if handler is None:
+                bus_logger.warning(f"[GuiBus] Kein Handler für '{key}'.")
+                continue
+            self._dispatch(handler, args, posted_at)
+
+        with self._lock:
+            self._coalesced += drained - len(calls) - len(latest)
+        self._pump_id = self.root.after(self.pump_interval_ms, self._pump)
+
+    def _dispatch(self, func, args, posted_at):
+        try:
+            func(*args)
+        except Exception as e:
+            bus_logger.error(f"[GuiBus] Fehler bei der Anzeige: {e}")
+            return
+        latency_ms = (time.perf_counter() - posted_at) * 1000
+        with self._lock:
+            self._displayed += 1
+            self._latencies.append(latency_ms)
@@ -0,0 +1,103 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: heartbeat.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Plant das Lebenszeichen in `z_sys_alive_check`. Statt alle 10 Sekunden zwei
+Schreibbefehle abzusetzen, wird höchstens einmal pro Intervall ein einzelner
+Upsert mit dem Gerätestatus geschrieben, auch wenn gerade gestempelt wird:
+nur dieser Upsert aktualisiert alive_lastcheck und alive_last_stamp.
+Antwortet die Datenbank langsam, wird das Intervall verlängert, damit die
+Terminals den Server unter Last entlasten.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Lebenszeichen nicht mehr wegen eines kürzlichen Stempels auslassen (die Zeile wäre sonst veraltet).
+
+===============================================================================
+"""
+
+import logging
+import time
+
+from database import last_stamp_commit, update_alive_check
+
+heartbeat_logger = logging.getLogger("connection_logger")
+
+
+class HeartbeatScheduler:
+    """
+    Entscheidet, wann ein Lebenszeichen fällig ist, und schreibt es.
+
+    Das Intervall liegt zwischen `min_interval` und `max_interval` Sekunden.
+    Es verdoppelt sich, wenn ein Lebenszeichen länger als `slow_ms` dauert,
+    und halbiert sich wieder, wenn die Datenbank schnell antwortet.
+    """
+
+    def __init__(self, system_name, min_interval=60, max_interval=300, slow_ms=250.0):
+        self.system_name = system_name
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.slow_ms = slow_ms
+        self.interval = min_interval
+
+        self.beats = 0
+        self._last_beat = None  # time.monotonic() des letzten Lebenszeichens
+        self._started = time.monotonic()
+
+    def due(self):
+        """
+        Gibt True zurück, wenn ein Lebenszeichen geschrieben werden soll.
+        """
+        if self._last_beat is None:
+            return True
+        return time.monotonic() - self._last_beat >= self.interval
+
+    def beat(self, conn, status=None, force=False):
+        """
+        Schreibt das Lebenszeichen mit dem Gerätestatus, wenn es fällig ist
+        (oder `force` gesetzt ist). Gibt True zurück, wenn geschrieben wurde.
+        Datenbankfehler werden an den Aufrufer weitergegeben.
+        """
+        if not force and not self.due():
+            return False
+
+        status = dict(status or {})
+        status.setdefault("last_stamp", last_stamp_commit())
+        status.setdefault("uptime_s", int(time.monotonic() - self._started))
+        status.setdefault("interval_s", int(self.interval))
+
+        start = time.perf_counter()
+        update_alive_check(conn, self.system_name, status)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._last_beat = time.monotonic()
+        self.beats += 1
+        self._adapt(elapsed_ms)
+        heartbeat_logger.debug(
+            f"[Heartbeat] Lebenszeichen für {self.system_name} geschrieben "
+            f"({elapsed_ms:.1f} ms, nächstes in {self.interval:.0f} s)."
+        )
+        return True
+
+    def _adapt(self, elapsed_ms):
+        if elapsed_ms >= self.slow_ms:
+            interval = min(self.interval * 2, self.max_interval)
+            if interval != self.interval:
+                heartbeat_logger.info(
+                    f"[Heartbeat] Datenbank antwortet langsam ({elapsed_ms:.0f} ms), "
+                    f"Intervall auf {interval:.0f} s erhöht."
+                )
+            self.interval = interval
+        else:
+            self.interval = max(self.interval / 2, self.min_interval)
+
+    def stats(self):
+        return {
+            "beats": self.beats,
+            "interval_s": self.interval,
+        }
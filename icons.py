@@ -0,0 +1,97 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: icons.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Statussymbole für die Rückmeldung beim Stempeln (Erfolg, Fehler, Tag
+hinhalten). Die SVG-Dateien aus `img` werden einmal pro Grösse und DPI mit
+CairoSVG gerastert, im Bild-Cache abgelegt (image_cache.py) und beim Start
+als PhotoImage vorgeladen. Pro Tap fällt damit kein Dekodieren mehr an.
+
+Ist CairoSVG (bzw. die Cairo-Bibliothek) nicht installiert, werden die
+PNG-Versionen der Symbole skaliert.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import logging
+import os
+import tkinter as tk
+
+from PIL import Image
+
+try:
+    import cairosvg
+except (ImportError, OSError):  # OSError: Python-Paket vorhanden, libcairo fehlt
+    cairosvg = None
+
+icon_logger = logging.getLogger("main_logger")
+
+# Symbol -> Dateiname ohne Endung in `img` (SVG und PNG)
+ICON_FILES = {
+    "success": "Ui-Check",
+    "error": "UI-Error",
+    "present": "UI-RFID",
+}
+PNG_FALLBACK = {
+    "Ui-Check": "UI-Check",
+}
+
+
+class IconService:
+    """
+    Rastert, cached und hält die Statussymbole als PhotoImage bereit.
+    """
+
+    def __init__(self, image_cache, img_dir, size, dpi=96):
+        self.image_cache = image_cache
+        self.img_dir = img_dir
+        self.size = size
+        self.dpi = int(round(dpi))
+        self._photos = {}
+
+    def preload(self):
+        """
+        Lädt alle Symbole als PhotoImage. Muss im Tk-Thread nach dem Erstellen
+        des Hauptfensters aufgerufen werden.
+        """
+        for name in ICON_FILES:
+            try:
+                self._photos[name] = tk.PhotoImage(file=self.icon_path(name))
+            except Exception as e:
+                icon_logger.error(f"[Icons] Symbol '{name}' konnte nicht geladen werden: {e}")
+        icon_logger.info(f"[Icons] {len(self._photos)} Symbole mit {self.size}px vorgeladen "
+                         f"({'CairoSVG' if cairosvg else 'PNG-Fallback'}).")
+
+    def get(self, name):
+        """
+        Gibt das vorgeladene PhotoImage eines Symbols zurück, oder None.
+        """
+        return self._photos.get(name)
+
+    def icon_path(self, name):
+        """
+        Gibt den Pfad der gerasterten PNG-Datei für ein Symbol in der
+        eingestellten Höhe zurück und erzeugt sie bei Bedarf.
+        """
+        stem = ICON_FILES[name]
+        svg_path = os.path.join(self.img_dir, f"{stem}.svg")
+        if cairosvg is not None and os.path.exists(svg_path):
+            def render(temp_path):
+                cairosvg.svg2png(url=svg_path, write_to=temp_path,
+                                 output_height=self.size, dpi=self.dpi)
+            return self.image_cache.cached(svg_path, f"h{self.size}_dpi{self.dpi}", render)
+
+        png_path = os.path.join(self.img_dir, f"{PNG_FALLBACK.get(stem, stem)}.png")
+        return self.image_cache.scaled_path(png_path, self._width_for_height(png_path))
+
+    def _width_for_height(self, png_path):
+        with Image.open(png_path) as image:  # Liest nur den Dateikopf
+            return max(int(self.size * image.size[0] / image.size[1]), 1)
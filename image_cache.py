@@ -0,0 +1,143 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: image_cache.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Disk-Cache für skalierte GUI-Bilder. Ein Bild wird pro Quelldatei (Hash des
+Inhalts), Zielbreite und Skalierungsverfahren einmal skaliert und als PNG
+abgelegt. Bei weiteren Starts lädt Tk die fertige Datei direkt, ohne das
+Original in voller Auflösung zu öffnen und neu zu skalieren.
+
+Die Dateinamen im Cache beginnen mit dem vollständigen Namen der Quelle
+inklusive Endung (z.B. `swirl.gif-…`), damit sich Quellen mit gleichem Namen
+aber unterschiedlicher Endung nicht gegenseitig verdrängen. Ändert sich eine
+Quelldatei, ändert sich ihr Hash und damit der Dateiname im Cache; veraltete
+Einträge derselben Quelle werden beim Schreiben entfernt.
+Damit die Quelldateien nicht bei jedem Start gelesen werden müssen, merkt
+sich ein kleiner Index den Hash pro Pfad, Grösse und Änderungszeit.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: `cached` für beliebige Darstellungen einer Quelle (z.B. SVG-Rasterung, icons.py).
+- [19.10.26]: Cache-Schlüssel mit Dateiendung, swirl.png und swirl.gif löschten sich gegenseitig.
+
+===============================================================================
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from PIL import Image
+
+cache_logger = logging.getLogger("main_logger")
+
+INDEX_FILE = "index.json"
+
+
+class ImageCache:
+    """
+    Liefert Pfade zu vorskalierten PNG-Dateien und erzeugt sie bei Bedarf.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.hits = 0
+        self.misses = 0
+        self._index = self._load_index()
+        self._lock = threading.Lock()
+
+    def scaled_path(self, source_path, target_width, method="LANCZOS"):
+        """
+        Gibt den Pfad einer PNG-Datei zurück, die `source_path` auf
+        `target_width` Pixel Breite (Seitenverhältnis erhalten) skaliert enthält.
+        """
+        def render(temp_path):
+            with Image.open(source_path) as image:
+                target_height = int(target_width * image.size[1] / image.size[0])
+                scaled = image.resize((target_width, target_height), getattr(Image, method))
+            scaled.save(temp_path, format="PNG", compress_level=1)
+
+        return self.cached(source_path, f"w{target_width}_{method.lower()}", render)
+
+    def cached(self, source_path, variant, render):
+        """
+        Gibt den Pfad der PNG-Datei für eine Darstellung (`variant`, ohne "-")
+        von `source_path` zurück. Fehlt sie, schreibt `render(temp_path)` sie
+        neu; das Umbenennen an den endgültigen Ort übernimmt der Cache.
+        """
+        with self._lock:
+            source_hash = self._source_hash(source_path)
+            prefix = f"{os.path.basename(source_path)}-{source_hash[:16]}"
+            cached = os.path.join(self.cache_dir, f"{prefix}-{variant}.png")
+            if os.path.exists(cached):
+                self.hits += 1
+                return cached
+
+            self.misses += 1
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{cached}.tmp"
+            render(temp_path)
+            os.replace(temp_path, cached)
+            self._remove_stale(os.path.basename(source_path), prefix)
+            cache_logger.info(f"[ImageCache] {source_path} ({variant}) erzeugt und gespeichert.")
+            return cached
+
+    def load_scaled(self, source_path, target_width, method="LANCZOS"):
+        """
+        Wie `scaled_path`, gibt aber ein PIL-Bild zurück.
+        """
+        return Image.open(self.scaled_path(source_path, target_width, method))
+
+    def _source_hash(self, source_path):
+        stat = os.stat(source_path)
+        key = os.path.abspath(source_path)
+        entry = self._index.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha1"]
+
+        digest = hashlib.sha1()
+        with open(source_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        self._index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": digest.hexdigest()}
+        self._save_index()
+        return digest.hexdigest()
+
+    def _remove_stale(self, source_name, current_prefix):
+        """
+        Entfernt Einträge derselben Quelldatei mit einem älteren Hash.
+        """
+        stem, extension = os.path.splitext(source_name)
+        # Einträge aus Versionen, die nur den Namen ohne Endung verwendet haben
+        legacy = re.compile(rf"{re.escape(stem)}-[0-9a-f]{{16}}-[^-]+\.png") if extension else None
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".png") or name.startswith(current_prefix):
+                continue
+            # Nur Einträge mit genau dieser Quelle (Name.Endung-Hash-Variante)
+            if name.startswith(f"{source_name}-") and name[len(source_name) + 1:].count("-") == 1:
+                os.remove(os.path.join(self.cache_dir, name))
+            elif legacy and legacy.fullmatch(name):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, self.index_path)
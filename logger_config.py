@@ -6,26 +6,149 @@ Version: 1.0.0
 Entwickler: Annatina Christ
 Datum: 29.11.2024
 
+Beschreibung:
+Die Logger schreiben nicht selbst auf die SD-Karte: jede Meldung wird nur in
+eine begrenzte Queue gelegt (QueueHandler). Ein einziger Schreib-Thread
+(QueueListener) leert die Queue, verteilt die Meldungen auf die Log-Dateien
+und schreibt sie blockweise mit einem flush pro Block. Ist die Queue voll,
+werden Meldungen verworfen statt den Aufrufer (z.B. den Reader) warten zu
+lassen; die verworfenen Meldungen werden gezählt und protokolliert.
 
 Changelog:
 - [Datum]: Erste Version.
 - [Datum]: Weitere Änderungen/Verbesserungen.
+- [19.10.26]: Log-Level aus der Konfiguration ([logging] level), ohne Neustart änderbar.
+- [19.10.26]: Schreiben über eine begrenzte Queue und einen Schreib-Thread, blockweises flush.
 
 ===============================================================================
 """
 
 
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+from config_loader import config
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler, der bei voller Queue nicht blockiert, sondern die Meldung
+    verwirft und pro Level zählt. Die letzten 10 % der Queue sind für
+    Warnungen und Fehler reserviert, DEBUG/INFO werden vorher verworfen.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = {}
+        self.reserve_limit = int(log_queue.maxsize * 0.9)
+        self._lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            if record.levelno < logging.WARNING and self.queue.qsize() >= self.reserve_limit:
+                raise queue.Full
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+    def dropped_total(self):
+        with self._lock:
+            return sum(self.dropped.values())
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler ohne flush nach jeder Meldung; der Schreib-Thread
+    ruft `flush_batch` einmal pro Block auf.
+    """
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    QueueListener, der nach dem ersten Eintrag alle bereits wartenden Einträge
+    (höchstens `batch_size`) abarbeitet und danach einmal flusht.
+    """
+
+    def __init__(self, log_queue, *handlers, queue_handler=None, batch_size=100):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self.batch_size = batch_size
+        self.written = 0
+        self.batches = 0
+        self.max_batch = 0
+        self._reported_drops = 0
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # Blockierend: eine volle Queue wird gerade geleert
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, 'task_done')
+        stop = False
+        while not stop:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                if has_task_done:
+                    q.task_done()
+                if record is self._sentinel:
+                    stop = True
+                    continue
+                self.handle(record)
+            self._report_drops()
+            self._flush()
+
+            count = len(batch) - (1 if stop else 0)
+            self.written += count
+            self.batches += 1
+            self.max_batch = max(self.max_batch, count)
+
+    def _report_drops(self):
+        if self.queue_handler is None:
+            return
+        dropped = self.queue_handler.dropped_total()
+        if dropped > self._reported_drops:
+            self.handle(logging.makeLogRecord({
+                "name": "general_logger",
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"[Logging] {dropped - self._reported_drops} Log-Meldungen verworfen (Queue voll).",
+            }))
+            self._reported_drops = dropped
+
+    def _flush(self):
+        for handler in self.handlers:
+            if isinstance(handler, BatchedRotatingFileHandler):
+                handler.flush_batch()
+            else:
+                handler.flush()
+
 
 class LoggerConfig:
     _configured = False
+    _queue_handler = None
+    _listener = None
+
+    def __init__(self, log_file=None, sql_log_file=None, connection_log_file=None,
+                 rfid_log_file=None, level=None, max_log_size=2*1024*1024, backup_count=5, formatter=None,
+                 queue_size=None, batch_size=None):
 
-    def __init__(self, log_file=None, sql_log_file=None, connection_log_file=None, 
-                 rfid_log_file=None, level=None, max_log_size=2*1024*1024, backup_count=5, formatter=None):
-        
         # Set default values if not provided (environment variables can override these)
         base_dir = os.path.dirname(os.path.abspath(__file__))  # Directory of the script
 
@@ -35,13 +158,18 @@ class LoggerConfig:
         self.connection_log_file = connection_log_file or os.path.join(base_dir, "logs", "connection.log")
         self.rfid_log_file = rfid_log_file or os.path.join(base_dir, "logs", "rfid.log")
 
-        # Configure log level from environment variable or default to "DEBUG"
-        self.level = level or os.getenv("LOG_LEVEL", "DEBUG").upper()
+        # Configure log level from the config file, the environment variable or default to "DEBUG"
+        self.level = level or config.value('logging', 'level') or os.getenv("LOG_LEVEL", "DEBUG").upper()
 
         # Set max log size and backup count
         self.max_log_size = max_log_size
         self.backup_count = backup_count
-        
+
+        # Size of the log queue and maximum number of records written per flush
+        self.queue_size = queue_size or config.value('logging', 'queue_size')
+        self.batch_size = batch_size or config.value('logging', 'batch_size')
+        self._handlers = []
+
         # Default log formatter
         self.formatter = formatter or logging.Formatter(
             fmt="{asctime} - {levelname} - {message}",
@@ -52,38 +180,77 @@ class LoggerConfig:
     def configure(self):
         if LoggerConfig._configured:
             return
+        LoggerConfig._queue_handler = DroppingQueueHandler(queue.Queue(maxsize=self.queue_size))
         self.configure_logger("general_logger", self.log_file)
         self.configure_logger("sql_logger", self.sql_log_file)
         self.configure_logger("connection_logger", self.connection_log_file)
         self.configure_logger("rfid_logger", self.rfid_log_file)
+        self._configure_console_logger()
+
+        # Ein einziger Schreib-Thread für alle Log-Dateien
+        LoggerConfig._listener = BatchingQueueListener(
+            LoggerConfig._queue_handler.queue,
+            *self._handlers,
+            queue_handler=LoggerConfig._queue_handler,
+            batch_size=self.batch_size,
+        )
+        LoggerConfig._listener.start()
+        atexit.register(LoggerConfig.shutdown)
+
+        config.on_change('logging', 'level', self.set_level)
         LoggerConfig._configured = True
 
+    def set_level(self, level):
+        """Change the level of all configured loggers (e.g. after a config reload)."""
+        self.level = level or os.getenv("LOG_LEVEL", "DEBUG").upper()
+        for name in ("general_logger", "sql_logger", "connection_logger", "rfid_logger"):
+            logging.getLogger(name).setLevel(self.level)
+
     def configure_logger(self, name, log_file):
         logger = logging.getLogger(name)
         logger.setLevel(self.level)
-        self._configure_rotating_logger(log_file, logger)
-        self._configure_console_logger(logger)
+        self._configure_rotating_logger(log_file, name)
+        if LoggerConfig._queue_handler not in logger.handlers:
+            logger.addHandler(LoggerConfig._queue_handler)
         return logger
 
-    def _configure_rotating_logger(self, log_file, logger=None):
+    def _configure_rotating_logger(self, log_file, name):
         os.makedirs(os.path.dirname(log_file), exist_ok=True)  # Ensure the directory exists
-        if not any(isinstance(h, RotatingFileHandler) and h.baseFilename == log_file for h in logger.handlers):
-            rotating_handler = RotatingFileHandler(
-                log_file,
-                maxBytes=self.max_log_size,
-                backupCount=self.backup_count,
-                encoding="utf-8",
-            )
-            rotating_handler.setFormatter(self.formatter)
-            logger.addHandler(rotating_handler)
-
-    def _configure_console_logger(self, logger):
-        if not any(isinstance(h, logging.StreamHandler) for h in logger.handlers):
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.ERROR)
-            console_handler.setFormatter(self.formatter)
-            logger.addHandler(console_handler)
+        rotating_handler = BatchedRotatingFileHandler(
+            log_file,
+            maxBytes=self.max_log_size,
+            backupCount=self.backup_count,
+            encoding="utf-8",
+        )
+        rotating_handler.setFormatter(self.formatter)
+        rotating_handler.addFilter(logging.Filter(name))  # Only records of this logger go to its file
+        self._handlers.append(rotating_handler)
+
+    def _configure_console_logger(self):
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.ERROR)
+        console_handler.setFormatter(self.formatter)
+        self._handlers.append(console_handler)
 
     def get_logger(self, name):
         return logging.getLogger(name)
 
+    @classmethod
+    def stats(cls):
+        """Return queue usage, dropped records per level and write batches of the log writer."""
+        if cls._listener is None:
+            return None
+        return {
+            "queued": cls._queue_handler.queue.qsize(),
+            "dropped": dict(cls._queue_handler.dropped),
+            "written": cls._listener.written,
+            "batches": cls._listener.batches,
+            "max_batch": cls._listener.max_batch,
+        }
+
+    @classmethod
+    def shutdown(cls):
+        """Write all queued records and stop the log writer thread."""
+        listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()
@@ -11,98 +11,200 @@ für die Überwachung der Verbindung.
 Changelog:
 - [29.11.24]: Erste Version.
 - [11.12.24]: Kommentare und Beschreibungen auf Deutsch
+- [19.10.26]: Statistik der vorbereiteten Befehle beim Beenden protokollieren
+- [19.10.26]: Optionaler Write-Behind-Modus für Stempel (stamp_writer.py)
+- [19.10.26]: Lokale Tag-/Personenliste mit Delta-Synchronisation (roster.py)
+- [19.10.26]: Austauschbares Speicher-Backend, MySQL oder eingebettetes SQLite (storage/)
+- [19.10.26]: Perzentile der Abfragelaufzeiten beim Beenden protokollieren (query_metrics.py)
+- [19.10.26]: Backup wird im Hintergrund mit Zeilenbudget eingespielt (replay_worker.py)
+- [19.10.26]: Verbindungszustand im GUI, ein gemeinsamer conn_lock für alle Threads (connection_state.py)
+- [19.10.26]: Reader zeigt Nachrichten über den GuiBus an (gui_bus.py)
+- [19.10.26]: Swirl-Animation im Hintergrund laden, Bildrate beim Beenden protokollieren (animation.py)
+- [19.10.26]: Austauschbare Oberfläche, Tk-GUI oder Headless mit LEDs und Summer (ui/)
+- [19.10.26]: Zentrale Konfiguration, sichere Schlüssel werden ohne Neustart übernommen (config_loader.py)
+- [19.10.26]: Log-Queue beim Beenden leeren und verworfene Meldungen protokollieren (logger_config.py)
+- [19.10.26]: Reader beim Beenden anhalten, bevor das Write-Behind-Journal geschlossen wird
+- [19.10.26]: Listen-Synchronisation mit eigener Verbindung statt unter conn_lock (roster.py)
 
 ===============================================================================
 """
 
 import sys
+import time
+import resource
 import threading
 import logging
-from gui import create_gui
-from connection import connection_checker
+from connection import conn_lock, connection_checker, connection_state, using_fallback_host
 from rfid import initialize_reader, rfid_reader
-from database import connect_to_database, process_backup_data
-import configparser
+from database import connect_to_database, query_metrics, statements
+from stamp_writer import StampWriter
+from replay_worker import ReplayWorker
+from roster import Roster
+from storage import create_backend
+from ui import create_ui
+from config_loader import config
+from logger_config import LoggerConfig
 
 # Initialisiere Logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("main_logger")
 
-# Konfigurationsdateien laden
-config = configparser.ConfigParser()
-config_path = 'config/config.cnf'
-config.read(config_path)
-device_name = config['device']['name']  # Lade den Gerätenamen aus der Konfigurationsdatei
-device_user = config['device']['username'] #Gerät-Benutzername aus der Konfigurationsdatei
+# Einstellungen aus der zentralen Konfiguration (config_loader.py, einmal gelesen und geprüft)
+device_name = config.value('device', 'name')  # Lade den Gerätenamen aus der Konfigurationsdatei
+device_user = config.value('device', 'username') #Gerät-Benutzername aus der Konfigurationsdatei
+write_behind = config.value('stamp', 'write_behind')  # Stempel verzögert in die Datenbank schreiben
+roster_enabled = config.value('roster', 'enabled')  # Lokale Tag-/Personenliste (benötigt Migration 003)
+storage_backend = config.value('storage', 'backend')  # "mysql" oder "sqlite" (ohne Server)
+ui_backend = config.value('ui', 'backend')  # "tk" oder "headless" (LEDs und Summer, kein Bildschirm)
 
 # Initialize the PN532 RFID reader
 pn532_ref = initialize_reader()
 
-def on_close(root, conn_ref):
+# Wird beim Beenden gesetzt, der Reader nimmt danach keine Tags mehr an
+reader_stop = threading.Event()
+
+def on_close(ui, backend, stamp_writer=None, replay_worker=None, rfid_thread=None):
     """
     Verarbeitet das Schließen der Anwendung und bereinigt Ressourcen.
     
-    Diese Funktion schließt die Datenbankverbindung, wenn eine aktive 
-    Verbindung besteht, und beendet die Anwendung sauber.
+    Diese Funktion schreibt offene Stempel des Write-Behind-Puffers, schließt
+    das Speicher-Backend (bei MySQL die aktive Datenbankverbindung) und die
+    Oberfläche und beendet die Anwendung sauber.
     """
     logger.info("Anwendung wird heruntergefahren.")
 
+    # Zuerst den Reader anhalten, damit nach dem Schließen des Journals keine Stempel mehr kommen
+    reader_stop.set()
+    if rfid_thread:
+        rfid_thread.join(timeout=2)
+        if rfid_thread.is_alive():
+            logger.warning("RFID-Reader hat nicht rechtzeitig angehalten.")
+
+    if replay_worker:
+        replay_worker.stop()
+        logger.info(f"Backup-Replay beendet: {replay_worker.progress()}")
+
+    if stamp_writer:
+        stamp_writer.stop(flush=True)
+        logger.info(f"Write-Behind-Puffer beendet: {stamp_writer.stats()}")
+
+    # Ausführungsstatistik der vorbereiteten Befehle festhalten
+    statements.log_stats(logger)
+    query_metrics.log_snapshot(logger)
+    logger.info(f"Oberfläche ({ui_backend}): {ui.stats()}")
+    logger.info(f"Log-Queue: {LoggerConfig.stats()}")
+
     try:
-        conn = conn_ref.get('conn')
-        if conn and conn.is_connected():
-            conn.close()
-            logger.info("Datenbankverbindung geschlossen.")
-        else:
-            logger.warning("Keine aktive Datenbankverbindung zum Schließen.")
+        backend.close()
+        logger.info("Speicher-Backend geschlossen.")
     except Exception as e:
         logger.error(f"Fehler beim Schließen der Datenbankverbindung: {e}")
 
-    root.destroy()
+    ui.close()
+    LoggerConfig.shutdown()  # Restliche Meldungen schreiben
     sys.exit()
 
 # Hauptprogramm-Einstiegspunkt
 if __name__ == '__main__':
-    # Erstelle das GUI
-    root = create_gui()
+    # Erstelle die Oberfläche (GUI oder LEDs und Summer)
+    start_time = time.perf_counter()
+    ui = create_ui(ui_backend, config)
     
     # Initialisiere die Referenz für die Datenbankverbindung
     conn_ref = {'conn': None, 'is_connected': False}
-    conn_lock = threading.Lock()  # Erstelle einen Lock für die gemeinsame Nutzung von Datenbank- und Hardware-Operationen
+    # conn_lock aus connection.py: derselbe Lock für Reader, Verbindungs-Checker und Hintergrund-Threads
+    connection_state.bind(conn_ref)  # is_connected wird nur noch über den Zustandsautomaten geändert
+    ui.bind_connection_state(connection_state)
+    backend = create_backend(storage_backend, conn_ref, config.value('storage', 'sqlite_path'))
+    use_server = storage_backend == 'mysql'  # Mit SQLite entfallen Verbindung, Backup, Liste und Write-Behind
 
     # Versuche, eine Verbindung zur Datenbank herzustellen
-    conn_ref['conn'] = connect_to_database()
-    if conn_ref['conn']:
-        conn_ref['is_connected'] = True
-        logger.info("[Main] Datenbankverbindung erfolgreich hergestellt.")
-        # Verarbeite Backup-Daten, falls vorhanden
-        process_backup_data(conn_ref['conn'])
-
-        
-        
+    if not use_server:
+        logger.info("[Main] Eingebettetes SQLite-Backend aktiv. Anwendung läuft ohne Server.")
+        connection_state.update(connected=True, reason="Eingebettetes SQLite-Backend")
     else:
-        conn_ref['is_connected'] = False
-        logger.warning("[Main] Fehler bei der Datenbankverbindung. Anwendung läuft im Offline-Modus.")
-        
+        conn_ref['conn'] = connect_to_database()
+        if conn_ref['conn']:
+            connection_state.update(connected=True, degraded=using_fallback_host(), reason="Start")
+            logger.info("[Main] Datenbankverbindung erfolgreich hergestellt.")
+        else:
+            connection_state.update(connected=False, reason="Start ohne Verbindung")
+            logger.warning("[Main] Fehler bei der Datenbankverbindung. Anwendung läuft im Offline-Modus.")
+
+    # Lokale Tag-/Personenliste: Snapshot sofort laden, danach im Hintergrund synchronisieren
+    roster = None
+    if use_server and roster_enabled:
+        roster = Roster(
+            'cache',
+            sync_interval=config.value('roster', 'sync_interval'),
+            full_sync_interval=config.value('roster', 'full_sync_interval'),
+        )
+        roster.load_snapshot()
+        threading.Thread(
+            target=roster.run,
+            args=(conn_ref,),  # Eigene Verbindung, hält den conn_lock nicht
+            name="RosterSyncThread",
+            daemon=True
+        ).start()
+
+    # Optional: Stempel zuerst ins lokale Journal, Group Commit im Hintergrund
+    stamp_writer = None
+    if use_server and write_behind:
+        stamp_writer = StampWriter(
+            'backup/journal.db',
+            conn_ref,
+            conn_lock,
+            flush_interval_ms=config.value('stamp', 'flush_interval_ms'),
+            flush_rows=config.value('stamp', 'flush_rows'),
+        )
+        stamp_writer.start()
+
+    # Backup-Daten im Hintergrund einspielen, der Reader ist sofort bereit
+    replay_worker = None
+    if use_server:
+        replay_worker = ReplayWorker(
+            conn_ref,
+            conn_lock,
+            rows_per_second=config.value('backup', 'replay_rows_per_second'),
+            batch_size=config.value('backup', 'replay_batch_size'),
+            tap_pause_ms=config.value('backup', 'replay_tap_pause_ms'),
+            state=connection_state,
+        )
+        replay_worker.start()
+        # Budget und Pause beim Tippen ohne Neustart anpassbar
+        config.on_change('backup', 'replay_rows_per_second',
+                         lambda value: setattr(replay_worker, 'rows_per_second', value))
+        config.on_change('backup', 'replay_batch_size',
+                         lambda value: setattr(replay_worker, 'batch_size', value))
+        config.on_change('backup', 'replay_tap_pause_ms',
+                         lambda value: setattr(replay_worker, 'tap_pause', value / 1000))
 
     # Starte den RFID-Reader-Thread
     rfid_thread = threading.Thread(
         target=rfid_reader,
-        args=(conn_ref, root, conn_lock, device_name, pn532_ref),  # Übergibt notwendige Argumente
+        args=(backend, ui, conn_lock, device_name, pn532_ref, stamp_writer, roster, replay_worker, reader_stop),  # Übergibt notwendige Argumente
         name="RFIDReaderThread",
         daemon=True  # Der Thread wird beendet, wenn das Hauptprogramm beendet wird
     )
     rfid_thread.start()
     
     # Starte den Verbindung-Checker-Thread
-    threading.Thread(
-        target=connection_checker,
-        args=(conn_ref, root),
-        name="ConnectionCheckerThread",
-        daemon=True  # Der Thread wird beendet, wenn das Hauptprogramm beendet wird
-    ).start()
+    if use_server:
+        threading.Thread(
+            target=connection_checker,
+            args=(conn_ref, replay_worker),
+            name="ConnectionCheckerThread",
+            daemon=True  # Der Thread wird beendet, wenn das Hauptprogramm beendet wird
+        ).start()
    
-    # Definiere das Verhalten beim Schließen der Anwendung
-    root.protocol("WM_DELETE_WINDOW", lambda: on_close(root, conn_ref))
-    
-    # Starte die Haupt-GUI-Schleife
-    root.mainloop()
+    # Konfigurationsdatei überwachen, sichere Schlüssel gelten sofort (siehe config_loader.SCHEMA)
+    config.watch()
+
+    # Startdauer und Speicherbedarf (Spitze, in kB) der gewählten Oberfläche festhalten
+    logger.info(
+        f"[Main] Bereit nach {(time.perf_counter() - start_time) * 1000:.0f} ms "
+        f"(Oberfläche: {ui_backend}, Speicher: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} kB)."
+    )
+
+    # Starte die Hauptschleife der Oberfläche, beim Schließen wird on_close aufgerufen
+    ui.run(lambda: on_close(ui, backend, stamp_writer, replay_worker, rfid_thread))
@@ -0,0 +1,13 @@
+-- =============================================================================
+-- Projekt: Noatime
+-- Migration: 001_stamp_scan_id.sql
+-- Datum: 19.10.2026
+--
+-- Jeder Stempel erhält eine vom Terminal erzeugte Scan-ID. Der eindeutige
+-- Schlüssel macht das Wiederholen von Stempeln idempotent
+-- (INSERT ... ON DUPLICATE KEY UPDATE). Bestehende Zeilen behalten NULL.
+-- =============================================================================
+
+ALTER TABLE stamp
+    ADD COLUMN sta_scan_id CHAR(32) NULL,
+    ADD UNIQUE KEY uq_stamp_scan_id (sta_scan_id);
@@ -0,0 +1,13 @@
+-- =============================================================================
+-- Projekt: Noatime
+-- Migration: 002_stamp_indexes.sql
+-- Datum: 19.10.2026
+--
+-- Indizes für die Abfragen im Stempelpfad (database.py):
+-- - Tageszählung: sta_key_id = ? AND sta_stempel_zeit im Bereich [heute, morgen)
+-- - Tag- und Namenssuche über person_key.peke_key_id
+-- =============================================================================
+
+CREATE INDEX idx_stamp_key_time ON stamp (sta_key_id, sta_stempel_zeit);
+
+CREATE INDEX idx_person_key_key_id ON person_key (peke_key_id);
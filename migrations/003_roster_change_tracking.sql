@@ -0,0 +1,16 @@
+-- =============================================================================
+-- Projekt: Noatime
+-- Migration: 003_roster_change_tracking.sql
+-- Datum: 19.10.2026
+--
+-- Änderungszeitpunkte für person_key und person, damit die Terminals nur
+-- geänderte Zeilen nachladen können (Delta-Synchronisation, roster.py).
+-- =============================================================================
+
+ALTER TABLE person_key
+    ADD COLUMN peke_changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_person_key_changed_at (peke_changed_at);
+
+ALTER TABLE person
+    ADD COLUMN pers_changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    ADD INDEX idx_person_changed_at (pers_changed_at);
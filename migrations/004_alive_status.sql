@@ -0,0 +1,20 @@
+-- =============================================================================
+-- Projekt: Noatime
+-- Migration: 004_alive_status.sql
+-- Datum: 19.10.2026
+--
+-- Gerätestatus in der Lebenszeichen-Zeile, damit er mit demselben Upsert wie
+-- das Lebenszeichen geschrieben wird (connection.py, heartbeat.py).
+-- alive_lastcheck wird alle alive_interval_s Sekunden (1-5 Minuten)
+-- geschrieben, auch während gestempelt wird; ein Terminal gilt als aktiv,
+-- solange alive_lastcheck jünger als etwa zwei alive_interval_s ist.
+-- alive_last_stamp ist der letzte Stempel zum Zeitpunkt des Lebenszeichens
+-- (Information, kein eigenes Lebenszeichen).
+-- =============================================================================
+
+ALTER TABLE z_sys_alive_check
+    ADD COLUMN alive_status VARCHAR(16) NULL,
+    ADD COLUMN alive_backlog INT NULL,
+    ADD COLUMN alive_last_stamp DATETIME NULL,
+    ADD COLUMN alive_uptime_s INT NULL,
+    ADD COLUMN alive_interval_s INT NULL;
@@ -0,0 +1,121 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: netlink_monitor.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Meldet Änderungen an Netzwerkschnittstellen, Adressen und Routen über einen
+Netlink-Socket (NETLINK_ROUTE). Der Verbindungs-Checker wartet auf diese
+Ereignisse statt in festen Abständen zu prüfen und reagiert so sofort, wenn
+ein Kabel gezogen wird oder das WLAN zurückkommt.
+
+Auf Systemen ohne Netlink (nicht Linux) bleibt der Monitor inaktiv und
+`wait` verhält sich wie ein normales Warten mit Timeout.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import logging
+import socket
+import struct
+import threading
+
+netlink_logger = logging.getLogger("connection_logger")
+
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+# Nachrichtentypen aus linux/rtnetlink.h
+MESSAGE_TYPES = {
+    16: "NEWLINK",
+    17: "DELLINK",
+    20: "NEWADDR",
+    21: "DELADDR",
+    24: "NEWROUTE",
+    25: "DELROUTE",
+}
+NLMSG_HEADER = struct.Struct("=LHHLL")
+
+
+class NetlinkMonitor:
+    """
+    Hintergrund-Thread, der bei jeder Link-, Adress- oder Routenänderung
+    ein Ereignis auslöst.
+    """
+
+    def __init__(self):
+        self.available = hasattr(socket, "AF_NETLINK")
+        self.events = 0
+        self._event = threading.Event()
+        self._socket = None
+        self._thread = None
+
+    def start(self):
+        """
+        Öffnet den Netlink-Socket und startet den Empfangs-Thread.
+        Gibt False zurück, wenn Netlink nicht verfügbar ist.
+        """
+        if not self.available:
+            return False
+        try:
+            self._socket = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            self._socket.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE
+                               | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE))
+        except OSError as e:
+            netlink_logger.warning(f"[Netlink] Monitor nicht verfügbar, es wird periodisch geprüft: {e}")
+            self.available = False
+            return False
+
+        self._thread = threading.Thread(target=self._run, name="NetlinkMonitorThread", daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout):
+        """
+        Wartet höchstens `timeout` Sekunden auf eine Netzwerkänderung.
+        Gibt True zurück, wenn eine Änderung gemeldet wurde.
+        """
+        changed = self._event.wait(timeout)
+        self._event.clear()
+        return changed
+
+    def notify(self):
+        """
+        Weckt wartende Threads auf, z.B. wenn ein anderer Teil der Anwendung
+        einen Verbindungsfehler festgestellt hat.
+        """
+        self._event.set()
+
+    def _run(self):
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except OSError as e:
+                netlink_logger.error(f"[Netlink] Empfang fehlgeschlagen, Monitor beendet: {e}")
+                self.available = False
+                return
+
+            kinds = []
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                length, message_type, _, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+                if length < NLMSG_HEADER.size:
+                    break
+                if message_type in MESSAGE_TYPES:
+                    kinds.append(MESSAGE_TYPES[message_type])
+                offset += (length + 3) & ~3  # Nachrichten sind auf 4 Bytes ausgerichtet
+
+            if kinds:
+                self.events += 1
+                netlink_logger.info(f"[Netlink] Netzwerkänderung: {', '.join(kinds)}")
+                self._event.set()
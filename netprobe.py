@@ -0,0 +1,114 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: netprobe.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Erreichbarkeitsprüfungen ohne externe Prozesse. Die Standardroute wird direkt
+aus /proc/net/route gelesen, die Erreichbarkeit eines Servers mit einem
+nicht blockierenden TCP-Verbindungsaufbau auf dessen Port geprüft. Auf dem
+MySQL-Port wird zusätzlich die Begrüssung des Servers gelesen.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Begrüssung (Handshake-Paket) des MySQL-Servers lesen statt nur den Port zu öffnen.
+
+===============================================================================
+"""
+
+import errno
+import select
+import socket
+import struct
+import time
+
+PROC_NET_ROUTE = "/proc/net/route"
+RTF_UP = 0x0001
+RTF_GATEWAY = 0x0002
+MYSQL_PROTOCOL_VERSION = 10  # Erstes Byte der Begrüssung; 0xff wäre ein Fehlerpaket (z.B. Host gesperrt)
+
+
+def default_gateway(route_file=PROC_NET_ROUTE):
+    """
+    Gibt die IPv4-Adresse des Standard-Gateways zurück, oder None, wenn keine
+    aktive Standardroute existiert (z.B. Kabel gezogen, WLAN getrennt).
+    """
+    try:
+        with open(route_file, "r") as f:
+            next(f, None)  # Kopfzeile
+            for line in f:
+                fields = line.split()
+                if len(fields) < 4 or fields[1] != "00000000":
+                    continue
+                flags = int(fields[3], 16)
+                if not flags & RTF_UP:
+                    continue
+                if not flags & RTF_GATEWAY:
+                    return "0.0.0.0"  # Direkt angebundenes Netz ohne Gateway
+                # Die Adresse steht als Hex in Host-Byte-Reihenfolge (Little Endian)
+                return socket.inet_ntoa(struct.pack("<I", int(fields[2], 16)))
+    except OSError:
+        return None
+    return None
+
+
+def tcp_probe(host, port, timeout, read_greeting=False):
+    """
+    Nicht blockierender TCP-Verbindungsaufbau zu `host:port`. Gibt die Dauer
+    bis zum Verbindungsaufbau in ms zurück, oder None, wenn der Port nicht
+    innerhalb von `timeout` Sekunden antwortet.
+    Mit `read_greeting` wird zusätzlich auf die Begrüssung des MySQL-Servers
+    gewartet; ein Fehlerpaket (z.B. wegen max_connect_errors gesperrt) oder
+    eine fehlende Begrüssung gilt als nicht erreichbar.
+    """
+    start = time.perf_counter()
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError:
+        return None
+
+    for family, socktype, proto, _, address in infos:
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.setblocking(False)
+            result = sock.connect_ex(address)
+            if result not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                continue
+            remaining = timeout - (time.perf_counter() - start)
+            if remaining <= 0:
+                return None
+            _, writable, _ = select.select([], [sock], [], remaining)
+            if not writable or sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) != 0:
+                continue
+            if read_greeting and not _read_mysql_greeting(sock, timeout - (time.perf_counter() - start)):
+                return None
+            return (time.perf_counter() - start) * 1000
+        except OSError:
+            continue
+        finally:
+            sock.close()
+    return None
+
+
+def _read_mysql_greeting(sock, timeout):
+    """
+    Liest den Anfang des Handshake-Pakets (4 Bytes Kopf, dann die Protokollversion).
+    Gibt True zurück, wenn der Server sich als MySQL-Server meldet.
+    """
+    data = b""
+    deadline = time.perf_counter() + timeout
+    while len(data) < 5:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        readable, _, _ = select.select([sock], [], [], remaining)
+        if not readable:
+            return False
+        chunk = sock.recv(5 - len(data))
+        if not chunk:
+            return False  # Verbindung vom Server geschlossen
+        data += chunk
+    return data[4] == MYSQL_PROTOCOL_VERSION
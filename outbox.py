@@ -0,0 +1,285 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: outbox.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Lokale, dauerhafte Warteschlange (SQLite im WAL-Modus) für Datenbankbefehle,
+die im Offline-Modus nicht ausgeführt werden konnten. Ersetzt die JSON-Backup-
+Datei: Einträge werden atomar geschrieben, für die Wiederholung reserviert
+(claim) und nach erfolgreicher Ausführung bestätigt (ack).
+
+Einträge, die nach `max_attempts` Versuchen immer noch fehlschlagen, werden
+als 'failed' markiert und nicht mehr automatisch wiederholt, aber nie
+gelöscht: ein Stempel darf nicht stillschweigend verloren gehen. Sie werden
+mit Inhalt im sql_logger (ERROR) protokolliert und können mit
+`requeue_failed` erneut eingereiht werden.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: oldest_created_at für die Flush-Verzögerung des Write-Behind-Journals.
+- [19.10.26]: Fehlgeschlagene Einträge werden nicht mehr gelöscht, sondern behalten und protokolliert.
+
+===============================================================================
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+outbox_logger = logging.getLogger("sql_logger")
+
+PENDING = "pending"
+CLAIMED = "claimed"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sql TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at REAL NOT NULL,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status_created ON outbox (status, created_at, id);
+"""
+
+
+class Outbox:
+    """
+    Dauerhafte Warteschlange für SQL-Befehle mit Parametern.
+
+    Die SQLite-Verbindung bleibt für die ganze Laufzeit offen, damit ein
+    Offline-Stempel nur eine kurze Transaktion kostet und kein Öffnen und
+    Schliessen einer Datei.
+    """
+
+    def __init__(self, path, max_rows=100000, max_attempts=5):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        # auto_vacuum muss vor dem Anlegen der Tabellen gesetzt werden
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        # FULL: jede bestätigte Transaktion übersteht auch einen Stromausfall
+        self._db.execute("PRAGMA synchronous = FULL")
+        self._db.execute("PRAGMA journal_size_limit = 1048576")
+        self._db.executescript(SCHEMA)
+        self._recover_claims()
+
+    def append(self, sql, params):
+        """
+        Hängt einen Befehl an die Warteschlange an.
+        Gibt False zurück, wenn die maximale Grösse erreicht ist.
+        """
+        with self._lock:
+            if self._count(PENDING) + self._count(CLAIMED) >= self.max_rows:
+                outbox_logger.error(f"[Outbox] Maximale Grösse von {self.max_rows} Einträgen erreicht. Eintrag verworfen.")
+                return False
+            self._db.execute(
+                "INSERT INTO outbox (sql, params, status, created_at) VALUES (?, ?, ?, ?)",
+                (sql, json.dumps(list(params), default=str), PENDING, time.time()),
+            )
+            return True
+
+    def claim(self, limit=100):
+        """
+        Reserviert die ältesten offenen Einträge atomar für die Wiederholung.
+        Gibt eine Liste von (id, sql, params) zurück.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id, sql, params FROM outbox WHERE status = ? ORDER BY created_at, id LIMIT ?",
+                    (PENDING, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE outbox SET status = ?, claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    [(CLAIMED, time.time(), row[0]) for row in rows],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return [(row_id, sql, json.loads(params)) for row_id, sql, params in rows]
+
+    def ack(self, ids):
+        """
+        Bestätigt erfolgreich ausgeführte Einträge und entfernt sie.
+        """
+        if not ids:
+            return
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id in ids])
+            self._db.execute("COMMIT")
+            self._db.execute("PRAGMA incremental_vacuum")
+
+    def release(self, ids):
+        """
+        Gibt reservierte Einträge unverändert wieder frei (z.B. bei Verbindungsverlust).
+        Bereits bestätigte oder als fehlerhaft markierte Einträge bleiben unberührt.
+        """
+        if not ids:
+            return
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "UPDATE outbox SET status = ?, claimed_at = NULL, attempts = MAX(attempts - 1, 0) "
+                "WHERE id = ? AND status = ?",
+                [(PENDING, row_id, CLAIMED) for row_id in ids],
+            )
+            self._db.execute("COMMIT")
+
+    def fail(self, ids, error):
+        """
+        Markiert Einträge als fehlgeschlagen. Nach `max_attempts` Versuchen bleiben
+        sie als 'failed' liegen, werden nicht mehr wiederholt und als Fehler
+        protokolliert. Gelöscht wird nichts.
+        """
+        if not ids:
+            return
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "UPDATE outbox SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "claimed_at = NULL, last_error = ? WHERE id = ?",
+                [(self.max_attempts, FAILED, PENDING, str(error), row_id) for row_id in ids],
+            )
+            given_up = self._db.execute(
+                f"SELECT id, sql, params, attempts FROM outbox WHERE status = ? "
+                f"AND id IN ({', '.join('?' * len(ids))})",
+                (FAILED, *ids),
+            ).fetchall()
+            self._db.execute("COMMIT")
+
+        for row_id, sql, params, attempts in given_up:
+            outbox_logger.error(
+                f"[Outbox] Eintrag {row_id} nach {attempts} Versuchen aufgegeben, bleibt als 'failed' "
+                f"gespeichert: {sql} {params} ({error})"
+            )
+
+    def failed_entries(self, limit=100):
+        """
+        Gibt die ältesten aufgegebenen Einträge als (id, sql, params) zurück.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, sql, params FROM outbox WHERE status = ? ORDER BY id LIMIT ?",
+                (FAILED, limit),
+            ).fetchall()
+        return [(row_id, sql, json.loads(params)) for row_id, sql, params in rows]
+
+    def requeue_failed(self, ids=None):
+        """
+        Reiht aufgegebene Einträge (alle oder nur `ids`) mit zurückgesetzten
+        Versuchen wieder ein, z.B. nachdem die Ursache behoben wurde.
+        Gibt die Anzahl wieder eingereihter Einträge zurück.
+        """
+        with self._lock:
+            if ids is None:
+                cursor = self._db.execute(
+                    "UPDATE outbox SET status = ?, attempts = 0 WHERE status = ?", (PENDING, FAILED),
+                )
+                return cursor.rowcount
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "UPDATE outbox SET status = ?, attempts = 0 WHERE id = ? AND status = ?",
+                [(PENDING, row_id, FAILED) for row_id in ids],
+            )
+            self._db.execute("COMMIT")
+            return len(ids)
+
+    def failed_count(self):
+        """
+        Gibt die Anzahl der aufgegebenen Einträge zurück.
+        """
+        with self._lock:
+            return self._count(FAILED)
+
+    def pending_count(self):
+        """
+        Gibt die Anzahl der noch nicht ausgeführten Einträge zurück.
+        """
+        with self._lock:
+            return self._count(PENDING) + self._count(CLAIMED)
+
+    def oldest_created_at(self):
+        """
+        Gibt den Zeitpunkt (Unix-Zeit) des ältesten offenen Eintrags zurück oder None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN (?, ?)",
+                (PENDING, CLAIMED),
+            ).fetchone()
+            return row[0]
+
+    def import_json_lines(self, json_path):
+        """
+        Importiert eine alte JSON-Lines-Backup-Datei in einer einzigen Transaktion
+        und benennt sie danach um, damit sie nicht doppelt importiert wird.
+        Gibt die Anzahl der importierten Einträge zurück.
+        """
+        if not os.path.exists(json_path):
+            return 0
+
+        entries = []
+        with open(json_path, "r") as f:
+            for line_num, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entries.append((entry["sql"], json.dumps(entry["values"], default=str)))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # Abgeschnittene Zeile (z.B. nach einem Stromausfall)
+                    outbox_logger.error(f"[Outbox] Ungültige Zeile {line_num} in {json_path} übersprungen: {line}")
+
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "INSERT INTO outbox (sql, params, status, created_at) VALUES (?, ?, ?, ?)",
+                [(sql, params, PENDING, now) for sql, params in entries],
+            )
+            self._db.execute("COMMIT")
+
+        os.replace(json_path, f"{json_path}.imported")
+        outbox_logger.info(f"[Outbox] {len(entries)} Einträge aus {json_path} importiert.")
+        return len(entries)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _count(self, status):
+        return self._db.execute("SELECT COUNT(*) FROM outbox WHERE status = ?", (status,)).fetchone()[0]
+
+    def _recover_claims(self):
+        """
+        Einträge, die beim letzten Lauf reserviert, aber nie bestätigt wurden,
+        wieder freigeben (z.B. nach einem Absturz während der Wiederholung).
+        """
+        self._db.execute(
+            "UPDATE outbox SET status = ?, claimed_at = NULL WHERE status = ?",
+            (PENDING, CLAIMED),
+        )
@@ -0,0 +1,140 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: query_metrics.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Misst die Dauer jedes SQL-Befehls und jedes Commits. Pro Befehl werden die
+letzten Messwerte für gleitende Perzentile gehalten, langsame Befehle werden
+mit geschwärzten Parametern in den sql_logger geschrieben.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+metrics_logger = logging.getLogger("sql_logger")
+
+
+def redact(params):
+    """
+    Ersetzt Parameterwerte durch Typ und Länge, damit keine UIDs oder Namen im Log landen.
+    """
+    if params is None:
+        return None
+    redacted = []
+    for value in params:
+        if value is None:
+            redacted.append("NULL")
+        elif isinstance(value, (str, bytes)):
+            redacted.append(f"<{type(value).__name__}:{len(value)}>")
+        else:
+            redacted.append(f"<{type(value).__name__}>")
+    return redacted
+
+
+def percentile(sorted_values, fraction):
+    """
+    Gibt das Perzentil (0.0 - 1.0) einer sortierten Liste zurück (nächster Rang).
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class QueryMetrics:
+    """
+    Laufzeitstatistik pro Befehl mit gleitendem Fenster der letzten `window` Messungen.
+    """
+
+    def __init__(self, slow_threshold_ms=200.0, window=1000):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, name, sql=None, params=None):
+        """
+        Misst den umschlossenen Block und ordnet die Dauer dem Befehl `name` zu.
+        """
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, failed, sql, params)
+
+    def record(self, name, elapsed_ms, failed=False, sql=None, params=None):
+        """
+        Nimmt eine Messung auf und protokolliert sie, wenn sie über dem Schwellwert liegt.
+        """
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {
+                    "count": 0,
+                    "errors": 0,
+                    "slow": 0,
+                    "max_ms": 0.0,
+                    "samples": deque(maxlen=self.window),
+                }
+            stats["count"] += 1
+            stats["errors"] += int(failed)
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["samples"].append(elapsed_ms)
+            slow = elapsed_ms >= self.slow_threshold_ms
+            stats["slow"] += int(slow)
+
+        if slow:
+            statement = " ".join(sql.split()) if sql else name
+            metrics_logger.warning(
+                f"[SlowQuery] {name}: {elapsed_ms:.1f} ms (Schwellwert {self.slow_threshold_ms:.0f} ms) "
+                f"{statement} Parameter {redact(params)}"
+            )
+
+    def snapshot(self):
+        """
+        Gibt pro Befehl Anzahl, Fehler, langsame Ausführungen sowie p50/p95/p99
+        und Maximum (in ms) zurück.
+        """
+        with self._lock:
+            items = [(name, dict(stats), sorted(stats["samples"])) for name, stats in self._stats.items()]
+
+        snapshot = {}
+        for name, stats, samples in items:
+            snapshot[name] = {
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "slow": stats["slow"],
+                "p50_ms": percentile(samples, 0.50),
+                "p95_ms": percentile(samples, 0.95),
+                "p99_ms": percentile(samples, 0.99),
+                "max_ms": stats["max_ms"],
+            }
+        return snapshot
+
+    def log_snapshot(self, logger):
+        """
+        Schreibt die aktuelle Statistik pro Befehl in den gegebenen Logger.
+        """
+        for name, stats in sorted(self.snapshot().items()):
+            logger.info(
+                f"[QueryMetrics] {name}: {stats['count']} Ausführungen, {stats['errors']} Fehler, "
+                f"{stats['slow']} langsam, p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, "
+                f"p99 {stats['p99_ms']:.1f} ms, max {stats['max_ms']:.1f} ms"
+            )
@@ -0,0 +1,191 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: replay_worker.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Spielt das Offline-Backup im Hintergrund in die Datenbank ein. Die Einträge
+werden in kleinen Blöcken mit einem Budget von Zeilen pro Sekunde
+geschrieben; zwischen den Blöcken wird die Verbindung freigegeben. Solange
+Tags gelesen werden, pausiert das Einspielen, damit Stempel nie auf das
+Backup warten. Fortschritt und geschätzte Restdauer werden protokolliert.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Zustand REPLAYING während eines Durchgangs melden (connection_state.py).
+
+===============================================================================
+"""
+
+import threading
+import time
+
+from mysql.connector import InterfaceError, OperationalError
+
+from database import BACKUP_BATCH_REPLAY, get_outbox, replay_claimed, sql_log
+
+
+class ReplayWorker:
+    """
+    Hintergrund-Thread für das Einspielen des Backups.
+
+    `notify_tap` wird vom Reader bei jedem gelesenen Tag aufgerufen und hält
+    das Einspielen für `tap_pause_ms` an. `wake` stösst das Einspielen sofort
+    an, z.B. nachdem die Verbindung wiederhergestellt wurde.
+    """
+
+    def __init__(self, conn_ref, conn_lock, rows_per_second=200, batch_size=50,
+                 tap_pause_ms=2000, idle_interval=30, progress_interval=10, state=None):
+        self.conn_ref = conn_ref
+        self.conn_lock = conn_lock
+        self.state = state
+        self.rows_per_second = rows_per_second
+        self.batch_size = batch_size
+        self.tap_pause = tap_pause_ms / 1000
+        self.idle_interval = idle_interval
+        self.progress_interval = progress_interval
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._last_tap = 0.0
+        self._replayed_total = 0
+        self._failed_total = 0
+        self._rate = 0.0  # Gemessene Zeilen pro Sekunde des laufenden Durchgangs
+        self._pending = 0
+        self._thread = None
+
+    def start(self):
+        """
+        Startet den Replay-Thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="BackupReplayThread", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def wake(self):
+        """
+        Stösst das Einspielen sofort an.
+        """
+        self._wakeup.set()
+
+    def notify_tap(self):
+        """
+        Meldet einen gelesenen Tag; das Einspielen pausiert für `tap_pause_ms`.
+        """
+        self._last_tap = time.monotonic()
+
+    def progress(self):
+        """
+        Gibt den Fortschritt zurück: offene Einträge, bisher eingespielte und
+        fehlerhafte Einträge, aktuelle Rate und geschätzte Restdauer in Sekunden.
+        """
+        rate = self._rate
+        return {
+            "pending": self._pending,
+            "replayed_total": self._replayed_total,
+            "failed_total": self._failed_total,
+            "rows_per_second": rate,
+            "eta_s": self._pending / rate if rate > 0 else None,
+        }
+
+    def replay(self):
+        """
+        Spielt das Backup ein, bis es leer ist, die Verbindung fehlt oder ein
+        Eintrag fehlschlägt. Gibt die Anzahl eingespielter Einträge zurück.
+        """
+        if not self.conn_ref.get('is_connected'):
+            return 0
+        outbox = get_outbox()
+        self._pending = outbox.pending_count()
+        if not self._pending:
+            return 0
+
+        sql_log.info(f"[Replay] {self._pending} Backup-Einträge werden im Hintergrund eingespielt.")
+        if self.state:
+            self.state.update(replaying=True, reason=f"{self._pending} Backup-Einträge offen")
+        try:
+            return self._replay(outbox)
+        finally:
+            if self.state:
+                self.state.update(replaying=False, reason="Backup-Durchgang beendet")
+
+    def _replay(self, outbox):
+        start = time.monotonic()
+        last_progress = start
+        replayed = 0
+
+        while not self._stop.is_set():
+            # Während Tags gelesen werden, gehört die Verbindung dem Reader
+            pause = self._last_tap + self.tap_pause - time.monotonic()
+            if pause > 0:
+                self._stop.wait(pause)
+                continue
+
+            batch_start = time.monotonic()
+            with self.conn_lock:
+                conn = self.conn_ref.get('conn')
+                if conn is None or not self.conn_ref.get('is_connected'):
+                    break
+
+                entries = outbox.claim(self.batch_size if BACKUP_BATCH_REPLAY else 1)
+                if not entries:
+                    break
+                try:
+                    executed = replay_claimed(conn, outbox, entries, BACKUP_BATCH_REPLAY)
+                except (InterfaceError, OperationalError) as e:
+                    sql_log.error(f"[Replay] Verbindungsfehler, Einspielen unterbrochen: {e}")
+                    outbox.release([entry[0] for entry in entries])
+                    break
+
+            replayed += executed
+            self._replayed_total += executed
+            self._failed_total += len(entries) - executed
+            self._pending = max(self._pending - len(entries), 0)
+            elapsed = time.monotonic() - start
+            self._rate = replayed / elapsed if elapsed > 0 else 0.0
+
+            now = time.monotonic()
+            if now - last_progress >= self.progress_interval:
+                last_progress = now
+                self._log_progress()
+
+            if executed < len(entries):
+                # Fehlerhafte Einträge erst beim nächsten Durchgang erneut versuchen
+                break
+
+            # Budget einhalten: ein Block von n Zeilen belegt n / rows_per_second Sekunden
+            budget = len(entries) / self.rows_per_second - (time.monotonic() - batch_start)
+            if budget > 0:
+                self._stop.wait(budget)
+
+        self._pending = outbox.pending_count()
+        sql_log.info(
+            f"[Replay] Durchgang beendet: {replayed} Einträge in {time.monotonic() - start:.1f} s "
+            f"eingespielt, {self._pending} offen."
+        )
+        return replayed
+
+    def _log_progress(self):
+        progress = self.progress()
+        eta = f"{progress['eta_s']:.0f} s" if progress['eta_s'] is not None else "unbekannt"
+        sql_log.info(
+            f"[Replay] {progress['replayed_total']} eingespielt, {progress['pending']} offen, "
+            f"{progress['rows_per_second']:.0f} Zeilen/s, Restdauer {eta}."
+        )
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.replay()
+            except Exception as e:
+                sql_log.error(f"[Replay] Unerwarteter Fehler beim Einspielen: {e}")
+            self._wakeup.wait(self.idle_interval)
+            self._wakeup.clear()
@@ -0,0 +1,106 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: retry.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Exponentielles Backoff mit Jitter und ein einfacher Circuit Breaker für den
+Verbindungsaufbau zur Datenbank. Mehrere Terminals, die gleichzeitig die
+Verbindung verlieren, verteilen ihre Versuche dadurch zeitlich, und ein
+nicht erreichbarer Server wird nicht bei jeder Prüfung erneut angefragt.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: CircuitBreaker.retry_in für die Wartezeit des Verbindungs-Checkers.
+
+===============================================================================
+"""
+
+import random
+import threading
+import time
+
+
+class Backoff:
+    """
+    Wartezeiten base, base*factor, base*factor², ... bis `maximum`,
+    jeweils zufällig um bis zu `jitter` (Anteil) verkürzt.
+    """
+
+    def __init__(self, base=0.5, maximum=60.0, factor=2.0, jitter=0.5):
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+
+    def next_delay(self):
+        """
+        Gibt die nächste Wartezeit in Sekunden zurück.
+        """
+        delay = min(self.base * self.factor ** self.attempts, self.maximum)
+        self.attempts += 1
+        return delay * (1 - random.uniform(0, self.jitter))
+
+    def reset(self):
+        self.attempts = 0
+
+
+class CircuitBreaker:
+    """
+    Nach `failure_threshold` Fehlern in Folge ist der Breaker offen und lässt
+    für `reset_timeout` Sekunden keine Versuche zu. Danach ist genau ein
+    Probeversuch erlaubt (halb offen); gelingt er, schliesst der Breaker wieder.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Gibt True zurück, wenn ein Versuch erlaubt ist.
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return self.state == self.CLOSED
+
+    def retry_in(self):
+        """
+        Gibt zurück, in wie vielen Sekunden wieder ein Versuch erlaubt ist (0, wenn sofort).
+        """
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        """
+        Schliesst den Breaker, z.B. nach einer Netzwerkänderung.
+        """
+        self.record_success()
@@ -2,18 +2,13 @@ import time
 import logging
 from pn532 import PN532_UART
 from database import (
-    check_rfid_exists,
-    create_stamp_entry,
     sanitize_uid,
-    write_to_backup_file,
-    get_person_name_from_uid,
-    get_time_clock_count,
-    register_rfid_tag,
+    new_scan_id,
+    queue_stamp,
 )
-from gui import update_instruction_label, reset_instruction_label
 from datetime import datetime
 from logger_config import LoggerConfig
-import configparser
+from config_loader import config
 
 # Initialize and configure the loggers
 logger_config = LoggerConfig()
@@ -23,21 +18,12 @@ logger_config.configure()
 rfid_logger = logger_config.get_logger("rfid_logger")
 
 # Lade Geräte-Benutzernamen aus der Konfigurationsdatei
-config = configparser.ConfigParser()
-config_path = 'config/config.cnf'
-config.read(config_path)
-device_user = config['device']['username']
+device_user = config.value('device', 'username')
 
 # Debounce variables
 last_uid = None
 last_uid_time = 0
 
-# Capture the exact time the badge was read
-badge_read_time = datetime.now()
-
-# Format the timestamp for SQL (if needed)
-formatted_time = badge_read_time.strftime('%Y-%m-%d %H:%M:%S')
-
 def initialize_reader():
     """
     Initializes the PN532 RFID reader.
@@ -46,10 +32,40 @@ def initialize_reader():
     pn532.SAM_configuration()  # Configure the PN532 RFID reader
     return {"pn532": pn532}
 
-def rfid_reader(conn_ref, root, conn_lock, device_name,pn532_ref):
+def store_stamp(backend, uid_str, scan_id, badge_read_time, stamp_writer=None):
+    """
+    Stores a stamp either directly in the storage backend or, in write-behind mode,
+    in the local journal of the stamp writer (flushed in the background).
+    Without a backend the stamp goes to the offline backup.
+    """
+    if stamp_writer and stamp_writer.submit(uid_str, scan_id, badge_read_time):
+        return
+    if backend is None:
+        queue_stamp(uid_str, scan_id, badge_read_time)
+    else:
+        backend.insert_stamp(uid_str, scan_id, badge_read_time)
+
+def offline_greeting(uid_str, roster=None):
+    """
+    Builds the feedback message for a stamp written to the backup. The local roster
+    allows greeting the person by name even without a database connection.
+    """
+    person = roster.lookup(uid_str) if roster else None
+    if person and person[0]:
+        return f"Grüezi {person[0]} {person[1]}. Eingestempelt."
+    return "Eingestempelt."
+
+def rfid_reader(backend, ui, conn_lock, device_name,pn532_ref, stamp_writer=None, roster=None, replay_worker=None,
+                stop_event=None):
     """
-    Reads RFID tags and processes them with the database logic, including error handling
-    and PN532 reset attempts when necessary.
+    Reads RFID tags and processes them with the storage backend (see storage/), including
+    error handling and PN532 reset attempts when necessary.
+    If a stamp writer is given, stamps are written behind instead of committed in the tap path.
+    If a roster is given, it is used for names only while the database cannot be asked
+    (offline greeting); online, the fresh database result always wins.
+    If a replay worker is given, backup replay pauses while tags are being processed.
+    Feedback goes through the user interface (see ui/), either the Tk GUI or LEDs and buzzer.
+    If a stop event is given, the reader returns once it is set (e.g. before the journal is closed).
     """
     global last_uid, last_uid_time
 
@@ -61,7 +77,7 @@ def rfid_reader(conn_ref, root, conn_lock, device_name,pn532_ref):
     read_failures = 0  # Track consecutive failures
     last_health_check_time = time.time()  # Track the last health check timestamp
 
-    while True:
+    while stop_event is None or not stop_event.is_set():
         try:
             # Perform health check every ~20 seconds
             current_time = time.time()
@@ -115,56 +131,58 @@ def rfid_reader(conn_ref, root, conn_lock, device_name,pn532_ref):
                 current_time = time.time()
 
                 # Debounce check: Ignore reads that are too close to the previous one
-                if uid_str == last_uid and current_time - last_uid_time < 2:
+                if uid_str == last_uid and current_time - last_uid_time < config.value('rfid', 'debounce_s'):
                     continue
 
                 last_uid = uid_str
                 last_uid_time = current_time
+                if replay_worker:
+                    replay_worker.notify_tap()  # Backup-Replay gibt die Verbindung frei
                 rfid_logger.info(f"Found tag with UID: {uid_str}")
 
+                # Capture the exact time the badge was read and give the scan a unique ID,
+                # so a retried or replayed stamp can never be booked twice
+                badge_read_time = datetime.now()
+                scan_id = new_scan_id()
+
                 # Process the UID and interact with the database
                 with conn_lock:
-                    if conn_ref['conn'] is None or not conn_ref['is_connected']:
+                    if not backend.is_available():
                         # No database connection, write to backup file
                         rfid_logger.info("No database connection. Writing to backup.")
-                        write_to_backup_file(
-                            "INSERT INTO stamp (sta_key_id, sta_ort, sta_stempel_zeit, sta_crt_usr) VALUES (%s, %s, %s, %s)",
-                            (uid_str, device_name,formatted_time, device_user),
-                        )
-                        root.after(0, update_instruction_label, "Eingestempelt.")
+                        store_stamp(None, uid_str, scan_id, badge_read_time, stamp_writer)
+                        ui.show_message(offline_greeting(uid_str, roster), icon="success")
                         
                     else:
                         try:
-                            cursor = conn_ref['conn'].cursor()
-
                             # Check if the RFID tag exists in the database
-                            if check_rfid_exists(cursor, uid_str):
-                                first_name, last_name = get_person_name_from_uid(cursor, uid_str)
-                                clock_count = get_time_clock_count(cursor, uid_str)
+                            person = backend.lookup_tag(uid_str)
+                            if person is not None:
+                                first_name, last_name = person
+                                clock_count = backend.count_today(uid_str)
 
                                 greeting = (
                                     f"Grüezi {first_name} {last_name}." if clock_count % 2 == 0
                                     else f"Uf Wiederluaga {first_name} {last_name}. Bis bald!"
                                     
                                 )
-                                root.after(0, update_instruction_label, greeting)
+                                ui.show_message(greeting, icon="success")
                                 
                                 
                                 
-                                create_stamp_entry(conn_ref['conn'], cursor, uid_str)
+                                store_stamp(backend, uid_str, scan_id, badge_read_time, stamp_writer)
                             else:
                                 rfid_logger.info("Tag not found in database. Registering tag.")
-                                register_rfid_tag(conn_ref['conn'], cursor, uid_str)
-                                create_stamp_entry(conn_ref['conn'], cursor, uid_str)
+                                backend.register_tag(uid_str)
+                                store_stamp(backend, uid_str, scan_id, badge_read_time, stamp_writer)
 
-                            root.after(2000, reset_instruction_label)
                         except Exception as e:
                             rfid_logger.error(f"Error while processing RFID tag: {e}")
-                            write_to_backup_file(
-                                "INSERT INTO stamp (sta_key_id, sta_ort, sta_stempel_zeit, sta_crt_usr) VALUES (%s, %s, %s, %s)",
-                                (uid_str, device_name, formatted_time, device_user),
-                            )
-                            root.after(0, update_instruction_label, "Eingestempelt.")
+                            if backend.needs_backup:
+                                store_stamp(None, uid_str, scan_id, badge_read_time, stamp_writer)
+                                ui.show_message(offline_greeting(uid_str, roster), icon="success")
+                            else:
+                                ui.show_message("Fehler beim Stempeln. Bitte erneut versuchen.", icon="error")
                             
                             
             else:
@@ -0,0 +1,318 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: roster.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Lokale Kopie der Tag-/Personenliste (person_key + person). Beim Start wird
+die Liste in einer gestreamten Abfrage vollständig geladen, danach werden nur
+noch geänderte Zeilen über einen High-Water-Mark nachgeladen. Ein kompakter
+Snapshot auf der Karte erlaubt einen Kaltstart ohne Netzwerk, damit das
+Terminal Personen auch im Offline-Modus erkennt.
+
+Die Liste liegt als mmap-Index auf der Karte (uid_index.py). Im Speicher
+werden nur die Änderungen seit dem letzten Neuaufbau des Index gehalten.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: mmap-Index statt Dictionary im Speicher (uid_index.py).
+- [19.10.26]: Index aus der nach UID sortierten Abfrage direkt schreiben, Neuaufbau als sortiertes Zusammenführen.
+- [19.10.26]: Synchronisation über eine eigene Verbindung, conn_lock wird nicht mehr gehalten.
+
+===============================================================================
+"""
+
+import json
+import logging
+import os
+import threading
+import heapq
+import time
+
+from database import connect_to_database, get_host_selector, sanitize_uid
+from uid_index import UidIndex, build_index, pack_uid
+
+roster_logger = logging.getLogger("sql_logger")
+
+# Änderungszeitpunkt pro Zeile, siehe migrations/003_roster_change_tracking.sql
+ROSTER_COLUMNS = """
+    SELECT pk.peke_key_id, p.pers_vorname, p.pers_nachname,
+           GREATEST(pk.peke_changed_at, COALESCE(p.pers_changed_at, pk.peke_changed_at)) AS changed_at
+"""
+
+# Nach UID in Byte-Reihenfolge sortiert (unabhängig von der Kollation), damit der
+# Index in einem Durchgang geschrieben werden kann
+FULL_QUERY = ROSTER_COLUMNS + """
+    FROM person_key pk
+    LEFT JOIN person p ON pk.peke_pers_id = p.pers_id
+    ORDER BY CAST(LOWER(pk.peke_key_id) AS BINARY)
+"""
+
+# Zwei Teilabfragen statt OR über zwei Tabellen, damit beide Indizes greifen
+DELTA_QUERY = ROSTER_COLUMNS + """
+    FROM person_key pk
+    LEFT JOIN person p ON pk.peke_pers_id = p.pers_id
+    WHERE pk.peke_changed_at >= %s
+    UNION
+""" + ROSTER_COLUMNS + """
+    FROM person p
+    JOIN person_key pk ON pk.peke_pers_id = p.pers_id
+    WHERE p.pers_changed_at >= %s
+"""
+
+
+class Roster:
+    """
+    Tag -> (Vorname, Nachname) auf dem Terminal, mit Voll- und Delta-Synchronisation.
+
+    Der Snapshot besteht aus dem Index `<snapshot_dir>/roster.idx` und einer
+    kleinen Statusdatei mit High-Water-Mark und den Änderungen seit dem
+    letzten Neuaufbau des Index.
+    """
+
+    def __init__(self, snapshot_dir, sync_interval=300, full_sync_interval=24 * 3600,
+                 fetch_size=1000, rebuild_threshold=1000):
+        self.index_path = os.path.join(snapshot_dir, "roster.idx")
+        self.state_path = os.path.join(snapshot_dir, "roster.state.json")
+        self.sync_interval = sync_interval
+        self.full_sync_interval = full_sync_interval
+        self.fetch_size = fetch_size
+        self.rebuild_threshold = rebuild_threshold
+
+        self._index = None
+        self._changes = {}  # Änderungen seit dem letzten Neuaufbau des Index
+        self._high_water_mark = None
+        self._last_full_sync = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._conn = None  # Eigene Verbindung, damit Reader und Verbindungs-Checker nie warten
+        self._conn_host = None
+
+    def lookup(self, uid):
+        """
+        Gibt (Vorname, Nachname) für einen Tag zurück oder None, wenn er unbekannt ist.
+        """
+        uid = sanitize_uid(uid).lower()
+        with self._lock:
+            person = self._changes.get(uid)
+            if person is None and self._index is not None:
+                person = self._index.lookup(uid)
+            return person
+
+    def __len__(self):
+        return (len(self._index) if self._index is not None else 0) + len(self._changes)
+
+    def load_snapshot(self):
+        """
+        Bindet den lokalen Index ein (Kaltstart ohne Netzwerk, nichts wird eingelesen).
+        Gibt True zurück, wenn ein Snapshot vorhanden war.
+        """
+        try:
+            index = UidIndex(self.index_path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            roster_logger.error(f"[Roster] Index {self.index_path} ist beschädigt: {e}")
+            return False
+
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {"high_water_mark": None, "changes": {}}
+
+        with self._lock:
+            self._swap_index(index)
+            self._changes = {uid: tuple(person) for uid, person in state["changes"].items()}
+            self._high_water_mark = state["high_water_mark"]
+        roster_logger.info(f"[Roster] {len(self)} Tags aus dem Snapshot eingebunden.")
+        return True
+
+    def full_sync(self, conn):
+        """
+        Lädt die ganze Liste in einer gestreamten, nach UID sortierten Abfrage und
+        schreibt den Index direkt daraus. Stimmt die Reihenfolge nicht, wird die
+        Liste noch einmal gelesen und extern sortiert.
+        """
+        start = time.perf_counter()
+        high_water_mark = None
+
+        def rows():
+            nonlocal high_water_mark
+            for uid, first, last, changed_at in self._stream(conn, FULL_QUERY, ()):
+                if changed_at and (high_water_mark is None or changed_at > high_water_mark):
+                    high_water_mark = changed_at
+                yield uid, first, last
+
+        sorted_rows = rows()
+        try:
+            count = build_index(self.index_path, sorted_rows, sorted_input=True)
+        except ValueError as e:
+            roster_logger.warning(f"[Roster] Abfrage nicht in Index-Reihenfolge ({e}). Sortiere lokal.")
+            for _ in sorted_rows:
+                pass  # Ungepufferten Cursor leeren, bevor die nächste Abfrage läuft
+            high_water_mark = None
+            count = build_index(self.index_path, rows())
+        with self._lock:
+            self._swap_index(UidIndex(self.index_path))
+            self._changes = {}
+            self._high_water_mark = high_water_mark
+            self._last_full_sync = time.time()
+        self.save_snapshot()
+        roster_logger.info(f"[Roster] Vollständige Synchronisation: {count} Tags in {time.perf_counter() - start:.2f} s.")
+
+    def delta_sync(self, conn):
+        """
+        Lädt nur die seit dem letzten High-Water-Mark geänderten Zeilen.
+        Gibt die Anzahl geänderter Tags zurück.
+        """
+        if self._high_water_mark is None:
+            self.full_sync(conn)
+            return len(self)
+
+        changes = list(self._stream(conn, DELTA_QUERY, (self._high_water_mark, self._high_water_mark)))
+        changed = 0
+        for uid, first, last, changed_at in changes:
+            if self.lookup(uid) != (first, last):
+                with self._lock:
+                    self._changes[uid] = (first, last)
+                changed += 1
+            if changed_at and changed_at > self._high_water_mark:
+                self._high_water_mark = changed_at
+
+        if len(self._changes) >= self.rebuild_threshold:
+            self._rebuild()
+        if changed:
+            self.save_snapshot()
+            roster_logger.info(f"[Roster] Delta-Synchronisation: {changed} Tags geändert.")
+        return changed
+
+    def sync(self, conn):
+        """
+        Delta-Synchronisation; einmal pro `full_sync_interval` vollständig,
+        damit auch gelöschte Tags verschwinden.
+        """
+        if time.time() - self._last_full_sync >= self.full_sync_interval:
+            self.full_sync(conn)
+        else:
+            self.delta_sync(conn)
+
+    def save_snapshot(self):
+        """
+        Schreibt die Statusdatei atomar (temporäre Datei, dann umbenennen).
+        Der Index selbst wird nur beim Neuaufbau geschrieben.
+        """
+        with self._lock:
+            state = {
+                "high_water_mark": self._high_water_mark,
+                "changes": {uid: list(person) for uid, person in self._changes.items()},
+            }
+
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(temp_path, self.state_path)
+
+    def _rebuild(self):
+        """
+        Führt die gesammelten Änderungen mit dem bestehenden Index zu einem neuen Index zusammen.
+        """
+        with self._lock:
+            changes = dict(self._changes)
+            index = self._index
+
+        # Beide Quellen nach UID sortiert: Index in Dateireihenfolge, die wenigen Änderungen im Speicher
+        changed = sorted(
+            ((uid, first, last) for uid, (first, last) in changes.items() if pack_uid(uid) is not None),
+            key=lambda entry: pack_uid(entry[0]),
+        )
+        kept = ()
+        if index is not None:
+            kept = (entry for entry in index.items() if entry[0] not in changes)
+        merged = heapq.merge(kept, changed, key=lambda entry: pack_uid(entry[0]))
+
+        build_index(self.index_path, merged, sorted_input=True)
+        with self._lock:
+            self._swap_index(UidIndex(self.index_path))
+            for uid in changes:
+                self._changes.pop(uid, None)
+
+    def _swap_index(self, index):
+        old_index, self._index = self._index, index
+        if old_index is not None:
+            old_index.close()
+
+    def run(self, conn_ref):
+        """
+        Synchronisiert die Liste periodisch, solange das Terminal online ist.
+        Läuft in einem eigenen Thread mit eigener Verbindung zum aktuellen Host;
+        der gemeinsame conn_lock wird nicht gehalten, auch nicht während einer
+        vollständigen Synchronisation.
+        """
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn = self._connection(conn_ref)
+                    if conn is not None:
+                        self.sync(conn)
+                except Exception as e:
+                    roster_logger.error(f"[Roster] Fehler bei der Synchronisation: {e}")
+                    self._close_connection()
+                self._stop.wait(self.sync_interval)
+        finally:
+            self._close_connection()
+
+    def stop(self):
+        self._stop.set()
+
+    def _connection(self, conn_ref):
+        """
+        Gibt die eigene Verbindung zurück und baut sie bei Bedarf zum Host der
+        Hauptverbindung auf. Ohne Verbindung des Terminals wird nicht synchronisiert.
+        """
+        host = get_host_selector().current
+        if not conn_ref.get('is_connected') or host is None:
+            self._close_connection()
+            return None
+        if self._conn is not None and self._conn_host == host and self._conn.is_connected():
+            return self._conn
+
+        self._close_connection()
+        self._conn = connect_to_database(check_migrations=False, hosts=[host])
+        self._conn_host = host if self._conn is not None else None
+        return self._conn
+
+    def _close_connection(self):
+        conn, self._conn, self._conn_host = self._conn, None, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass  # Die Verbindung wird ohnehin verworfen
+
+    def _stream(self, conn, query, params):
+        """
+        Liest das Resultat blockweise (ungepufferter Cursor), damit auch grosse
+        Listen nicht auf einmal im Speicher des Treibers landen.
+        Der Änderungszeitpunkt wird als Text zurückgegeben ('YYYY-MM-DD HH:MM:SS').
+        """
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                for key_id, first, last, changed_at in rows:
+                    if key_id is None:
+                        continue
+                    changed_at = changed_at.strftime('%Y-%m-%d %H:%M:%S') if changed_at else None
+                    yield key_id.lower(), first, last, changed_at
+        finally:
+            cursor.close()
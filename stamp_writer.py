@@ -0,0 +1,189 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: stamp_writer.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Optionaler Write-Behind-Modus für Stempel. Ein Stempel wird zuerst dauerhaft
+in ein lokales Journal geschrieben, die Rückmeldung an die Person erfolgt
+sofort. Ein Hintergrund-Thread schreibt die offenen Stempel gesammelt
+(Group Commit) alle N Millisekunden oder alle M Stempel in die Datenbank.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Zähler threadsicher, aufgegebene Stempel gehen ins Backup, kein Schreiben ins geschlossene Journal.
+
+===============================================================================
+"""
+
+import threading
+import time
+
+from mysql.connector import InterfaceError, OperationalError
+
+from database import STAMP_BACKUP_SQL, replay_claimed, sql_log, stamp_values, write_to_backup_file
+from outbox import Outbox
+
+
+class StampWriter:
+    """
+    Schreibt Stempel über ein dauerhaftes Journal verzögert in die Datenbank.
+
+    Im Speicher werden nur Zähler gehalten; alle offenen Stempel liegen im
+    Journal. Der Speicherbedarf ist dadurch unabhängig von der Anzahl offener
+    Stempel, ein Flush liest höchstens `max_batch` Einträge.
+    """
+
+    def __init__(self, journal_path, conn_ref, conn_lock, flush_interval_ms=500,
+                 flush_rows=50, max_batch=500):
+        self.journal = Outbox(journal_path)
+        self.conn_ref = conn_ref
+        self.conn_lock = conn_lock
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_rows = flush_rows
+        self.max_batch = max_batch
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # Schützt Zähler und Journal gegen Reader und Flush-Thread
+        self._closed = False
+        self._unflushed = self.journal.pending_count()  # Offene Stempel aus dem letzten Lauf
+        self._flushed_total = 0
+        self._handed_over = 0
+        self._last_flush_ms = 0.0
+        self._thread = None
+
+    def start(self):
+        """
+        Startet den Flush-Thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="StampWriterThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """
+        Beendet den Flush-Thread und schreibt auf Wunsch noch offene Stempel.
+        Der Reader sollte vorher beendet sein; ein späteres `submit` gibt False
+        zurück, der Stempel geht dann den normalen Weg (Datenbank oder Backup).
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if flush:
+            self.flush()
+        with self._lock:
+            self._closed = True
+            self.journal.close()
+
+    def submit(self, peke_key_id, scan_id, stamp_time):
+        """
+        Schreibt einen Stempel ins Journal. Kehrt zurück, sobald er dauerhaft
+        gespeichert ist, ohne auf die Datenbank zu warten.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if not self.journal.append(STAMP_BACKUP_SQL, stamp_values(peke_key_id, scan_id, stamp_time)):
+                return False
+            self._unflushed += 1
+            full = self._unflushed >= self.flush_rows
+        if full:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """
+        Schreibt alle offenen Stempel blockweise mit je einem Commit in die Datenbank.
+        Gibt die Anzahl geschriebener Stempel zurück.
+        """
+        written = 0
+        while True:
+            with self.conn_lock:
+                conn = self.conn_ref.get('conn')
+                if conn is None or not self.conn_ref.get('is_connected'):
+                    return written
+                if self._closed:
+                    return written
+
+                entries = self.journal.claim(self.max_batch)
+                if not entries:
+                    return written
+
+                start = time.perf_counter()
+                try:
+                    executed = replay_claimed(conn, self.journal, entries)
+                except (InterfaceError, OperationalError) as e:
+                    sql_log.error(f"[StampWriter] Verbindungsfehler beim Schreiben der Stempel: {e}")
+                    self.journal.release([entry[0] for entry in entries])
+                    return written
+                self._last_flush_ms = (time.perf_counter() - start) * 1000
+
+            written += executed
+            self._flushed_total += executed
+            self._hand_over_failed()
+            with self._lock:
+                self._unflushed = self.journal.pending_count()
+            sql_log.debug(f"[StampWriter] {executed} Stempel in {self._last_flush_ms:.1f} ms geschrieben.")
+            if executed < len(entries):
+                # Fehlerhafte Stempel erst beim nächsten Intervall erneut versuchen
+                return written
+
+    def _hand_over_failed(self):
+        """
+        Übergibt Stempel, die das Journal aufgegeben hat (Status FAILED), an die
+        Backup-Outbox. Dort werden sie wie jeder Offline-Stempel vom Replay
+        eingespielt und bleiben bei weiteren Fehlern für die Wartung liegen.
+        """
+        while True:
+            failed = self.journal.failed_entries()
+            if not failed:
+                return
+            handed = []
+            for entry_id, sql, params in failed:
+                if write_to_backup_file(sql, params):
+                    handed.append(entry_id)
+            if not handed:
+                sql_log.error(f"[StampWriter] {len(failed)} aufgegebene Stempel konnten nicht ins Backup übergeben werden.")
+                return
+            self.journal.ack(handed)
+            self._handed_over += len(handed)
+            sql_log.warning(f"[StampWriter] {len(handed)} aufgegebene Stempel ans Backup übergeben.")
+            if len(handed) < len(failed):
+                return
+
+    def flush_lag(self):
+        """
+        Gibt zurück, wie lange (in Sekunden) der älteste noch nicht geschriebene
+        Stempel schon wartet. 0, wenn nichts offen ist.
+        """
+        oldest = self.journal.oldest_created_at()
+        return max(time.time() - oldest, 0.0) if oldest else 0.0
+
+    def stats(self):
+        """
+        Gibt den aktuellen Zustand des Write-Behind-Puffers zurück.
+        """
+        return {
+            "pending": self.journal.pending_count(),
+            "flush_lag_s": self.flush_lag(),
+            "flushed_total": self._flushed_total,
+            "last_flush_ms": self._last_flush_ms,
+            "handed_over": self._handed_over,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self._lock:
+                unflushed = self._unflushed
+            if not unflushed:
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                sql_log.error(f"[StampWriter] Unerwarteter Fehler beim Schreiben der Stempel: {e}")
@@ -0,0 +1,165 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: statements.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Registry für serverseitig vorbereitete SQL-Befehle (Prepared Statements).
+Die häufig verwendeten Abfragen werden pro Verbindung einmal vorbereitet und
+danach nur noch mit neuen Parametern ausgeführt. Nach einem Reconnect werden
+die Befehle automatisch neu vorbereitet.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Laufzeiten zusätzlich an QueryMetrics melden (query_metrics.py).
+
+===============================================================================
+"""
+
+import threading
+import time
+
+# MySQL-Fehlercode, wenn ein vorbereiteter Befehl auf dem Server nicht mehr existiert
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+
+class StatementRegistry:
+    """
+    Verwaltet benannte SQL-Befehle und hält pro Befehl einen vorbereiteten
+    Cursor (`cursor(prepared=True)`) auf der aktuellen Verbindung.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self._sql = {}
+        self._cursors = {}
+        self._stats = {}
+        self._conn = None
+        self._connection_id = None
+        self._lock = threading.RLock()
+
+    def register(self, name, sql):
+        """
+        Registriert einen SQL-Befehl unter einem Namen.
+        """
+        with self._lock:
+            if self._sql.get(name) not in (None, sql):
+                raise ValueError(f"Befehl '{name}' ist bereits mit anderem SQL registriert")
+            self._sql[name] = sql
+            self._stats.setdefault(name, {
+                "executions": 0,
+                "errors": 0,
+                "prepares": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+            })
+
+    def sql(self, name):
+        """
+        Gibt den SQL-Text eines registrierten Befehls zurück.
+        """
+        return self._sql[name]
+
+    def execute(self, conn, name, params=()):
+        """
+        Führt einen registrierten Befehl mit den gegebenen Parametern aus und
+        gibt den (vorbereiteten) Cursor zurück. Der Aufrufer ist für das Commit
+        und das Abholen der Resultate verantwortlich.
+        """
+        with self._lock:
+            stats = self._stats[name]
+            start = time.perf_counter()
+            failed = False
+            try:
+                cursor = self._cursor_for(conn, name)
+                try:
+                    cursor.execute(self._sql[name], params)
+                except Exception as e:
+                    if getattr(e, "errno", None) != ER_UNKNOWN_STMT_HANDLER:
+                        raise
+                    # Der Server kennt den Befehl nicht mehr (z.B. nach einem Reconnect):
+                    # alle Cursor verwerfen und einmal neu vorbereiten
+                    self._reset()
+                    cursor = self._cursor_for(conn, name)
+                    cursor.execute(self._sql[name], params)
+            except Exception:
+                stats["errors"] += 1
+                failed = True
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                stats["executions"] += 1
+                stats["total_ms"] += elapsed_ms
+                stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+                if self.metrics:
+                    self.metrics.record(name, elapsed_ms, failed, self._sql[name], params)
+            return cursor
+
+    def fetch_one(self, conn, name, params=()):
+        """
+        Führt einen registrierten Befehl aus und gibt die erste Zeile zurück.
+        Alle weiteren Zeilen werden verworfen, damit der Cursor wiederverwendbar bleibt.
+        """
+        with self._lock:
+            rows = self.execute(conn, name, params).fetchall()
+            return rows[0] if rows else None
+
+    def stats(self):
+        """
+        Gibt eine Kopie der Ausführungsstatistik pro Befehl zurück.
+        """
+        with self._lock:
+            snapshot = {}
+            for name, stats in self._stats.items():
+                entry = dict(stats)
+                entry["avg_ms"] = stats["total_ms"] / stats["executions"] if stats["executions"] else 0.0
+                snapshot[name] = entry
+            return snapshot
+
+    def log_stats(self, logger):
+        """
+        Schreibt die Ausführungsstatistik pro Befehl in den gegebenen Logger.
+        """
+        for name, stats in self.stats().items():
+            logger.info(
+                f"[Statements] {name}: {stats['executions']} Ausführungen, "
+                f"{stats['errors']} Fehler, {stats['prepares']} Vorbereitungen, "
+                f"Ø {stats['avg_ms']:.2f} ms, max {stats['max_ms']:.2f} ms"
+            )
+
+    def reset(self):
+        """
+        Verwirft alle vorbereiteten Cursor, z.B. wenn die Verbindung geschlossen wird.
+        """
+        with self._lock:
+            self._reset()
+            self._conn = None
+
+    def _cursor_for(self, conn, name):
+        """
+        Liefert den vorbereiteten Cursor für einen Befehl. Wechselt die Verbindung
+        oder deren Server-Session (Reconnect), werden alle Cursor neu angelegt.
+        """
+        connection_id = getattr(conn, "connection_id", None)
+        if conn is not self._conn or connection_id != self._connection_id:
+            self._reset()
+            self._conn = conn
+            self._connection_id = connection_id
+
+        cursor = self._cursors.get(name)
+        if cursor is None:
+            cursor = conn.cursor(prepared=True)
+            self._cursors[name] = cursor
+            self._stats[name]["prepares"] += 1
+        return cursor
+
+    def _reset(self):
+        for cursor in self._cursors.values():
+            try:
+                cursor.close()
+            except Exception:
+                pass  # Der Cursor gehört zu einer toten Verbindung
+        self._cursors.clear()
@@ -0,0 +1,40 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: storage/__init__.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Austauschbare Speicher-Backends für den Stempelpfad. Das MySQL-Backend
+arbeitet mit dem zentralen Server, das SQLite-Backend verwendet dasselbe
+Schema in einer lokalen Datei (Betrieb ohne Server, lokale Lasttests).
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+__all__ = [
+    'StorageBackend',
+    'MySQLBackend',
+    'SQLiteBackend',
+    'create_backend',
+]
+
+from .base import StorageBackend
+from .mysql_backend import MySQLBackend
+from .sqlite_backend import SQLiteBackend
+
+
+def create_backend(name, conn_ref=None, sqlite_path='data/noatime.db'):
+    """
+    Erstellt das konfigurierte Backend ("mysql" oder "sqlite").
+    """
+    if name == 'mysql':
+        return MySQLBackend(conn_ref)
+    if name == 'sqlite':
+        return SQLiteBackend(sqlite_path)
+    raise ValueError(f"Unbekanntes Speicher-Backend: {name}")
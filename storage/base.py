@@ -0,0 +1,68 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: storage/base.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Schnittstelle, die jedes Speicher-Backend erfüllen muss.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+
+class StorageBackend:
+    """
+    Basisklasse für Speicher-Backends. Alle UIDs werden als sanitisierter
+    Hex-Text übergeben (siehe `database.sanitize_uid`).
+    """
+
+    #: True, wenn Stempel bei fehlender Verbindung ins Backup geschrieben werden müssen
+    needs_backup = False
+
+    def is_available(self):
+        """
+        Gibt zurück, ob das Backend gerade Anfragen beantworten kann.
+        """
+        raise NotImplementedError
+
+    def lookup_tag(self, uid):
+        """
+        Sucht einen Tag. Gibt None zurück, wenn er unbekannt ist, sonst
+        (Vorname, Nachname) der zugeordneten Person (beides None ohne Person).
+        """
+        raise NotImplementedError
+
+    def register_tag(self, uid):
+        """
+        Registriert einen unbekannten Tag.
+        """
+        raise NotImplementedError
+
+    def insert_stamp(self, uid, scan_id, stamp_time):
+        """
+        Speichert einen Stempel. Dieselbe Scan-ID wird nur einmal gespeichert.
+        """
+        raise NotImplementedError
+
+    def count_today(self, uid):
+        """
+        Gibt zurück, wie oft der Tag heute gestempelt hat.
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, system_name):
+        """
+        Aktualisiert das Lebenszeichen des Geräts.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Gibt die Ressourcen des Backends frei.
+        """
@@ -0,0 +1,70 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: storage/mysql_backend.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Backend für den zentralen MySQL-Server. Verwendet die bestehenden Funktionen
+aus database.py und die gemeinsame Verbindung in `conn_ref`.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+from database import (
+    check_rfid_exists,
+    create_stamp_entry,
+    get_person_name_from_uid,
+    get_time_clock_count,
+    register_rfid_tag,
+    statements,
+    update_alive_check,
+)
+
+from .base import StorageBackend
+
+
+class MySQLBackend(StorageBackend):
+    """
+    Speicher-Backend für MySQL. Die Verbindung wird vom Connection-Checker verwaltet.
+    """
+
+    needs_backup = True
+
+    def __init__(self, conn_ref):
+        self.conn_ref = conn_ref
+
+    @property
+    def conn(self):
+        return self.conn_ref['conn']
+
+    def is_available(self):
+        return self.conn_ref['conn'] is not None and self.conn_ref['is_connected']
+
+    def lookup_tag(self, uid):
+        if not check_rfid_exists(self.conn, uid):
+            return None
+        return get_person_name_from_uid(self.conn, uid)
+
+    def register_tag(self, uid):
+        register_rfid_tag(self.conn, uid)
+
+    def insert_stamp(self, uid, scan_id, stamp_time):
+        create_stamp_entry(self.conn, uid, scan_id, stamp_time)
+
+    def count_today(self, uid):
+        return get_time_clock_count(self.conn, uid)
+
+    def heartbeat(self, system_name):
+        update_alive_check(self.conn, system_name)
+
+    def close(self):
+        conn = self.conn_ref.get('conn')
+        if conn and conn.is_connected():
+            statements.reset()
+            conn.close()
@@ -0,0 +1,102 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: storage/sqlite_backend.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Eingebettetes Backend mit einer lokalen SQLite-Datei im selben Schema wie
+die MySQL-Datenbank. Für Standorte ohne Server und für lokale Lasttests
+des ganzen Stempelpfads.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from database import device_name, device_user
+
+from .base import StorageBackend
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sqlite_schema.sql")
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Speicher-Backend für eine lokale SQLite-Datei (WAL-Modus).
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = FULL")
+        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+            self._db.executescript(f.read())
+
+    def is_available(self):
+        return True
+
+    def lookup_tag(self, uid):
+        with self._lock:
+            row = self._db.execute(
+                """
+                SELECT pk.peke_id, p.pers_vorname, p.pers_nachname
+                FROM person_key pk
+                LEFT JOIN person p ON pk.peke_pers_id = p.pers_id
+                WHERE pk.peke_key_id = ?
+                """,
+                (uid,),
+            ).fetchone()
+        return None if row is None else (row[1], row[2])
+
+    def register_tag(self, uid):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO person_key (peke_key_id, peke_typ, peke_crt_user) VALUES (?, ?, ?)",
+                (uid, "rfid", device_user),
+            )
+
+    def insert_stamp(self, uid, scan_id, stamp_time):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO stamp (sta_key_id, sta_ort, sta_stempel_zeit, sta_crt_usr, sta_scan_id) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (sta_scan_id) DO NOTHING",
+                (uid, device_name, stamp_time.strftime(TIME_FORMAT), device_user, scan_id),
+            )
+
+    def count_today(self, uid):
+        # Bereichsabfrage wie in database.py, damit idx_stamp_key_time greift
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) FROM stamp WHERE sta_key_id = ? "
+                "AND sta_stempel_zeit >= ? AND sta_stempel_zeit < ?",
+                (uid, today.strftime(TIME_FORMAT), (today + timedelta(days=1)).strftime(TIME_FORMAT)),
+            ).fetchone()
+        return row[0]
+
+    def heartbeat(self, system_name):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO z_sys_alive_check (alive_system, alive_lastcheck) VALUES (?, ?) "
+                "ON CONFLICT (alive_system) DO UPDATE SET alive_lastcheck = excluded.alive_lastcheck",
+                (system_name, datetime.now().strftime(TIME_FORMAT)),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
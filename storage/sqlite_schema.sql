@@ -0,0 +1,45 @@
+-- =============================================================================
+-- Projekt: Noatime
+-- Datei: storage/sqlite_schema.sql
+-- Datum: 19.10.2026
+--
+-- Schema des eingebetteten SQLite-Backends. Tabellen- und Spaltennamen
+-- entsprechen der MySQL-Datenbank inklusive der Migrationen.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS person (
+    pers_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pers_vorname TEXT,
+    pers_nachname TEXT,
+    pers_changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS person_key (
+    peke_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    peke_key_id TEXT NOT NULL,
+    peke_pers_id INTEGER REFERENCES person (pers_id),
+    peke_typ TEXT,
+    peke_crt_user TEXT,
+    peke_changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_person_key_key_id ON person_key (peke_key_id);
+
+CREATE TABLE IF NOT EXISTS stamp (
+    sta_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sta_key_id TEXT NOT NULL,
+    sta_ort TEXT,
+    sta_stempel_zeit TEXT NOT NULL,
+    sta_crt_usr TEXT,
+    sta_scan_id TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_stamp_key_time ON stamp (sta_key_id, sta_stempel_zeit);
+
+CREATE TABLE IF NOT EXISTS z_sys_alive_check (
+    alive_system TEXT PRIMARY KEY,
+    alive_lastcheck TEXT,
+    alive_status TEXT,
+    alive_backlog INTEGER,
+    alive_last_stamp TEXT,
+    alive_uptime_s INTEGER,
+    alive_interval_s INTEGER
+);
@@ -0,0 +1,188 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: tools/bench_queries.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Benchmark für die Stempel-Abfragen. Legt in einer lokalen MySQL/MariaDB-
+Datenbank eigene Tabellen an, füllt sie mit vielen Stempeln und vergleicht
+die Latenz der alten Abfrage (DATE(sta_stempel_zeit) = CURDATE()) mit der
+Bereichsabfrage, jeweils ohne und mit den Indizes aus Migration 002.
+
+ACHTUNG: Die Tabellen `stamp`, `person_key` und `person` in der angegebenen
+Datenbank werden gelöscht. Nur mit einer eigenen Benchmark-Datenbank verwenden.
+
+Aufruf:
+    python tools/bench_queries.py --database noatime_bench --stamps 1000000
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from mysql.connector import connect
+
+OLD_COUNT_QUERY = """
+    SELECT COUNT(*) FROM stamp
+    WHERE sta_key_id = %s AND DATE(sta_stempel_zeit) = CURDATE()
+"""
+
+NEW_COUNT_QUERY = """
+    SELECT COUNT(*) FROM stamp
+    WHERE sta_key_id = %s
+      AND sta_stempel_zeit >= CURDATE()
+      AND sta_stempel_zeit < CURDATE() + INTERVAL 1 DAY
+"""
+
+NAME_QUERY = """
+    SELECT p.pers_vorname, p.pers_nachname
+    FROM person_key pk
+    JOIN person p ON pk.peke_pers_id = p.pers_id
+    WHERE pk.peke_key_id = %s
+"""
+
+SCHEMA = [
+    "DROP TABLE IF EXISTS stamp",
+    "DROP TABLE IF EXISTS person_key",
+    "DROP TABLE IF EXISTS person",
+    """CREATE TABLE person (
+        pers_id INT AUTO_INCREMENT PRIMARY KEY,
+        pers_vorname VARCHAR(100),
+        pers_nachname VARCHAR(100)
+    )""",
+    """CREATE TABLE person_key (
+        peke_id INT AUTO_INCREMENT PRIMARY KEY,
+        peke_key_id VARCHAR(32) NOT NULL,
+        peke_pers_id INT,
+        peke_typ VARCHAR(20),
+        peke_crt_user VARCHAR(50)
+    )""",
+    """CREATE TABLE stamp (
+        sta_id INT AUTO_INCREMENT PRIMARY KEY,
+        sta_key_id VARCHAR(32) NOT NULL,
+        sta_ort VARCHAR(50),
+        sta_stempel_zeit DATETIME NOT NULL,
+        sta_crt_usr VARCHAR(50)
+    )""",
+]
+
+INDEXES = [
+    "CREATE INDEX idx_stamp_key_time ON stamp (sta_key_id, sta_stempel_zeit)",
+    "CREATE INDEX idx_person_key_key_id ON person_key (peke_key_id)",
+]
+
+
+def seed(conn, keys, stamps, days, batch_size=5000):
+    """
+    Füllt die Tabellen mit Personen, Tags und zufällig verteilten Stempeln.
+    """
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO person (pers_vorname, pers_nachname) VALUES (%s, %s)",
+        [(f"Vorname{i}", f"Nachname{i}") for i in range(keys)],
+    )
+    cursor.executemany(
+        "INSERT INTO person_key (peke_key_id, peke_pers_id, peke_typ, peke_crt_user) VALUES (%s, %s, %s, %s)",
+        [(key, i + 1, "rfid", "bench") for i, key in enumerate(keys_list(keys))],
+    )
+    conn.commit()
+
+    now = datetime.now()
+    all_keys = keys_list(keys)
+    rows = []
+    for i in range(stamps):
+        stamp_time = now - timedelta(seconds=random.randint(0, days * 24 * 3600))
+        rows.append((random.choice(all_keys), "bench", stamp_time, "bench"))
+        if len(rows) >= batch_size or i == stamps - 1:
+            cursor.executemany(
+                "INSERT INTO stamp (sta_key_id, sta_ort, sta_stempel_zeit, sta_crt_usr) VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+            conn.commit()
+            rows = []
+    cursor.execute("ANALYZE TABLE stamp, person_key, person")
+    cursor.fetchall()
+    cursor.close()
+
+
+def keys_list(keys):
+    return [f"{i:08x}" for i in range(keys)]
+
+
+def measure(conn, query, keys, runs):
+    """
+    Führt eine Abfrage `runs` Mal mit zufälligen Tags aus und gibt die Latenzen in ms zurück.
+    """
+    cursor = conn.cursor(prepared=True)
+    all_keys = keys_list(keys)
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        cursor.execute(query, (random.choice(all_keys),))
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+    cursor.close()
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<40} p50 {statistics.median(latencies):8.2f} ms   p95 {p95:8.2f} ms   max {latencies[-1]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Noatime Stempel-Abfragen")
+    parser.add_argument("--host", default=os.getenv("BENCH_DB_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("BENCH_DB_PORT", "3306")))
+    parser.add_argument("--user", default=os.getenv("BENCH_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("BENCH_DB_PASSWORD", ""))
+    parser.add_argument("--database", default=os.getenv("BENCH_DB_NAME", "noatime_bench"))
+    parser.add_argument("--keys", type=int, default=500, help="Anzahl Tags/Personen")
+    parser.add_argument("--stamps", type=int, default=1000000, help="Anzahl Stempel")
+    parser.add_argument("--days", type=int, default=730, help="Zeitraum der Stempel in Tagen")
+    parser.add_argument("--runs", type=int, default=200, help="Wiederholungen pro Abfrage")
+    args = parser.parse_args()
+
+    conn = connect(host=args.host, port=args.port, user=args.user, password=args.password)
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{args.database}`")
+    cursor.execute(f"USE `{args.database}`")
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    cursor.close()
+
+    print(f"Fülle {args.stamps} Stempel für {args.keys} Tags über {args.days} Tage...")
+    start = time.perf_counter()
+    seed(conn, args.keys, args.stamps, args.days)
+    print(f"Fertig nach {time.perf_counter() - start:.1f} s\n")
+
+    report("ohne Index, DATE() = CURDATE()", measure(conn, OLD_COUNT_QUERY, args.keys, args.runs))
+    report("ohne Index, Bereichsabfrage", measure(conn, NEW_COUNT_QUERY, args.keys, args.runs))
+    report("ohne Index, Namenssuche", measure(conn, NAME_QUERY, args.keys, args.runs))
+
+    cursor = conn.cursor()
+    for statement in INDEXES:
+        cursor.execute(statement)
+    cursor.close()
+
+    report("mit Index, DATE() = CURDATE()", measure(conn, OLD_COUNT_QUERY, args.keys, args.runs))
+    report("mit Index, Bereichsabfrage", measure(conn, NEW_COUNT_QUERY, args.keys, args.runs))
+    report("mit Index, Namenssuche", measure(conn, NAME_QUERY, args.keys, args.runs))
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: tools/migrate.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Spielt die SQL-Migrationen aus dem Ordner `migrations` in der richtigen
+Reihenfolge ein. Bereits eingespielte Migrationen werden in der Tabelle
+`z_sys_schema_migration` festgehalten und übersprungen.
+
+Aufruf (im Projektverzeichnis):
+    python tools/migrate.py [--dry-run]
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Verbindung ohne Schemaprüfung, die Migrationen werden ja erst eingespielt.
+
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from database import connect_to_database  # noqa: E402
+
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations")
+
+
+def split_statements(sql):
+    """
+    Teilt eine Migrationsdatei in einzelne Befehle auf (Kommentarzeilen werden entfernt).
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Noatime Datenbank-Migrationen einspielen")
+    parser.add_argument("--dry-run", action="store_true", help="Nur anzeigen, was eingespielt würde")
+    args = parser.parse_args()
+
+    conn = connect_to_database(check_migrations=False)
+    if conn is None:
+        print("Keine Datenbankverbindung. Abbruch.")
+        return 1
+
+    cursor = conn.cursor()
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS z_sys_schema_migration ("
+        " mig_name VARCHAR(255) NOT NULL PRIMARY KEY,"
+        " mig_applied_at DATETIME NOT NULL)"
+    )
+    cursor.execute("SELECT mig_name FROM z_sys_schema_migration")
+    applied = {row[0] for row in cursor.fetchall()}
+
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not name.endswith(".sql") or name in applied:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, name), "r", encoding="utf-8") as f:
+            statements = split_statements(f.read())
+
+        print(f"Migration {name} ({len(statements)} Befehle)")
+        if args.dry_run:
+            continue
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute(
+            "INSERT INTO z_sys_schema_migration (mig_name, mig_applied_at) VALUES (%s, NOW())",
+            (name,),
+        )
+        conn.commit()
+
+    cursor.close()
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: tools/prerender_images.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Optionaler Build-Schritt: skaliert die GUI-Bilder für gängige Kiosk-
+Auflösungen im Voraus und legt sie im Bild-Cache ab (image_cache.py). Das
+Terminal lädt beim ersten Start dann nur noch fertige Dateien.
+
+Aufruf (im Projektverzeichnis):
+    python tools/prerender_images.py [--width 800 --width 1024 ...]
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from image_cache import ImageCache  # noqa: E402
+
+# Bildschirmbreiten gängiger Kiosk-Displays (Pi Touch Display, 7"/10" HDMI, Full HD)
+DEFAULT_WIDTHS = [800, 1024, 1280, 1366, 1920]
+
+# Bild und Breite als Anteil der Bildschirmbreite, wie in gui.py (LOGO_/SWIRL_WIDTH_FACTOR)
+UI_IMAGES = [
+    ("churwork_logo_claim.png", 0.8),
+    ("swirl.png", 0.5),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI-Bilder für Kiosk-Auflösungen vorskalieren")
+    parser.add_argument("--width", type=int, action="append",
+                        help="Bildschirmbreite in Pixel (mehrfach möglich)")
+    args = parser.parse_args()
+
+    cache = ImageCache(os.path.join(BASE_DIR, "cache", "images"))
+    for screen_width in args.width or DEFAULT_WIDTHS:
+        for filename, factor in UI_IMAGES:
+            source = os.path.join(BASE_DIR, "img", filename)
+            if not os.path.exists(source):
+                print(f"{source} fehlt, übersprungen.")
+                continue
+            path = cache.scaled_path(source, int(screen_width * factor))
+            print(f"{screen_width}px: {os.path.relpath(path, BASE_DIR)}")
+
+    print(f"Fertig: {cache.misses} neu skaliert, {cache.hits} bereits im Cache.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: ui/__init__.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Austauschbare Oberflächen für die Rückmeldung beim Stempeln. Die Tk-Oberfläche
+zeigt das Vollbild-GUI an, die Headless-Oberfläche meldet über GPIO-LEDs und
+einen Summer (Terminals ohne Bildschirm).
+
+Die Implementierungen werden erst in `create_ui` importiert, damit ein
+Headless-Terminal weder tkinter noch PIL, Schriften oder Bilder lädt.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+__all__ = [
+    'UserInterface',
+    'create_ui',
+]
+
+from .base import UserInterface
+
+
+def create_ui(name, config=None):
+    """
+    Erstellt die konfigurierte Oberfläche ("tk" oder "headless").
+    """
+    if name == 'tk':
+        from .tk_ui import TkUserInterface
+        return TkUserInterface()
+    if name == 'headless':
+        from .headless_ui import HeadlessUserInterface
+        return HeadlessUserInterface.from_config(config)
+    raise ValueError(f"Unbekannte Oberfläche: {name}")
@@ -0,0 +1,61 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: ui/base.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Schnittstelle, die jede Oberfläche erfüllen muss.
+
+Changelog:
+- [19.10.26]: Erste Version.
+
+===============================================================================
+"""
+
+
+class UserInterface:
+    """
+    Basisklasse für Oberflächen. `show_message` und `set_server_status` dürfen
+    aus jedem Thread aufgerufen werden und blockieren den Aufrufer nicht.
+    """
+
+    def show_message(self, text, duration_ms=2000, icon=None):
+        """
+        Meldet eine Nachricht für `duration_ms`. `icon` ist "success", "error"
+        oder "present" und bestimmt die Art der Rückmeldung.
+        """
+        raise NotImplementedError
+
+    def set_server_status(self, state):
+        """
+        Zeigt den Verbindungszustand an (siehe connection_state.py).
+        """
+        raise NotImplementedError
+
+    def bind_connection_state(self, state_machine):
+        """
+        Abonniert den Verbindungszustand und zeigt jeden Wechsel an.
+        """
+        state_machine.subscribe(lambda old, new, reason: self.set_server_status(new))
+
+    def run(self, on_close):
+        """
+        Blockiert im Hauptthread, bis die Anwendung beendet wird. `on_close`
+        wird beim Beenden (Fenster schliessen, SIGTERM) aufgerufen.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Gibt die Ressourcen der Oberfläche frei.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Gibt Kennzahlen der Oberfläche für das Protokoll zurück.
+        """
+        return {}
@@ -0,0 +1,140 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: ui/headless_ui.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Oberfläche für Terminals ohne Bildschirm. Ein erfolgreicher Stempel lässt
+die grüne LED leuchten und den Summer einmal kurz piepsen, ein Fehler die rote
+LED mit drei Pieptönen. Die Status-LED leuchtet, solange der Server
+erreichbar ist. Die Pins werden über gpio_setup.py angesteuert.
+
+Die Muster laufen in einem eigenen Thread, der Reader wartet nie auf den
+Summer. Eine neue Nachricht ersetzt eine noch leuchtende.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Pinbelegung aus der zentralen Konfiguration (config_loader.py).
+
+===============================================================================
+"""
+
+import logging
+import queue
+import signal
+import threading
+import time
+
+import gpio_setup
+
+from .base import UserInterface
+
+ui_logger = logging.getLogger("main_logger")
+
+# Pin (BCM) -> Standardbelegung, überschreibbar im Abschnitt [gpio] der Konfiguration
+DEFAULT_PINS = {
+    "led_success": 17,
+    "led_error": 27,
+    "led_status": 22,
+    "buzzer": 18,
+}
+
+# Anzahl Pieptöne pro Symbol
+BEEPS = {
+    "success": 1,
+    "error": 3,
+}
+
+
+class HeadlessUserInterface(UserInterface):
+    """
+    Rückmeldung über LEDs und Summer.
+    """
+
+    def __init__(self, led_success=17, led_error=27, led_status=22, buzzer=18, beep_ms=80):
+        self.led_success = led_success
+        self.led_error = led_error
+        self.led_status = led_status
+        self.buzzer = buzzer
+        self.beep = beep_ms / 1000
+        self.pins = (led_success, led_error, led_status, buzzer)
+        gpio_setup.setup_outputs(self.pins)
+
+        self.messages = 0
+        self.replaced = 0
+        self._queue = queue.SimpleQueue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="FeedbackThread", daemon=True)
+        self._thread.start()
+        ui_logger.info(f"[Headless] Rückmeldung über GPIO (Pins {self.pins}).")
+
+    @classmethod
+    def from_config(cls, config=None):
+        """
+        Erstellt die Oberfläche mit der Pinbelegung aus dem Abschnitt [gpio]
+        (config_loader.config).
+        """
+        if config is None:
+            return cls(**DEFAULT_PINS)
+        pins = {name: config.value('gpio', name) for name in DEFAULT_PINS}
+        return cls(beep_ms=config.value('gpio', 'beep_ms'), **pins)
+
+    def show_message(self, text, duration_ms=2000, icon=None):
+        self.messages += 1
+        self._queue.put((text, duration_ms, icon))
+
+    def set_server_status(self, state):
+        gpio_setup.set_output(self.led_status, state != "OFFLINE")
+
+    def run(self, on_close):
+        signal.signal(signal.SIGTERM, lambda signum, frame: on_close())
+        signal.signal(signal.SIGINT, lambda signum, frame: on_close())
+        # Mit Timeout warten, damit der Hauptthread Signale verarbeiten kann
+        while not self._stopped.wait(1):
+            pass
+
+    def close(self):
+        self._stopped.set()
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+        gpio_setup.cleanup(self.pins)
+
+    def stats(self):
+        return {"messages": self.messages, "replaced": self.replaced}
+
+    def _run(self):
+        active_pin = None
+        deadline = None
+        while True:
+            timeout = max(deadline - time.monotonic(), 0) if deadline is not None else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Anzeigedauer abgelaufen
+                gpio_setup.set_output(active_pin, False)
+                active_pin = deadline = None
+                continue
+            if item is None:
+                break
+
+            text, duration_ms, icon = item
+            if active_pin is not None:
+                gpio_setup.set_output(active_pin, False)
+                active_pin = deadline = None
+                self.replaced += 1
+            if icon not in BEEPS:
+                continue  # "present" ist der Ruhezustand, alle LEDs aus
+
+            try:
+                active_pin = self.led_success if icon == "success" else self.led_error
+                gpio_setup.set_output(active_pin, True)
+                deadline = time.monotonic() + duration_ms / 1000
+                gpio_setup.pulse(self.buzzer, self.beep, count=BEEPS[icon])
+            except Exception as e:
+                ui_logger.error(f"[Headless] Fehler bei der Rückmeldung '{text}': {e}")
+
+        if active_pin is not None:
+            gpio_setup.set_output(active_pin, False)
@@ -0,0 +1,50 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: ui/tk_ui.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Vollbild-GUI mit Tk (gui.py). Nachrichten aus den Hintergrund-Threads
+laufen über den GuiBus (gui_bus.py) in den Tk-Thread.
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Statistik der Uhranzeige (clock_renderer.py).
+
+===============================================================================
+"""
+
+from gui import animation_stats, clock_stats, create_gui, create_gui_bus, load_swirl_animation
+
+from .base import UserInterface
+
+
+class TkUserInterface(UserInterface):
+    """
+    Oberfläche mit Bildschirm.
+    """
+
+    def __init__(self):
+        self.root = create_gui()
+        self.bus = create_gui_bus(self.root)  # Einziger Weg, wie Threads das GUI aktualisieren
+        load_swirl_animation(self.root, self.bus)
+
+    def show_message(self, text, duration_ms=2000, icon=None):
+        self.bus.show_message(text, duration_ms, icon)
+
+    def set_server_status(self, state):
+        self.bus.set_server_status(state)
+
+    def run(self, on_close):
+        self.root.protocol("WM_DELETE_WINDOW", on_close)
+        self.root.mainloop()
+
+    def close(self):
+        self.bus.stop()
+        self.root.destroy()
+
+    def stats(self):
+        return {"gui_bus": self.bus.stats(), "animation": animation_stats(), "clock": clock_stats()}
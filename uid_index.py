@@ -0,0 +1,305 @@
+"""
+===============================================================================
+Projekt: Noatime
+Dateiname: uid_index.py
+Version: 1.0.0
+Entwickler: Annatina Christ
+Datum: 19.10.2026
+
+Beschreibung:
+Kompakter Index auf der Karte für sehr grosse Tag-Listen. Die UIDs werden als
+Bytes in ein sortiertes Feld fester Breite gepackt, die Namen liegen in einem
+separaten Block. Die Datei wird per mmap eingebunden und binär durchsucht:
+eine Abfrage kostet O(log n), es entsteht kein Python-Objekt pro Eintrag und
+beim Start muss nichts eingelesen werden.
+
+Dateiformat (Little Endian):
+    Kopf     8 Bytes Magic, uint32 Anzahl Einträge
+    Schlüssel  Anzahl x 11 Bytes: UID mit Nullen auf 10 Bytes aufgefüllt + Länge
+    Offsets  (Anzahl + 1) x uint32 in den Namensblock
+    Namen    UTF-8, "Vorname\\x1fNachname" pro Eintrag
+
+Changelog:
+- [19.10.26]: Erste Version.
+- [19.10.26]: Index in einem Durchgang aus sortierten Einträgen schreiben, sonst externe Sortierung in Blöcken.
+- [19.10.26]: Übersprungene (ungültige) UIDs werden gezählt und als Warnung protokolliert.
+
+===============================================================================
+"""
+
+import heapq
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+index_logger = logging.getLogger("sql_logger")
+
+MAGIC = b"NOAUID1\0"
+HEADER = struct.Struct("<8sI")
+OFFSET = struct.Struct("<I")
+MAX_UID_BYTES = 10  # ISO 14443: 4, 7 oder 10 Bytes
+KEY_WIDTH = MAX_UID_BYTES + 1
+NAME_SEPARATOR = "\x1f"
+RUN_SIZE = 100000  # Einträge pro sortiertem Block bei unsortierter Eingabe
+RUN_RECORD = struct.Struct("<11sQI")  # Schlüssel, laufende Nummer, Länge des Namens
+
+
+def pack_uid(uid):
+    """
+    Packt eine UID (Hex-Text wie von `sanitize_uid` oder Bytes) in einen
+    Schlüssel fester Breite. Die Sortierung der Schlüssel entspricht der
+    lexikografischen Sortierung der UIDs. Gibt None für ungültige UIDs zurück.
+    """
+    if isinstance(uid, str):
+        try:
+            uid = bytes.fromhex(uid)
+        except ValueError:
+            return None
+    if not uid or len(uid) > MAX_UID_BYTES:
+        return None
+    return uid.ljust(MAX_UID_BYTES, b"\0") + bytes([len(uid)])
+
+
+def unpack_uid(key):
+    """
+    Wandelt einen Schlüssel zurück in Hex-Text.
+    """
+    return key[:key[MAX_UID_BYTES]].hex()
+
+
+def build_index(path, entries, sorted_input=False, run_size=RUN_SIZE):
+    """
+    Schreibt einen Index aus (uid, vorname, nachname)-Einträgen atomar nach `path`.
+    Ungültige UIDs (kein Hex-Text oder länger als MAX_UID_BYTES) werden
+    übersprungen und mit ihrer Anzahl als Warnung protokolliert; diese Tags
+    erhalten offline keinen Namen. Bei doppelten UIDs gewinnt der letzte Eintrag.
+    Gibt die Anzahl geschriebener Einträge zurück.
+
+    Mit `sorted_input` müssen die Einträge nach UID sortiert sein (z.B. ORDER BY
+    in der Abfrage oder `UidIndex.items`); sie werden in einem Durchgang ohne
+    Zwischenspeicher geschrieben, eine falsche Reihenfolge ergibt einen ValueError.
+    Sonst werden sie in Blöcken von `run_size` Einträgen sortiert, in temporäre
+    Dateien ausgelagert und beim Schreiben zusammengeführt.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    skipped = _Skipped()
+    try:
+        with _IndexWriter(temp_path) as writer:
+            if sorted_input:
+                for uid, first, last in entries:
+                    key = pack_uid(uid)
+                    if key is None:
+                        skipped.add(uid)
+                        continue
+                    writer.add(key, _pack_name(first, last))
+            else:
+                for key, _, name in _external_sort(entries, run_size, directory or ".", skipped):
+                    writer.add(key, name)
+            count = writer.close()
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    if skipped.count:
+        index_logger.warning(
+            f"[UidIndex] {skipped.count} ungültige UIDs nicht in {path} aufgenommen "
+            f"(z.B. {', '.join(repr(uid) for uid in skipped.examples)}); diese Tags erhalten offline keinen Namen."
+        )
+    return count
+
+
+class _Skipped:
+    """
+    Zählt übersprungene UIDs und merkt sich die ersten als Beispiele fürs Log.
+    """
+
+    def __init__(self, max_examples=5):
+        self.count = 0
+        self.examples = []
+        self.max_examples = max_examples
+
+    def add(self, uid):
+        self.count += 1
+        if len(self.examples) < self.max_examples:
+            self.examples.append(uid)
+
+
+def _pack_name(first, last):
+    return f"{first or ''}{NAME_SEPARATOR}{last or ''}".encode("utf-8")
+
+
+class _IndexWriter:
+    """
+    Schreibt nach Schlüssel sortierte Einträge in einem Durchgang. Die Schlüssel
+    gehen direkt in die Indexdatei, Offsets und Namen in zwei temporäre Dateien,
+    die am Ende angehängt werden. Im Speicher liegt nur der letzte Eintrag.
+    """
+
+    def __init__(self, path):
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, 0))  # Anzahl wird am Ende eingetragen
+        directory = os.path.dirname(path) or "."
+        self._offsets = tempfile.TemporaryFile(dir=directory)
+        self._names = tempfile.TemporaryFile(dir=directory)
+        self._offset = 0
+        self._pending = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for f in (self._offsets, self._names, self._file):
+            f.close()
+
+    def add(self, key, name):
+        if self._pending is not None:
+            if key == self._pending[0]:
+                self._pending = (key, name)  # Doppelte UID: der letzte Eintrag gewinnt
+                return
+            if key < self._pending[0]:
+                raise ValueError(f"Einträge nicht nach UID sortiert ({unpack_uid(key)} nach {unpack_uid(self._pending[0])})")
+            self._write(*self._pending)
+        self._pending = (key, name)
+
+    def close(self):
+        """
+        Schreibt den letzten Eintrag, hängt Offsets und Namen an und trägt die
+        Anzahl im Kopf ein. Gibt die Anzahl Einträge zurück.
+        """
+        if self._pending is not None:
+            self._write(*self._pending)
+            self._pending = None
+        self._offsets.write(OFFSET.pack(self._offset))
+        for part in (self._offsets, self._names):
+            part.seek(0)
+            shutil.copyfileobj(part, self._file)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, self.count))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self.count
+
+    def _write(self, key, name):
+        self._file.write(key)
+        self._offsets.write(OFFSET.pack(self._offset))
+        self._names.write(name)
+        self._offset += len(name)
+        self.count += 1
+
+
+def _external_sort(entries, run_size, directory, skipped):
+    """
+    Liefert die Einträge als (Schlüssel, laufende Nummer, Name), sortiert nach
+    Schlüssel und bei gleicher UID in Eingabereihenfolge. Passt die Eingabe in
+    einen Block, wird nur im Speicher sortiert.
+    """
+    runs = []
+    run = []
+    try:
+        for number, (uid, first, last) in enumerate(entries):
+            key = pack_uid(uid)
+            if key is None:
+                skipped.add(uid)
+                continue
+            run.append((key, number, _pack_name(first, last)))
+            if len(run) >= run_size:
+                runs.append(_spill(sorted(run), directory))
+                run = []
+        run.sort()
+        if not runs:
+            yield from run
+            return
+        if run:
+            runs.append(_spill(run, directory))
+            run = []
+        yield from heapq.merge(*(_read_run(f) for f in runs))
+    finally:
+        for f in runs:
+            f.close()
+
+
+def _spill(run, directory):
+    f = tempfile.TemporaryFile(dir=directory)
+    for key, number, name in run:
+        f.write(RUN_RECORD.pack(key, number, len(name)))
+        f.write(name)
+    f.seek(0)
+    return f
+
+
+def _read_run(f):
+    while True:
+        record = f.read(RUN_RECORD.size)
+        if not record:
+            return
+        key, number, length = RUN_RECORD.unpack(record)
+        yield key, number, f.read(length)
+
+
+class UidIndex:
+    """
+    Schreibgeschützter, per mmap eingebundener UID-Index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} ist kein UID-Index")
+        self._keys_start = HEADER.size
+        self._offsets_start = self._keys_start + self._count * KEY_WIDTH
+        self._names_start = self._offsets_start + (self._count + 1) * OFFSET.size
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, uid):
+        """
+        Gibt (vorname, nachname) für eine UID zurück oder None, wenn sie fehlt.
+        """
+        key = pack_uid(uid)
+        if key is None:
+            return None
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            start = self._keys_start + middle * KEY_WIDTH
+            candidate = self._map[start:start + KEY_WIDTH]
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return self._name(middle)
+        return None
+
+    def items(self):
+        """
+        Liefert alle Einträge als (uid, vorname, nachname), sortiert nach UID.
+        """
+        for position in range(self._count):
+            start = self._keys_start + position * KEY_WIDTH
+            first, last = self._name(position)
+            yield unpack_uid(self._map[start:start + KEY_WIDTH]), first, last
+
+    def close(self):
+        self._map.close()
+
+    def _name(self, position):
+        start, end = struct.unpack_from("<II", self._map, self._offsets_start + position * OFFSET.size)
+        raw = self._map[self._names_start + start:self._names_start + end].decode("utf-8")
+        first, last = raw.split(NAME_SEPARATOR, 1)
+        return first or None, last or None